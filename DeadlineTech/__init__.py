@@ -19,7 +19,6 @@ userbot = Userbot()
 from .platforms import *
 
 Apple = AppleAPI()
-Carbon = CarbonAPI()
 SoundCloud = SoundAPI()
 Spotify = SpotifyAPI()
 Resso = RessoAPI()
@@ -1,7 +1,6 @@
 # Powered By Team DeadlineTech
 
 import asyncio
-import importlib
 
 from pyrogram.types import BotCommand
 from pyrogram import idle
@@ -10,13 +9,19 @@ from pytgcalls.exceptions import NoActiveGroupCall
 import config
 from DeadlineTech import LOGGER, app, userbot
 from DeadlineTech.core.call import Anony
+from DeadlineTech.core.http import close_session
+from DeadlineTech.core.lifecycle import start_background, stop_background
+from DeadlineTech.core.loader import load_plugins
 from DeadlineTech.misc import sudo
-from DeadlineTech.plugins import ALL_MODULES
-from DeadlineTech.utils.database import get_banned_users, get_gbanned
+from DeadlineTech.plugins import ALL_MODULES, LAZY_MODULES
+from DeadlineTech.utils.database import ensure_indexes, get_banned_users, get_gbanned
 from DeadlineTech.utils.crash_reporter import setup_global_exception_handler  # ✅ Import crash handler
+from DeadlineTech.utils.thumbnails import thumbs
 from config import BANNED_USERS
 
 async def init():
+    # Thumbnail workers are forked, do it while the process has no threads
+    thumbs.start()
     # ✅ Enable global crash handler
     setup_global_exception_handler()
 
@@ -31,6 +36,10 @@ async def init():
         LOGGER(__name__).error("Assistant client variables not defined, exiting...")
         exit()
     await sudo()
+    try:
+        await ensure_indexes()
+    except Exception as e:
+        LOGGER("DeadlineTech").warning(f"Skipping index bootstrap: {e}")
     try:
         users = await get_gbanned()
         for user_id in users:
@@ -72,8 +81,7 @@ async def init():
     ])
 
     
-    for all_module in ALL_MODULES:
-        importlib.import_module("DeadlineTech.plugins" + all_module)
+    load_plugins(app, ALL_MODULES, LAZY_MODULES)
     LOGGER("DeadlineTech.plugins").info("Successfully Imported Modules...")
     await userbot.start()
     await Anony.start()
@@ -87,12 +95,16 @@ async def init():
     except:
         pass
     await Anony.decorators()
+    await start_background()
     LOGGER("DeadlineTech").info(
         "DeadlineTech Music Bot started successfully"
     )
     await idle()
+    await stop_background()
     await app.stop()
     await userbot.stop()
+    await close_session()
+    thumbs.stop()
     LOGGER("DeadlineTech").info("Stopping DeadlineTech Music Bot...")
 
 
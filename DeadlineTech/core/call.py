@@ -55,7 +55,9 @@ from DeadlineTech.utils.database import (
 from DeadlineTech.utils.exceptions import AssistantErr
 from DeadlineTech.utils.formatters import check_duration, seconds_to_min, speed_converter
 from DeadlineTech.utils.inline.play import stream_markup
+from DeadlineTech.utils.mediacache import send_photo
 from DeadlineTech.utils.stream.autoclear import auto_clean
+from DeadlineTech.utils.sys import sampler
 from DeadlineTech.utils.thumbnails import get_thumb
 from strings import get_string
 
@@ -414,8 +416,8 @@ class Call(PyTgCalls):
                     )
                 img = await get_thumb(videoid)
                 button = stream_markup(_, chat_id)
-                run = await app.send_photo(
-                    chat_id=original_chat_id,
+                run = await send_photo(
+                    original_chat_id,
                     photo=img,
                     caption=_["stream_1"].format(
                         f"https://t.me/{app.username}?start=info_{videoid}",
@@ -461,8 +463,8 @@ class Call(PyTgCalls):
                 img = await get_thumb(videoid)
                 button = stream_markup(_, chat_id)
                 await mystic.delete()
-                run = await app.send_photo(
-                    chat_id=original_chat_id,
+                run = await send_photo(
+                    original_chat_id,
                     photo=img,
                     caption=_["stream_1"].format(
                         f"https://t.me/{app.username}?start=info_{videoid}",
@@ -492,8 +494,8 @@ class Call(PyTgCalls):
                         text=_["call_6"],
                     )
                 button = stream_markup(_, chat_id)
-                run = await app.send_photo(
-                    chat_id=original_chat_id,
+                run = await send_photo(
+                    original_chat_id,
                     photo=config.STREAM_IMG_URL,
                     caption=_["stream_2"].format(user),
                     reply_markup=InlineKeyboardMarkup(button),
@@ -521,8 +523,8 @@ class Call(PyTgCalls):
                     )
                 if videoid == "telegram":
                     button = stream_markup(_, chat_id)
-                    run = await app.send_photo(
-                        chat_id=original_chat_id,
+                    run = await send_photo(
+                        original_chat_id,
                         photo=config.TELEGRAM_AUDIO_URL
                         if str(streamtype) == "audio"
                         else config.TELEGRAM_VIDEO_URL,
@@ -535,8 +537,8 @@ class Call(PyTgCalls):
                     db[chat_id][0]["markup"] = "tg"
                 elif videoid == "soundcloud":
                     button = stream_markup(_, chat_id)
-                    run = await app.send_photo(
-                        chat_id=original_chat_id,
+                    run = await send_photo(
+                        original_chat_id,
                         photo=config.SOUNCLOUD_IMG_URL,
                         caption=_["stream_1"].format(
                             config.SUPPORT_CHAT, title[:23], check[0]["dur"], user
@@ -548,8 +550,8 @@ class Call(PyTgCalls):
                 else:
                     img = await get_thumb(videoid)
                     button = stream_markup(_, chat_id)
-                    run = await app.send_photo(
-                        chat_id=original_chat_id,
+                    run = await send_photo(
+                        original_chat_id,
                         photo=img,
                         caption=_["stream_1"].format(
                             f"https://t.me/{app.username}?start=info_{videoid}",
@@ -562,18 +564,24 @@ class Call(PyTgCalls):
                     db[chat_id][0]["mystic"] = run
                     db[chat_id][0]["markup"] = "stream"
 
+    async def pings(self) -> list:
+        """Each running assistant's ping, measured concurrently."""
+        clients = [
+            client
+            for string, client in (
+                (config.STRING1, self.one),
+                (config.STRING2, self.two),
+                (config.STRING3, self.three),
+                (config.STRING4, self.four),
+                (config.STRING5, self.five),
+            )
+            if string
+        ]
+        return list(await asyncio.gather(*(client.ping for client in clients)))
+
     async def ping(self):
-        pings = []
-        if config.STRING1:
-            pings.append(await self.one.ping)
-        if config.STRING2:
-            pings.append(await self.two.ping)
-        if config.STRING3:
-            pings.append(await self.three.ping)
-        if config.STRING4:
-            pings.append(await self.four.ping)
-        if config.STRING5:
-            pings.append(await self.five.ping)
+        sample = sampler.latest
+        pings = sample.pings if sample and sample.pings else await self.pings()
         return str(round(sum(pings) / len(pings), 3))
 
     async def start(self):
@@ -0,0 +1,22 @@
+from typing import Optional
+
+import aiohttp
+
+# One pooled session for API clients, so every request reuses open connections
+_session: Optional[aiohttp.ClientSession] = None
+
+
+def get_session() -> aiohttp.ClientSession:
+    """Must be called from a running event loop."""
+    global _session
+    if _session is None or _session.closed:
+        _session = aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(total=20),
+            connector=aiohttp.TCPConnector(limit=100, ttl_dns_cache=300),
+        )
+    return _session
+
+
+async def close_session():
+    if _session and not _session.closed:
+        await _session.close()
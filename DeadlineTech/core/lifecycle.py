@@ -0,0 +1,89 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, List
+
+from ..logging import LOGGER
+
+# Background jobs plugins register at import, started once the clients are up
+_startup: List[Callable[[], Awaitable]] = []
+# Cleanups awaited on shutdown, while the clients are still connected
+_shutdown: List[Callable[[], Awaitable]] = []
+_tasks: Dict[str, asyncio.Task] = {}
+_started = False
+
+
+def _name(func) -> str:
+    return f"{func.__module__}.{func.__qualname__}"
+
+
+def _spawn(func):
+    name = _name(func)
+    task = _tasks.get(name)
+    if task is None or task.done():
+        _tasks[name] = asyncio.create_task(func(), name=name)
+
+
+def on_startup(func: Callable[[], Awaitable]):
+    """
+    Runs the coroutine function ``func`` as a background task once the bot,
+    assistants and calls have started. Plugins loaded after that (lazy ones)
+    have theirs started right away. Usable as a decorator.
+    """
+    _startup.append(func)
+    if _started:
+        _spawn(func)
+    return func
+
+
+def on_shutdown(func: Callable[[], Awaitable]):
+    """
+    Awaits the coroutine function ``func`` in ``stop_background``, after the
+    background tasks are cancelled and before the clients stop. Usable as a
+    decorator.
+    """
+    _shutdown.append(func)
+    return func
+
+
+def _forget(task: asyncio.Task):
+    if _tasks.get(task.get_name()) is task:
+        del _tasks[task.get_name()]
+    if not task.cancelled() and task.exception():
+        LOGGER(__name__).error(
+            f"Background task {task.get_name()} failed", exc_info=task.exception()
+        )
+
+
+def spawn(name: str, coro: Awaitable) -> asyncio.Task:
+    """
+    Runs ``coro`` as a background task that ``stop_background`` cancels with
+    the startup ones, for jobs a command kicks off and should not wait on.
+    """
+    task = asyncio.create_task(coro, name=name)
+    _tasks[name] = task
+    task.add_done_callback(_forget)
+    return task
+
+
+async def start_background():
+    global _started
+    _started = True
+    for func in _startup:
+        _spawn(func)
+    LOGGER(__name__).info(f"Started {len(_tasks)} background tasks.")
+
+
+async def stop_background():
+    tasks = list(_tasks.values())
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    _tasks.clear()
+    for func in _shutdown:
+        try:
+            await func()
+        except Exception as e:
+            LOGGER(__name__).warning(f"Shutdown hook {_name(func)} failed: {e}")
+
+
+def background_tasks() -> Dict[str, asyncio.Task]:
+    return dict(_tasks)
@@ -0,0 +1,89 @@
+import importlib
+import time
+from typing import Dict, List
+
+from pyrogram import filters
+from pyrogram.handlers import CallbackQueryHandler, EditedMessageHandler, MessageHandler
+
+import config
+
+from ..logging import LOGGER
+
+PACKAGE = "DeadlineTech.plugins"
+# Runs before the plugins' own groups so a deferred plugin sees its first update
+LAZY_GROUP = -5
+
+# module -> seconds its import took, shared dependencies count for the first importer
+import_times: Dict[str, float] = {}
+_loaded = set()
+
+
+def _import(module: str, client=None) -> list:
+    """Imports a plugin and returns the handlers it added to ``client``."""
+    handlers = []
+    if client is not None:
+        add_handler = client.add_handler
+
+        def capture(handler, group: int = 0):
+            handlers.append(handler)
+            return add_handler(handler, group)
+
+        client.add_handler = capture
+    start = time.perf_counter()
+    try:
+        importlib.import_module(PACKAGE + module)
+    finally:
+        import_times[module] = time.perf_counter() - start
+        if client is not None:
+            del client.add_handler
+    _loaded.add(module)
+    return handlers
+
+
+def _defer(client, module: str, triggers: dict):
+    async def pending(_, __, ___):
+        return module not in _loaded
+
+    def loader(kind):
+        async def load(client, update):
+            if module in _loaded:
+                return
+            LOGGER(__name__).info(f"Loading {PACKAGE}{module} on first use.")
+            handlers = _import(module, client)
+            # Dispatcher changes wait for the running handler, so serve this update here
+            for handler in handlers:
+                if type(handler) is kind and await handler.check(client, update):
+                    return await handler.callback(client, update)
+
+        return load
+
+    waiting = filters.create(pending)
+    if triggers.get("commands"):
+        # Commands may also be edited into a message, e.g. a corrected /eval
+        for kind in (MessageHandler, EditedMessageHandler):
+            client.add_handler(
+                kind(loader(kind), filters.command(triggers["commands"]) & waiting),
+                LAZY_GROUP,
+            )
+    if triggers.get("callbacks"):
+        pattern = "|".join(triggers["callbacks"])
+        client.add_handler(
+            CallbackQueryHandler(loader(CallbackQueryHandler), filters.regex(pattern) & waiting),
+            LAZY_GROUP,
+        )
+
+
+def load_plugins(client, modules: List[str], lazy: Dict[str, dict]):
+    lazy = lazy if config.LAZY_PLUGINS else {}
+    start = time.perf_counter()
+    for module in modules:
+        if module in lazy:
+            _defer(client, module, lazy[module])
+        else:
+            _import(module)
+    elapsed = time.perf_counter() - start
+    slowest = sorted(import_times.items(), key=lambda item: item[1], reverse=True)[:8]
+    LOGGER(__name__).info(
+        f"Imported {len(import_times)} plugins in {elapsed:.2f}s, {len(lazy)} deferred. Slowest: "
+        + ", ".join(f"{module[1:]} {seconds * 1000:.0f}ms" for module, seconds in slowest)
+    )
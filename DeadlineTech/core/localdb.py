@@ -0,0 +1,544 @@
+# Powered By Team DeadlineTech
+
+"""
+Embedded SQLite storage that speaks the subset of the Motor API used by the bot.
+
+Every collection is a table of JSON documents. Lookups on indexed keys go
+through SQLite expression indexes, so a warm ``find_one`` on ``chat_id`` is a
+local B-tree hit instead of a network round trip. All statements run on a
+single worker thread which keeps the connection safe and makes every
+read-modify-write (``update_one`` with ``upsert``) atomic.
+"""
+
+import asyncio
+import json
+import os
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from pymongo.errors import DuplicateKeyError, OperationFailure
+
+_BATCH = 500
+_SQL_OPS = {"$gt": ">", "$gte": ">=", "$lt": "<", "$lte": "<="}
+
+
+class UpdateResult:
+    def __init__(self, matched_count=0, modified_count=0, upserted_id=None):
+        self.matched_count = matched_count
+        self.modified_count = modified_count
+        self.upserted_id = upserted_id
+
+
+class InsertResult:
+    def __init__(self, inserted_id):
+        self.inserted_id = inserted_id
+
+
+class DeleteResult:
+    def __init__(self, deleted_count):
+        self.deleted_count = deleted_count
+
+
+def _column(key: str) -> str:
+    # Inlined rather than bound so SQLite can match it against expression indexes
+    return "json_extract(doc, '$.%s')" % key.replace("'", "''")
+
+
+def _get(doc: dict, key: str):
+    for part in key.split("."):
+        if not isinstance(doc, dict) or part not in doc:
+            return None
+        doc = doc[part]
+    return doc
+
+
+def _set(doc: dict, key: str, value):
+    parts = key.split(".")
+    for part in parts[:-1]:
+        doc = doc.setdefault(part, {})
+    doc[parts[-1]] = value
+
+
+def _unset(doc: dict, key: str):
+    parts = key.split(".")
+    for part in parts[:-1]:
+        doc = doc.get(part)
+        if not isinstance(doc, dict):
+            return
+    doc.pop(parts[-1], None)
+
+
+def _scalar(value) -> bool:
+    return value is None or isinstance(value, (bool, int, float, str))
+
+
+def _match(doc: dict, query: dict) -> bool:
+    for key, cond in query.items():
+        value = _get(doc, key)
+        if isinstance(cond, dict) and cond and all(k.startswith("$") for k in cond):
+            for op, arg in cond.items():
+                try:
+                    if op == "$gt" and not (value is not None and value > arg):
+                        return False
+                    if op == "$gte" and not (value is not None and value >= arg):
+                        return False
+                    if op == "$lt" and not (value is not None and value < arg):
+                        return False
+                    if op == "$lte" and not (value is not None and value <= arg):
+                        return False
+                except TypeError:
+                    return False
+                if op == "$ne" and value == arg:
+                    return False
+                if op == "$in" and value not in arg:
+                    return False
+                if op == "$nin" and value in arg:
+                    return False
+                if op == "$exists" and (value is not None) != bool(arg):
+                    return False
+        elif value != cond:
+            return False
+    return True
+
+
+def _compile(query: dict):
+    """Split a query into SQL clauses and a residual filter applied in Python."""
+    clauses, params, residual = [], [], {}
+    for key, cond in (query or {}).items():
+        column = _column(key)
+        if isinstance(cond, dict) and cond and all(k.startswith("$") for k in cond):
+            leftover = {}
+            for op, arg in cond.items():
+                if op in _SQL_OPS and _scalar(arg) and arg is not None:
+                    clauses.append(f"{column} {_SQL_OPS[op]} ?")
+                    params.append(arg)
+                elif op == "$in" and all(_scalar(a) and a is not None for a in arg):
+                    if not arg:
+                        clauses.append("0")
+                        continue
+                    clauses.append(f"{column} IN ({', '.join('?' * len(arg))})")
+                    params += list(arg)
+                else:
+                    leftover[op] = arg
+            if leftover:
+                residual[key] = leftover
+        elif cond is None:
+            clauses.append(f"{column} IS NULL")
+        elif _scalar(cond):
+            clauses.append(f"{column} = ?")
+            params.append(cond)
+        else:
+            residual[key] = cond
+    where = " AND ".join(clauses) if clauses else "1"
+    return where, params, residual
+
+
+def _apply_update(doc: dict, update: dict, inserting: bool) -> dict:
+    doc = dict(doc)
+    for op, fields in update.items():
+        if op == "$set" or (op == "$setOnInsert" and inserting):
+            for key, value in fields.items():
+                _set(doc, key, value)
+        elif op == "$unset":
+            for key in fields:
+                _unset(doc, key)
+        elif op == "$inc":
+            for key, value in fields.items():
+                _set(doc, key, (_get(doc, key) or 0) + value)
+        elif op == "$max":
+            for key, value in fields.items():
+                current = _get(doc, key)
+                if current is None or value > current:
+                    _set(doc, key, value)
+        elif op in ("$push", "$addToSet"):
+            for key, value in fields.items():
+                items = list(_get(doc, key) or [])
+                if op == "$push" or value not in items:
+                    items.append(value)
+                _set(doc, key, items)
+        elif op == "$pull":
+            for key, value in fields.items():
+                _set(doc, key, [i for i in (_get(doc, key) or []) if i != value])
+        elif op != "$setOnInsert":
+            raise OperationFailure(f"Unsupported update operator {op}")
+    return doc
+
+
+class LocalCursor:
+    def __init__(self, collection, query: dict, projection=None):
+        self._collection = collection
+        self._query = query or {}
+        self._projection = projection
+        self._sort = []
+        self._skip = 0
+        self._limit = 0
+        self._buffer = []
+        self._offset = 0
+        self._last_rowid = 0
+        self._done = False
+        self._skipped = 0
+        self._returned = 0
+
+    def sort(self, key, direction: int = 1):
+        if isinstance(key, (list, tuple)):
+            self._sort.extend(key)
+        else:
+            self._sort.append((key, direction))
+        return self
+
+    def skip(self, count: int):
+        self._skip = count
+        return self
+
+    def limit(self, count: int):
+        self._limit = count
+        return self
+
+    def _project(self, doc: dict) -> dict:
+        if not self._projection:
+            return doc
+        wanted = {k for k, v in self._projection.items() if v}
+        if wanted:
+            return {k: v for k, v in doc.items() if k in wanted or k == "_id"}
+        return {k: v for k, v in doc.items() if k not in self._projection}
+
+    def _fetch(self) -> list:
+        where, params, residual = _compile(self._query)
+        sql = f'SELECT rowid, doc FROM "{self._collection.name}" WHERE {where}'
+        if self._sort:
+            order = ", ".join(
+                f"{_column(k)} {'DESC' if d < 0 else 'ASC'}" for k, d in self._sort
+            )
+            sql += f" ORDER BY {order}"
+        else:
+            # Keyset paging stays cheap however deep the cursor goes
+            sql += " AND rowid > ? ORDER BY rowid"
+            params = params + [self._last_rowid]
+        if residual:
+            # Residual filters make SQL paging inaccurate, read everything once
+            rows = self._collection._db._conn.execute(sql, params).fetchall()
+            self._done = True
+        else:
+            size = _BATCH
+            if self._limit:
+                size = min(size, self._skip + self._limit - self._skipped - self._returned)
+            if self._sort:
+                sql += " LIMIT ? OFFSET ?"
+                params = params + [size, self._offset]
+            else:
+                sql += " LIMIT ?"
+                params = params + [size]
+            rows = self._collection._db._conn.execute(sql, params).fetchall()
+            self._offset += len(rows)
+            if rows:
+                self._last_rowid = rows[-1][0]
+            if len(rows) < size:
+                self._done = True
+        docs = []
+        for rowid, raw in rows:
+            doc = json.loads(raw)
+            doc["_id"] = rowid
+            if residual and not _match(doc, residual):
+                continue
+            docs.append(doc)
+        return docs
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        while True:
+            if self._limit and self._returned >= self._limit:
+                raise StopAsyncIteration
+            if not self._buffer:
+                if self._done:
+                    raise StopAsyncIteration
+                self._buffer = await self._collection._db._run(
+                    self._collection.name, "find", self._fetch
+                )
+                if not self._buffer:
+                    raise StopAsyncIteration
+            doc = self._buffer.pop(0)
+            if self._skipped < self._skip:
+                self._skipped += 1
+                continue
+            self._returned += 1
+            return self._project(doc)
+
+    async def to_list(self, length=None):
+        items = []
+        async for doc in self:
+            items.append(doc)
+            if length and len(items) >= length:
+                break
+        return items
+
+
+class LocalCollection:
+    def __init__(self, db, name: str):
+        self._db = db
+        self.name = name
+
+    def _select(self, query: dict, single: bool = False):
+        where, params, residual = _compile(query)
+        sql = f'SELECT rowid, doc FROM "{self.name}" WHERE {where}'
+        if single and not residual:
+            sql += " LIMIT 1"
+        for rowid, raw in self._db._conn.execute(sql, params):
+            doc = json.loads(raw)
+            doc["_id"] = rowid
+            if residual and not _match(doc, residual):
+                continue
+            yield doc
+            if single:
+                return
+
+    def _write(self, rowid, doc: dict):
+        doc = {k: v for k, v in doc.items() if k != "_id"}
+        raw = json.dumps(doc, separators=(",", ":"))
+        try:
+            if rowid is None:
+                cur = self._db._conn.execute(
+                    f'INSERT INTO "{self.name}" (doc) VALUES (?)', (raw,)
+                )
+                return cur.lastrowid
+            self._db._conn.execute(
+                f'UPDATE "{self.name}" SET doc = ? WHERE rowid = ?', (raw, rowid)
+            )
+            return rowid
+        except sqlite3.IntegrityError as e:
+            raise DuplicateKeyError(str(e))
+
+    async def find_one(self, query: dict = None, projection=None):
+        docs = await self.find(query, projection).limit(1).to_list(1)
+        return docs[0] if docs else None
+
+    def find(self, query: dict = None, projection=None):
+        return LocalCursor(self, query, projection)
+
+    async def count_documents(self, query: dict = None) -> int:
+        def _count():
+            where, params, residual = _compile(query or {})
+            if not residual:
+                return self._db._conn.execute(
+                    f'SELECT COUNT(*) FROM "{self.name}" WHERE {where}', params
+                ).fetchone()[0]
+            return sum(1 for _ in self._select(query))
+
+        return await self._db._run(self.name, "count", _count)
+
+    async def insert_one(self, document: dict):
+        def _insert():
+            rowid = self._write(None, document)
+            document["_id"] = rowid
+            return InsertResult(rowid)
+
+        return await self._db._run(self.name, "insert", _insert)
+
+    async def insert_many(self, documents: list):
+        def _insert():
+            ids = []
+            self._db._conn.execute("BEGIN")
+            try:
+                for document in documents:
+                    ids.append(self._write(None, document))
+                self._db._conn.execute("COMMIT")
+            except Exception:
+                self._db._conn.execute("ROLLBACK")
+                raise
+            return ids
+
+        return await self._db._run(self.name, "insert", _insert)
+
+    def _update(self, query: dict, update: dict, upsert: bool, many: bool):
+        matched = modified = 0
+        for doc in list(self._select(query, single=not many)):
+            matched += 1
+            new = _apply_update(doc, update, inserting=False)
+            if new != doc:
+                self._write(doc["_id"], new)
+                modified += 1
+        if matched or not upsert:
+            return UpdateResult(matched, modified)
+        seed = {
+            k: v
+            for k, v in query.items()
+            if not k.startswith("$")
+            and not (isinstance(v, dict) and any(i.startswith("$") for i in v))
+        }
+        rowid = self._write(None, _apply_update(seed, update, inserting=True))
+        return UpdateResult(0, 0, rowid)
+
+    async def update_one(self, query: dict, update: dict, upsert: bool = False):
+        return await self._db._run(
+            self.name, "update", self._update, query, update, upsert, False
+        )
+
+    async def update_many(self, query: dict, update: dict, upsert: bool = False):
+        return await self._db._run(
+            self.name, "update", self._update, query, update, upsert, True
+        )
+
+    def _delete(self, query: dict, many: bool):
+        rowids = [doc["_id"] for doc in self._select(query, single=not many)]
+        self._db._conn.executemany(
+            f'DELETE FROM "{self.name}" WHERE rowid = ?', [(r,) for r in rowids]
+        )
+        return DeleteResult(len(rowids))
+
+    async def delete_one(self, query: dict):
+        return await self._db._run(self.name, "delete", self._delete, query, False)
+
+    async def delete_many(self, query: dict):
+        return await self._db._run(self.name, "delete", self._delete, query, True)
+
+    async def create_index(self, key, unique: bool = False, **kwargs):
+        if isinstance(key, (list, tuple)):
+            key = key[0][0] if isinstance(key[0], (list, tuple)) else key[0]
+
+        def _index():
+            name = f"ix_{self.name}_{key.replace('.', '_')}"
+            kind = "UNIQUE INDEX" if unique else "INDEX"
+            try:
+                # Recreate on option changes, mirroring Mongo's conflict semantics loosely
+                existing = self._db._conn.execute(
+                    "SELECT sql FROM sqlite_master WHERE type = 'index' AND name = ?",
+                    (name,),
+                ).fetchone()
+                if existing and existing[0].startswith(f"CREATE {kind}"):
+                    return name
+                self._db._conn.execute(f'DROP INDEX IF EXISTS "{name}"')
+                self._db._conn.execute(
+                    f'CREATE {kind} "{name}" ON "{self.name}" '
+                    f"({_column(key)})"
+                )
+            except sqlite3.IntegrityError as e:
+                raise OperationFailure(str(e))
+            return name
+
+        return await self._db._run(self.name, "createIndexes", _index)
+
+    async def drop(self):
+        def _drop():
+            self._db._conn.execute(f'DROP TABLE IF EXISTS "{self.name}"')
+            self._db._tables.discard(self.name)
+
+        await self._db._run(self.name, "drop", _drop)
+
+
+class LocalDatabase:
+    def __init__(self, path: str, listener=None):
+        self.path = path
+        self.name = os.path.splitext(os.path.basename(path))[0] or "local"
+        self._listener = listener
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="localdb")
+        self._conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._tables = {
+            row[0]
+            for row in self._conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table'"
+            )
+        }
+        self._collections = {}
+
+    def _ensure(self, name: str):
+        if name not in self._tables:
+            self._conn.execute(
+                f'CREATE TABLE IF NOT EXISTS "{name}" '
+                "(rowid INTEGER PRIMARY KEY AUTOINCREMENT, doc TEXT NOT NULL)"
+            )
+            self._tables.add(name)
+
+    async def _run(self, name: str, op: str, func, *args):
+        def _call():
+            self._ensure(name)
+            return func(*args)
+
+        start = time.perf_counter()
+        failed = False
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, _call)
+        except Exception:
+            failed = True
+            raise
+        finally:
+            if self._listener:
+                took = (time.perf_counter() - start) * 1000
+                self._listener.record(name, op, took, failed)
+
+    def __getattr__(self, name: str) -> LocalCollection:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self[name]
+
+    def __getitem__(self, name: str) -> LocalCollection:
+        collection = self._collections.get(name)
+        if collection is None:
+            collection = self._collections[name] = LocalCollection(self, name)
+        return collection
+
+    async def list_collection_names(self) -> list:
+        def _names():
+            return [
+                row[0]
+                for row in self._conn.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'table' "
+                    "AND name NOT LIKE 'sqlite_%'"
+                )
+            ]
+
+        return await asyncio.get_running_loop().run_in_executor(self._executor, _names)
+
+    async def command(self, name: str, *args, **kwargs) -> dict:
+        if name != "dbstats":
+            raise OperationFailure(f"Unsupported command {name}")
+
+        def _stats():
+            collections = objects = data = 0
+            for table in list(self._tables):
+                rows, size = self._conn.execute(
+                    f'SELECT COUNT(*), COALESCE(SUM(LENGTH(doc)), 0) FROM "{table}"'
+                ).fetchone()
+                collections += 1
+                objects += rows
+                data += size
+            pages = self._conn.execute("PRAGMA page_count").fetchone()[0]
+            page_size = self._conn.execute("PRAGMA page_size").fetchone()[0]
+            return {
+                "collections": collections,
+                "objects": objects,
+                "dataSize": data,
+                "storageSize": pages * page_size,
+            }
+
+        return await asyncio.get_running_loop().run_in_executor(self._executor, _stats)
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        self._conn.close()
+
+
+async def copy_database(source, target, drop: bool = True) -> dict:
+    """Copy every collection from ``source`` into ``target``, returns per-collection counts."""
+    copied = {}
+    for name in await source.list_collection_names():
+        if name.startswith("system."):
+            continue
+        if drop:
+            await target[name].delete_many({})
+        batch, total = [], 0
+        async for doc in source[name].find({}):
+            doc.pop("_id", None)
+            batch.append(doc)
+            if len(batch) >= _BATCH:
+                await target[name].insert_many(batch)
+                total += len(batch)
+                batch = []
+        if batch:
+            await target[name].insert_many(batch)
+            total += len(batch)
+        copied[name] = total
+    return copied
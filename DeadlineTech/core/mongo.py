@@ -24,17 +24,95 @@
 
 
 
+import time
+
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import monitoring
 
-from config import MONGO_DB_URI
+from config import DATABASE_BACKEND, LOCAL_DB_PATH, MONGO_DB_URI, MONGO_SLOW_QUERY_MS
 
 from ..logging import LOGGER
+from .localdb import LocalDatabase
+
+
+class QueryAudit(monitoring.CommandListener):
+    """Counts every command per collection and logs the slow ones."""
+
+    def __init__(self, slow_ms: int):
+        self.slow_ms = slow_ms
+        self.since = time.time()
+        self.stats = {}
+        self._pending = {}
+
+    def started(self, event):
+        target = event.command.get(event.command_name)
+        if not isinstance(target, str):
+            target = "$cmd"
+        self._pending[(event.connection_id, event.request_id)] = target
+
+    def _record(self, event, failed: bool = False):
+        target = self._pending.pop((event.connection_id, event.request_id), None)
+        if target is None:
+            return
+        self.record(target, event.command_name, event.duration_micros / 1000, failed)
+
+    def record(self, target: str, op: str, took: float, failed: bool = False):
+        entry = self.stats.setdefault((target, op), [0, 0.0, 0.0, 0])
+        entry[0] += 1
+        entry[1] += took
+        entry[2] = max(entry[2], took)
+        if failed:
+            entry[3] += 1
+        if took >= self.slow_ms:
+            LOGGER(__name__).warning(
+                f"🐢 Slow query: {op} on {target} took {took:.1f}ms"
+            )
+
+    def succeeded(self, event):
+        self._record(event)
+
+    def failed(self, event):
+        self._record(event, failed=True)
+
+    def snapshot(self) -> list:
+        return sorted(
+            (
+                (coll, op, count, total / count, peak, errors)
+                for (coll, op), (count, total, peak, errors) in self.stats.items()
+            ),
+            key=lambda row: row[2] * row[3],
+            reverse=True,
+        )
+
+    def reset(self):
+        self.stats.clear()
+        self.since = time.time()
+
+
+query_audit = QueryAudit(MONGO_SLOW_QUERY_MS)
+
+
+def connect_mongo():
+    client = AsyncIOMotorClient(MONGO_DB_URI, event_listeners=[query_audit])
+    return client.deadline
+
+
+def connect_local():
+    return LocalDatabase(LOCAL_DB_PATH, listener=query_audit)
+
 
-LOGGER(__name__).info("⏳ Establishing a secure link to your MongoDB database...")
-try:
-    _mongo_async_ = AsyncIOMotorClient(MONGO_DB_URI)
-    mongodb = _mongo_async_.deadline
-    LOGGER(__name__).info("✅ Successfully connected to MongoDB. All systems are ready!")
-except:
-    LOGGER(__name__).error("❌ MongoDB connection failed!")
-    exit()
+if DATABASE_BACKEND == "local":
+    LOGGER(__name__).info(f"📦 Using the embedded database at {LOCAL_DB_PATH}")
+    try:
+        mongodb = connect_local()
+    except Exception as e:
+        LOGGER(__name__).error(f"❌ Unable to open the embedded database: {e}")
+        exit()
+else:
+    LOGGER(__name__).info("⏳ Establishing a secure link to your MongoDB database...")
+    try:
+        mongodb = connect_mongo()
+        LOGGER(__name__).info("✅ Successfully connected to MongoDB. All systems are ready!")
+    except:
+        LOGGER(__name__).error("❌ MongoDB connection failed!")
+        exit()
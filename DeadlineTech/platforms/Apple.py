@@ -27,9 +27,8 @@
 import re
 from typing import Union
 
-import aiohttp
-from bs4 import BeautifulSoup
-from youtubesearchpython.__future__ import VideosSearch
+from DeadlineTech.utils.matchindex import as_track, track_matches
+from DeadlineTech.utils.metatags import fetch_meta
 
 
 class AppleAPI:
@@ -43,55 +42,39 @@ class AppleAPI:
         else:
             return False
 
+    @staticmethod
+    def _track_id(url: str) -> str:
+        # album/<name>/<id>?i=<track id> and song/<name>/<id> both identify one track
+        found = re.search(r"[?&]i=(\d+)", url) or re.search(r"/song/[^/]+/(\d+)", url)
+        return found.group(1) if found else url.split("?")[0].lower()
+
     async def track(self, url, playid: Union[bool, str] = None):
+        from DeadlineTech import YouTube
+
         if playid:
             url = self.base + url
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                if response.status != 200:
-                    return False
-                html = await response.text()
-        soup = BeautifulSoup(html, "html.parser")
-        search = None
-        for tag in soup.find_all("meta"):
-            if tag.get("property", None) == "og:title":
-                search = tag.get("content", None)
-        if search is None:
+        source = ("apple", self._track_id(url))
+        details = await track_matches.get(source=source)
+        if details:
+            return as_track(details)
+        tags = await fetch_meta(url)
+        if not tags or not tags.get("og:title"):
             return False
-        results = VideosSearch(search, limit=1)
-        for result in (await results.next())["result"]:
-            title = result["title"]
-            ytlink = result["link"]
-            vidid = result["id"]
-            duration_min = result["duration"]
-            thumbnail = result["thumbnails"][0]["url"].split("?")[0]
-        track_details = {
-            "title": title,
-            "link": ytlink,
-            "vidid": vidid,
-            "duration_min": duration_min,
-            "thumb": thumbnail,
-        }
-        return track_details, vidid
+        search = tags["og:title"][-1]
+        return as_track(await YouTube.match(search, source, checked=True))
 
     async def playlist(self, url, playid: Union[bool, str] = None):
         if playid:
             url = self.base + url
         playlist_id = url.split("playlist/")[1]
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                if response.status != 200:
-                    return False
-                html = await response.text()
-        soup = BeautifulSoup(html, "html.parser")
-        applelinks = soup.find_all("meta", attrs={"property": "music:song"})
+        tags = await fetch_meta(url)
+        if tags is None:
+            return False
         results = []
-        for item in applelinks:
+        for song in tags.get("music:song", []):
             try:
-                xx = (((item["content"]).split("album/")[1]).split("/")[0]).replace(
-                    "-", " "
-                )
+                xx = ((song.split("album/")[1]).split("/")[0]).replace("-", " ")
             except:
-                xx = ((item["content"]).split("album/")[1]).split("/")[0]
+                continue
             results.append(xx)
         return results, playlist_id
@@ -27,9 +27,8 @@
 import re
 from typing import Union
 
-import aiohttp
-from bs4 import BeautifulSoup
-from youtubesearchpython.__future__ import VideosSearch
+from DeadlineTech.utils.matchindex import as_track, track_matches
+from DeadlineTech.utils.metatags import fetch_meta
 
 
 class RessoAPI:
@@ -44,37 +43,19 @@ class RessoAPI:
             return False
 
     async def track(self, url, playid: Union[bool, str] = None):
+        from DeadlineTech import YouTube
+
         if playid:
             url = self.base + url
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                if response.status != 200:
-                    return False
-                html = await response.text()
-        soup = BeautifulSoup(html, "html.parser")
-        for tag in soup.find_all("meta"):
-            if tag.get("property", None) == "og:title":
-                title = tag.get("content", None)
-            if tag.get("property", None) == "og:description":
-                des = tag.get("content", None)
-                try:
-                    des = des.split("·")[0]
-                except:
-                    pass
-        if des == "":
+        source = ("resso", url.split("?")[0].rstrip("/").rsplit("/", 1)[-1])
+        details = await track_matches.get(source=source)
+        if details:
+            return as_track(details)
+        tags = await fetch_meta(url)
+        if tags is None:
+            return False
+        title = (tags.get("og:title") or [None])[-1]
+        des = (tags.get("og:description") or [""])[-1].split("·")[0]
+        if not title or des == "":
             return
-        results = VideosSearch(title, limit=1)
-        for result in (await results.next())["result"]:
-            title = result["title"]
-            ytlink = result["link"]
-            vidid = result["id"]
-            duration_min = result["duration"]
-            thumbnail = result["thumbnails"][0]["url"].split("?")[0]
-        track_details = {
-            "title": title,
-            "link": ytlink,
-            "vidid": vidid,
-            "duration_min": duration_min,
-            "thumb": thumbnail,
-        }
-        return track_details, vidid
+        return as_track(await YouTube.match(title, source, checked=True))
@@ -24,10 +24,16 @@
 
 
 
+import asyncio
+import glob
+import re
+import time
+from collections import OrderedDict
 from os import path
 
 from yt_dlp import YoutubeDL
 
+import config
 from DeadlineTech.utils.formatters import seconds_to_min
 
 
@@ -37,9 +43,18 @@ class SoundAPI:
             "outtmpl": "downloads/%(id)s.%(ext)s",
             "format": "best",
             "retries": 3,
-            "nooverwrites": False,
+            "nooverwrites": True,
             "continuedl": True,
+            "quiet": True,
+            "no_warnings": True,
         }
+        # url -> (extracted at, info) so repeated links skip the extraction round trip
+        self._infos = OrderedDict()
+        self.info_ttl = 1800
+        self.info_size = 256
+        # Media urls in the info are signed and expire, only a recent extraction may use them
+        self.url_ttl = 300
+        self._downloads = {}
 
     async def valid(self, link: str):
         if "soundcloud" in link:
@@ -47,13 +62,73 @@ class SoundAPI:
         else:
             return False
 
-    async def download(self, url):
-        d = YoutubeDL(self.opts)
+    @staticmethod
+    def _key(url: str) -> str:
+        url = re.sub(r"^https?://(www\.|m\.)?", "", url.strip())
+        return url.split("?")[0].split("#")[0].rstrip("/").lower()
+
+    def _extract(self, url: str) -> dict:
+        with YoutubeDL(self.opts) as ydl:
+            return ydl.extract_info(url, download=False)
+
+    def _download(self, info: dict):
+        with YoutubeDL(self.opts) as ydl:
+            # Downloads what was extracted instead of extracting it again
+            ydl.process_ie_result(dict(info), download=True)
+
+    async def info(self, url: str, max_age: int = None) -> dict:
+        """Extracted info of ``url``, reused for ``info_ttl`` seconds or ``max_age`` if given."""
+        key = self._key(url)
+        entry = self._infos.get(key)
+        if entry and time.time() - entry[0] < (self.info_ttl if max_age is None else max_age):
+            self._infos.move_to_end(key)
+            return entry[1]
+        loop = asyncio.get_running_loop()
+        info = await loop.run_in_executor(None, self._extract, url)
+        self._infos[key] = (time.time(), info)
+        while len(self._infos) > self.info_size:
+            self._infos.popitem(last=False)
+        return info
+
+    @staticmethod
+    def cached(track_id: str):
+        """Already downloaded file of a SoundCloud track id, whatever its extension."""
+        for file in glob.glob(path.join("downloads", f"{glob.escape(track_id)}.*")):
+            if not file.endswith((".part", ".ytdl")):
+                return file
+        return None
+
+    async def _fetch(self, info: dict, track_id: str, filepath: str) -> str:
+        task = self._downloads.get(track_id)
+        if task is None:
+            loop = asyncio.get_running_loop()
+            task = self._downloads[track_id] = loop.run_in_executor(
+                None, self._download, info
+            )
+            task.add_done_callback(lambda _: self._downloads.pop(track_id, None))
+        await asyncio.shield(task)
+        return filepath
+
+    async def download(self, url, stream: bool = config.SOUNDCLOUD_STREAM):
+        """
+        Metadata first: an already downloaded track is reused by id, otherwise
+        it is downloaded, or with ``stream`` played straight from its media url.
+        """
         try:
-            info = d.extract_info(url)
+            info = await self.info(url)
+            xyz = self.cached(str(info["id"]))
+            if not xyz:
+                info = await self.info(url, max_age=self.url_ttl)
+                if stream and info.get("url"):
+                    xyz = info["url"]
+                else:
+                    xyz = await self._fetch(
+                        info,
+                        str(info["id"]),
+                        path.join("downloads", f"{info['id']}.{info['ext']}"),
+                    )
         except:
             return False
-        xyz = path.join("downloads", f"{info['id']}.{info['ext']}")
         duration_min = seconds_to_min(info["duration"])
         track_details = {
             "title": info["title"],
@@ -24,13 +24,19 @@
 
 
 
+import asyncio
 import re
+import time
+from collections import OrderedDict
 
-import spotipy
-from spotipy.oauth2 import SpotifyClientCredentials
-from youtubesearchpython.__future__ import VideosSearch
+import aiohttp
 
 import config
+from DeadlineTech.core.http import get_session
+from DeadlineTech.utils.matchindex import as_track, track_matches
+
+API = "https://api.spotify.com/v1"
+TOKEN_URL = "https://accounts.spotify.com/api/token"
 
 
 class SpotifyAPI:
@@ -38,15 +44,14 @@ class SpotifyAPI:
         self.regex = r"^(https:\/\/open.spotify.com\/)(.*)$"
         self.client_id = config.SPOTIFY_CLIENT_ID
         self.client_secret = config.SPOTIFY_CLIENT_SECRET
-        if config.SPOTIFY_CLIENT_ID and config.SPOTIFY_CLIENT_SECRET:
-            self.client_credentials_manager = SpotifyClientCredentials(
-                self.client_id, self.client_secret
-            )
-            self.spotify = spotipy.Spotify(
-                client_credentials_manager=self.client_credentials_manager
-            )
-        else:
-            self.spotify = None
+        self.spotify = bool(self.client_id and self.client_secret)
+        self._token = None
+        self._token_expiry = 0.0
+        self._token_lock = asyncio.Lock()
+        # (kind, id) -> (expiry, queries) for playlists, albums and artists
+        self._lists = OrderedDict()
+        self.list_ttl = 600
+        self.list_size = 256
 
     async def valid(self, link: str):
         if re.search(self.regex, link):
@@ -54,71 +59,127 @@ class SpotifyAPI:
         else:
             return False
 
-    async def track(self, link: str):
-        track = self.spotify.track(link)
+    @staticmethod
+    def _id(link: str, kind: str) -> str:
+        # Accepts open.spotify.com links (with or without ?si=...) and bare ids
+        found = re.search(rf"{kind}/([A-Za-z0-9]+)", link)
+        return found.group(1) if found else link.split("?")[0]
+
+    @staticmethod
+    def _query(track: dict) -> str:
         info = track["name"]
         for artist in track["artists"]:
             fetched = f' {artist["name"]}'
             if "Various Artists" not in fetched:
                 info += fetched
-        results = VideosSearch(info, limit=1)
-        for result in (await results.next())["result"]:
-            ytlink = result["link"]
-            title = result["title"]
-            vidid = result["id"]
-            duration_min = result["duration"]
-            thumbnail = result["thumbnails"][0]["url"].split("?")[0]
-        track_details = {
-            "title": title,
-            "link": ytlink,
-            "vidid": vidid,
-            "duration_min": duration_min,
-            "thumb": thumbnail,
-        }
-        return track_details, vidid
+        return info
+
+    async def _get_token(self, refresh: bool = False) -> str:
+        async with self._token_lock:
+            if refresh or not self._token or self._token_expiry <= time.time():
+                async with get_session().post(
+                    TOKEN_URL,
+                    data={"grant_type": "client_credentials"},
+                    auth=aiohttp.BasicAuth(self.client_id, self.client_secret),
+                ) as resp:
+                    resp.raise_for_status()
+                    data = await resp.json()
+                self._token = data["access_token"]
+                # Renew a minute early rather than race the expiry
+                self._token_expiry = time.time() + data.get("expires_in", 3600) - 60
+            return self._token
+
+    async def _api(self, path: str, **params) -> dict:
+        url = path if path.startswith("http") else f"{API}/{path}"
+        refresh = False
+        for attempt in range(3):
+            token = await self._get_token(refresh)
+            async with get_session().get(
+                url, params=params, headers={"Authorization": f"Bearer {token}"}
+            ) as resp:
+                if resp.status == 401:
+                    refresh = True
+                    continue
+                if resp.status == 429 and attempt < 2:
+                    await asyncio.sleep(int(resp.headers.get("Retry-After", 1)))
+                    continue
+                resp.raise_for_status()
+                return await resp.json()
+        raise RuntimeError(f"Spotify API request failed: {path}")
+
+    async def _pages(self, path: str, first: dict, page: int, want: int) -> list:
+        """All items of a paged listing up to ``want``, remaining pages fetched together."""
+        items = list(first["items"])
+        total = min(first.get("total", len(items)), want)
+        if len(items) >= total or not first.get("next"):
+            return items[:want]
+        offsets = range(len(items), total, page)
+        pages = await asyncio.gather(
+            *(self._api(path, offset=offset, limit=page) for offset in offsets)
+        )
+        for data in pages:
+            items.extend(data["items"])
+        return items[:want]
+
+    async def _cached_list(self, kind: str, list_id: str, fetch) -> list:
+        key = (kind, list_id)
+        entry = self._lists.get(key)
+        if entry and entry[0] > time.time():
+            self._lists.move_to_end(key)
+            return entry[1]
+        queries = await fetch()
+        self._lists[key] = (time.time() + self.list_ttl, queries)
+        while len(self._lists) > self.list_size:
+            self._lists.popitem(last=False)
+        return queries
+
+    @property
+    def _want(self) -> int:
+        # Entries are dropped later for length limits, so fetch some slack
+        return config.PLAYLIST_FETCH_LIMIT * 2
+
+    async def track(self, link: str):
+        from DeadlineTech import YouTube
+
+        source = ("spotify", self._id(link, "track"))
+        details = await track_matches.get(source=source)
+        if not details:
+            track = await self._api(f"tracks/{source[1]}")
+            details = await YouTube.match(self._query(track), source, checked=True)
+        return as_track(details)
 
     async def playlist(self, url):
-        playlist = self.spotify.playlist(url)
-        playlist_id = playlist["id"]
-        results = []
-        for item in playlist["tracks"]["items"]:
-            music_track = item["track"]
-            info = music_track["name"]
-            for artist in music_track["artists"]:
-                fetched = f' {artist["name"]}'
-                if "Various Artists" not in fetched:
-                    info += fetched
-            results.append(info)
-        return results, playlist_id
+        playlist_id = self._id(url, "playlist")
+
+        async def fetch():
+            path = f"playlists/{playlist_id}/tracks"
+            first = await self._api(path, limit=100)
+            items = await self._pages(path, first, 100, self._want)
+            # Removed and local tracks come back without a track object
+            return [
+                self._query(item["track"])
+                for item in items
+                if item.get("track") and item["track"].get("name")
+            ]
+
+        return await self._cached_list("playlist", playlist_id, fetch), playlist_id
 
     async def album(self, url):
-        album = self.spotify.album(url)
-        album_id = album["id"]
-        results = []
-        for item in album["tracks"]["items"]:
-            info = item["name"]
-            for artist in item["artists"]:
-                fetched = f' {artist["name"]}'
-                if "Various Artists" not in fetched:
-                    info += fetched
-            results.append(info)
-
-        return (
-            results,
-            album_id,
-        )
+        album_id = self._id(url, "album")
+
+        async def fetch():
+            path = f"albums/{album_id}/tracks"
+            first = await self._api(path, limit=50)
+            items = await self._pages(path, first, 50, self._want)
+            return [self._query(item) for item in items]
+
+        return await self._cached_list("album", album_id, fetch), album_id
 
     async def artist(self, url):
-        artistinfo = self.spotify.artist(url)
-        artist_id = artistinfo["id"]
-        results = []
-        artisttoptracks = self.spotify.artist_top_tracks(url)
-        for item in artisttoptracks["tracks"]:
-            info = item["name"]
-            for artist in item["artists"]:
-                fetched = f' {artist["name"]}'
-                if "Various Artists" not in fetched:
-                    info += fetched
-            results.append(info)
-
-        return results, artist_id
+        artist_id = self._id(url, "artist")
+
+        async def fetch():
+            data = await self._api(f"artists/{artist_id}/top-tracks", market="US")
+            return [self._query(item) for item in data["tracks"]]
+
+        return await self._cached_list("artist", artist_id, fetch), artist_id
@@ -26,7 +26,6 @@
 
 import asyncio
 import os
-import time
 from typing import Union
 
 from pyrogram.types import InlineKeyboardButton, InlineKeyboardMarkup, Voice
@@ -35,10 +34,11 @@ import config
 from DeadlineTech import app
 from DeadlineTech.utils.formatters import (
     check_duration,
-    convert_bytes,
     get_readable_time,
     seconds_to_min,
 )
+from DeadlineTech.utils.progress import ProgressReporter, download_text
+from DeadlineTech.utils.tgfetch import download as fetch_media, incomplete
 
 
 class TeleAPI:
@@ -118,76 +118,45 @@ class TeleAPI:
         return file_name
 
     async def download(self, _, message, mystic, fname):
-        lower = [0, 8, 17, 38, 64, 77, 96]
-        higher = [5, 10, 20, 40, 66, 80, 99]
-        checker = [5, 10, 20, 40, 66, 80, 99]
-        speed_counter = {}
-        if os.path.exists(fname):
+        if not incomplete(fname):
             return True
+        replied = message.reply_to_message
+        media = replied.audio or replied.voice or replied.video or replied.document
+        upl = InlineKeyboardMarkup(
+            [
+                [
+                    InlineKeyboardButton(
+                        text="ᴄᴀɴᴄᴇʟ",
+                        callback_data="stop_downloading",
+                    ),
+                ]
+            ]
+        )
 
         async def down_load():
+            report = ProgressReporter(
+                lambda text: mystic.edit_text(text, reply_markup=upl),
+                lambda report: download_text(_, report),
+            )
+
             async def progress(current, total):
-                if current == total:
-                    return
-                current_time = time.time()
-                start_time = speed_counter.get(message.id)
-                check_time = current_time - start_time
-                upl = InlineKeyboardMarkup(
-                    [
-                        [
-                            InlineKeyboardButton(
-                                text="ᴄᴀɴᴄᴇʟ",
-                                callback_data="stop_downloading",
-                            ),
-                        ]
-                    ]
-                )
-                percentage = current * 100 / total
-                percentage = str(round(percentage, 2))
-                speed = current / check_time
-                eta = int((total - current) / speed)
-                eta = get_readable_time(eta)
-                if not eta:
-                    eta = "0 sᴇᴄᴏɴᴅs"
-                total_size = convert_bytes(total)
-                completed_size = convert_bytes(current)
-                speed = convert_bytes(speed)
-                percentage = int((percentage.split("."))[0])
-                for counter in range(7):
-                    low = int(lower[counter])
-                    high = int(higher[counter])
-                    check = int(checker[counter])
-                    if low < percentage <= high:
-                        if high == check:
-                            try:
-                                await mystic.edit_text(
-                                    text=_["tg_1"].format(
-                                        app.mention,
-                                        total_size,
-                                        completed_size,
-                                        percentage[:5],
-                                        speed,
-                                        eta,
-                                    ),
-                                    reply_markup=upl,
-                                )
-                                checker[counter] = 100
-                            except:
-                                pass
-
-            speed_counter[message.id] = time.time()
+                report.update(current, total)
+
             try:
-                await app.download_media(
-                    message.reply_to_message,
-                    file_name=fname,
-                    progress=progress,
-                )
                 try:
-                    elapsed = get_readable_time(
-                        int(int(time.time()) - int(speed_counter[message.id]))
-                    )
-                except:
-                    elapsed = "0 sᴇᴄᴏɴᴅs"
+                    if media and media.file_size:
+                        await fetch_media(
+                            replied,
+                            media,
+                            fname,
+                            progress=progress,
+                            early=config.TG_EARLY_PLAYBACK_MB * 1024 * 1024,
+                        )
+                    else:
+                        await app.download_media(replied, file_name=fname, progress=progress)
+                finally:
+                    report.close()
+                elapsed = get_readable_time(int(report.elapsed)) or "0 sᴇᴄᴏɴᴅs"
                 await mystic.edit_text(_["tg_2"].format(elapsed))
             except:
                 await mystic.edit_text(_["tg_3"])
@@ -16,8 +16,11 @@ from pyrogram.types import Message
 from pyrogram.enums import MessageEntityType
 from youtubesearchpython.__future__ import VideosSearch
 
-from DeadlineTech.utils.database import is_on_off
+from DeadlineTech.utils.database import get_lang, is_on_off
+from DeadlineTech.utils.matchindex import track_matches
 from DeadlineTech.utils.formatters import time_to_seconds
+from DeadlineTech.utils.progress import ProgressReporter, youtube_download_text
+from strings import get_string
 
 
 async def fetch_stream_url(link: str, video: bool = False) -> str | None:
@@ -63,7 +66,7 @@ async def fetch_stream_url(link: str, video: bool = False) -> str | None:
     return None
 
 
-async def download_file(link: str, video: bool = False) -> str | None:
+async def download_file(link: str, video: bool = False, progress=None) -> str | None:
     try:
         video_id = link.split("v=")[-1].split("&")[0]
         if not video_id:
@@ -106,12 +109,17 @@ async def download_file(link: str, video: bool = False) -> str | None:
                         print(f"❌ Failed to download: HTTP {response.status}")
                         raise Exception(f"HTTP {response.status}")
 
+                    total = response.content_length or 0
+                    done = 0
                     with open(temp_path, "wb") as f:
                         while True:
                             chunk = await response.content.read(1024 * 1024)
                             if not chunk:
                                 break
                             f.write(chunk)
+                            done += len(chunk)
+                            if progress:
+                                progress(done, total)
 
             temp_path.rename(filepath)
             print(f"✅ Download completed: {filepath}")
@@ -240,7 +248,10 @@ class YouTubeAPI:
             link = self.base + link
         if "&" in link:
             link = link.split("&")[0]
-        results = VideosSearch(link, limit=1)
+        return await self._first_result(link)
+
+    async def _first_result(self, query: str):
+        results = VideosSearch(query, limit=1)
         for result in (await results.next())["result"]:
             title = result["title"]
             duration_min = result["duration"]
@@ -252,6 +263,21 @@ class YouTubeAPI:
                 duration_sec = int(time_to_seconds(duration_min))
         return title, duration_min, duration_sec, thumbnail, vidid
 
+    async def match(self, query: str, source: tuple = None, checked: bool = False):
+        """
+        ``details`` of the best search result for a track from another service
+        (Spotify, Apple Music...), answered from the match index when known.
+        ``source`` is the track's ("service", id), indexed along with the query,
+        ``checked`` when the caller already missed on it.
+        """
+        details = await track_matches.get(query, source, checked)
+        if details:
+            return details
+        # Not ``details``: track names may contain "&", which it cuts off as a url param
+        details = await self._first_result(query)
+        await track_matches.put(details, query, source)
+        return details
+
     async def title(self, link: str, videoid: Union[bool, str] = None):
         if videoid:
             link = self.base + link
@@ -419,7 +445,23 @@ class YouTubeAPI:
         thumbnail = result[query_type]["thumbnails"][0]["url"].split("?")[0]
         return title, duration_min, thumbnail, vidid
 
-    async def download(
+    async def download(self, link: str, mystic, *args, **kwargs):
+        report = None
+        if mystic:
+            try:
+                _ = get_string(await get_lang(mystic.chat.id))
+            except Exception:
+                _ = get_string("en")
+            report = ProgressReporter(
+                mystic.edit_text, lambda report: youtube_download_text(_, report)
+            )
+        try:
+            return await self._download(link, mystic, *args, report=report, **kwargs)
+        finally:
+            if report:
+                report.close()
+
+    async def _download(
         self,
         link: str,
         mystic,
@@ -429,10 +471,21 @@ class YouTubeAPI:
         songvideo: Union[bool, str] = None,
         format_id: Union[bool, str] = None,
         title: Union[bool, str] = None,
+        report: ProgressReporter = None,
     ) -> str:
         if videoid:
             link = self.base + link
         loop = asyncio.get_running_loop()
+        progress = report.update if report else None
+
+        def hook(status):
+            # Runs in the executor thread, ``update`` only stores the numbers
+            if report and status.get("status") == "downloading":
+                report.update(
+                    status.get("downloaded_bytes") or 0,
+                    status.get("total_bytes") or status.get("total_bytes_estimate") or 0,
+                )
+
         def audio_dl():
             cookie_file = cookie_txt_file()
             if not cookie_file:
@@ -446,6 +499,7 @@ class YouTubeAPI:
                 "quiet": True,
                 "cookiefile" : cookie_file,
                 "no_warnings": True,
+                "progress_hooks": [hook],
             }
             x = yt_dlp.YoutubeDL(ydl_optssx)
             info = x.extract_info(link, False)
@@ -468,6 +522,7 @@ class YouTubeAPI:
                 "quiet": True,
                 "cookiefile" : cookie_file,
                 "no_warnings": True,
+                "progress_hooks": [hook],
             }
             x = yt_dlp.YoutubeDL(ydl_optssx)
             info = x.extract_info(link, False)
@@ -525,15 +580,15 @@ class YouTubeAPI:
             x.download([link])
 
         if songvideo:
-            fpath = await download_file(link)
+            fpath = await download_file(link, progress=progress)
             return fpath
         elif songaudio:
-            fpath= await download_file(link)
+            fpath= await download_file(link, progress=progress)
             return fpath
         elif video:
             # Try video API first
             try:
-                downloaded_file = await download_file(link, video=True)
+                downloaded_file = await download_file(link, video=True, progress=progress)
                 if downloaded_file:
                     direct = True
                     return downloaded_file, direct
@@ -548,7 +603,7 @@ class YouTubeAPI:
                 
             if await is_on_off(1):
                 direct = True
-                downloaded_file = await download_file(link)
+                downloaded_file = await download_file(link, progress=progress)
             else:
                 proc = await asyncio.create_subprocess_exec(
                     "yt-dlp",
@@ -578,7 +633,7 @@ class YouTubeAPI:
         else:
             direct = True
             try:
-                downloaded_file = await download_file(link)
+                downloaded_file = await download_file(link, progress=progress)
                 if downloaded_file:
                     return downloaded_file, direct
             except Exception as e:
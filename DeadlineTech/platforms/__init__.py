@@ -1,5 +1,4 @@
 from .Apple import AppleAPI
-from .Carbon import CarbonAPI
 from .Resso import RessoAPI
 from .Soundcloud import SoundAPI
 from .Spotify import SpotifyAPI
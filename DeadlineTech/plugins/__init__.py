@@ -16,4 +16,17 @@ def __list_all_modules():
 
 
 ALL_MODULES = sorted(__list_all_modules())
-__all__ = ALL_MODULES + ["ALL_MODULES"]
+
+# Rarely used plugins imported on the first update they handle, see core/loader.py
+LAZY_MODULES = {
+    ".tools.dev": {
+        "commands": ["eval", "sh"],
+        "callbacks": ["runtime"],
+    },
+    ".tools.speedtest": {"commands": ["speedtest", "spt"]},
+    ".sudo.restart": {
+        "commands": ["getlog", "logs", "getlogs", "update", "gitpull", "restart"],
+    },
+}
+
+__all__ = ALL_MODULES + ["ALL_MODULES", "LAZY_MODULES"]
@@ -5,6 +5,7 @@ from pyrogram.types import Message
 
 from DeadlineTech import app
 from DeadlineTech.utils import extract_user, int_to_alpha
+from DeadlineTech.utils.admincache import add_auth_user, remove_auth_user
 from DeadlineTech.utils.database import (
     delete_authuser,
     get_authuser,
@@ -13,7 +14,7 @@ from DeadlineTech.utils.database import (
 )
 from DeadlineTech.utils.decorators import AdminActual, language
 from DeadlineTech.utils.inline import close_markup
-from config import BANNED_USERS, adminlist
+from config import BANNED_USERS
 
 
 @app.on_message(filters.command("auth") & filters.group & ~BANNED_USERS)
@@ -35,10 +36,7 @@ async def auth(client, message: Message, _):
             "admin_id": message.from_user.id,
             "admin_name": message.from_user.first_name,
         }
-        get = adminlist.get(message.chat.id)
-        if get:
-            if user.id not in get:
-                get.append(user.id)
+        add_auth_user(message.chat.id, user.id)
         await save_authuser(message.chat.id, token, assis)
         return await message.reply_text(_["auth_2"].format(user.mention))
     else:
@@ -54,10 +52,7 @@ async def unauthusers(client, message: Message, _):
     user = await extract_user(message)
     token = await int_to_alpha(user.id)
     deleted = await delete_authuser(message.chat.id, token)
-    get = adminlist.get(message.chat.id)
-    if get:
-        if user.id in get:
-            get.remove(user.id)
+    remove_auth_user(message.chat.id, user.id)
     if deleted:
         return await message.reply_text(_["auth_4"].format(user.mention))
     else:
@@ -10,6 +10,7 @@ from DeadlineTech.misc import db
 from DeadlineTech.utils.database import get_loop
 from DeadlineTech.utils.decorators import AdminRightsCheck
 from DeadlineTech.utils.inline import close_markup, stream_markup
+from DeadlineTech.utils.mediacache import reply_photo
 from DeadlineTech.utils.stream.autoclear import auto_clean
 from DeadlineTech.utils.thumbnails import get_thumb
 from config import BANNED_USERS
@@ -118,7 +119,8 @@ async def skip(cli, message: Message, _, chat_id):
             return await message.reply_text(_["call_6"])
         button = stream_markup(_, chat_id)
         img = await get_thumb(videoid)
-        run = await message.reply_photo(
+        run = await reply_photo(
+            message,
             photo=img,
             caption=_["stream_1"].format(
                 f"https://t.me/{app.username}?start=info_{videoid}",
@@ -151,7 +153,8 @@ async def skip(cli, message: Message, _, chat_id):
             return await mystic.edit_text(_["call_6"])
         button = stream_markup(_, chat_id)
         img = await get_thumb(videoid)
-        run = await message.reply_photo(
+        run = await reply_photo(
+            message,
             photo=img,
             caption=_["stream_1"].format(
                 f"https://t.me/{app.username}?start=info_{videoid}",
@@ -170,7 +173,8 @@ async def skip(cli, message: Message, _, chat_id):
         except:
             return await message.reply_text(_["call_6"])
         button = stream_markup(_, chat_id)
-        run = await message.reply_photo(
+        run = await reply_photo(
+            message,
             photo=config.STREAM_IMG_URL,
             caption=_["stream_2"].format(user),
             reply_markup=InlineKeyboardMarkup(button),
@@ -193,7 +197,8 @@ async def skip(cli, message: Message, _, chat_id):
             return await message.reply_text(_["call_6"])
         if videoid == "telegram":
             button = stream_markup(_, chat_id)
-            run = await message.reply_photo(
+            run = await reply_photo(
+                message,
                 photo=config.TELEGRAM_AUDIO_URL
                 if str(streamtype) == "audio"
                 else config.TELEGRAM_VIDEO_URL,
@@ -206,7 +211,8 @@ async def skip(cli, message: Message, _, chat_id):
             db[chat_id][0]["markup"] = "tg"
         elif videoid == "soundcloud":
             button = stream_markup(_, chat_id)
-            run = await message.reply_photo(
+            run = await reply_photo(
+                message,
                 photo=config.SOUNCLOUD_IMG_URL
                 if str(streamtype) == "audio"
                 else config.TELEGRAM_VIDEO_URL,
@@ -220,7 +226,8 @@ async def skip(cli, message: Message, _, chat_id):
         else:
             button = stream_markup(_, chat_id)
             img = await get_thumb(videoid)
-            run = await message.reply_photo(
+            run = await reply_photo(
+                message,
                 photo=img,
                 caption=_["stream_1"].format(
                     f"https://t.me/{app.username}?start=info_{videoid}",
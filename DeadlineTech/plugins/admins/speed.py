@@ -7,10 +7,11 @@ from DeadlineTech import app
 from DeadlineTech.core.call import Anony
 from DeadlineTech.misc import SUDOERS, db
 from DeadlineTech.utils import AdminRightsCheck
+from DeadlineTech.utils.admincache import is_admin
 from DeadlineTech.utils.database import is_active_chat, is_nonadmin_chat
 from DeadlineTech.utils.decorators.language import languageCB
 from DeadlineTech.utils.inline import close_markup, speed_markup
-from config import BANNED_USERS, adminlist
+from config import BANNED_USERS
 
 checker = []
 
@@ -50,12 +51,8 @@ async def del_back_playlist(client, CallbackQuery, _):
     is_non_admin = await is_nonadmin_chat(CallbackQuery.message.chat.id)
     if not is_non_admin:
         if CallbackQuery.from_user.id not in SUDOERS:
-            admins = adminlist.get(CallbackQuery.message.chat.id)
-            if not admins:
-                return await CallbackQuery.answer(_["admin_13"], show_alert=True)
-            else:
-                if CallbackQuery.from_user.id not in admins:
-                    return await CallbackQuery.answer(_["admin_14"], show_alert=True)
+            if not await is_admin(CallbackQuery.message.chat.id, CallbackQuery.from_user.id):
+                return await CallbackQuery.answer(_["admin_14"], show_alert=True)
     playing = db.get(chat_id)
     if not playing:
         return await CallbackQuery.answer(_["queue_2"], show_alert=True)
@@ -10,6 +10,7 @@ from DeadlineTech.utils import help_pannel
 from DeadlineTech.utils.database import get_lang
 from DeadlineTech.utils.decorators.language import LanguageStart, languageCB
 from DeadlineTech.utils.inline.help import help_back_markup, private_help_panel
+from DeadlineTech.utils.mediacache import reply_photo
 from config import BANNED_USERS, START_IMG_URL, SUPPORT_CHAT
 from strings import get_string, helpers
 
@@ -40,7 +41,8 @@ async def helper_private(
         language = await get_lang(update.chat.id)
         _ = get_string(language)
         keyboard = help_pannel(_)
-        await update.reply_photo(
+        await reply_photo(
+            update,
             photo=START_IMG_URL,
             caption=_["help_1"].format(SUPPORT_CHAT),
             reply_markup=keyboard,
@@ -5,46 +5,34 @@ from pyrogram.types import (
     InlineKeyboardMarkup,
     InlineQueryResultPhoto,
 )
-from youtubesearchpython.__future__ import VideosSearch
 
 from DeadlineTech import app
 from DeadlineTech.utils.inlinequery import answer
+from DeadlineTech.utils.inlinesearch import InlineSearch
 from config import BANNED_USERS
 
 
-@app.on_inline_query(~BANNED_USERS)
-async def inline_query_handler(client, query):
-    text = query.query.strip().lower()
-    answers = []
-    if text.strip() == "":
-        try:
-            await client.answer_inline_query(query.id, results=answer, cache_time=10)
-        except:
-            return
-    else:
-        a = VideosSearch(text, limit=20)
-        result = (await a.next()).get("result")
-        for x in range(15):
-            title = (result[x]["title"]).title()
-            duration = result[x]["duration"]
-            views = result[x]["viewCount"]["short"]
-            thumbnail = result[x]["thumbnails"][0]["url"].split("?")[0]
-            channellink = result[x]["channel"]["link"]
-            channel = result[x]["channel"]["name"]
-            link = result[x]["link"]
-            published = result[x]["publishedTime"]
-            description = f"{views} | {duration} ᴍɪɴᴜᴛᴇs | {channel}  | {published}"
-            buttons = InlineKeyboardMarkup(
-                [
-                    [
-                        InlineKeyboardButton(
-                            text="ʏᴏᴜᴛᴜʙᴇ 🎄",
-                            url=link,
-                        )
-                    ],
-                ]
-            )
-            searched_text = f"""
+def build_result(result: dict) -> InlineQueryResultPhoto:
+    title = (result["title"]).title()
+    duration = result["duration"]
+    views = result["viewCount"]["short"]
+    thumbnail = result["thumbnails"][0]["url"].split("?")[0]
+    channellink = result["channel"]["link"]
+    channel = result["channel"]["name"]
+    link = result["link"]
+    published = result["publishedTime"]
+    description = f"{views} | {duration} ᴍɪɴᴜᴛᴇs | {channel}  | {published}"
+    buttons = InlineKeyboardMarkup(
+        [
+            [
+                InlineKeyboardButton(
+                    text="ʏᴏᴜᴛᴜʙᴇ 🎄",
+                    url=link,
+                )
+            ],
+        ]
+    )
+    searched_text = f"""
 ❄ <b>ᴛɪᴛʟᴇ :</b> <a href={link}>{title}</a>
 
 ⏳ <b>ᴅᴜʀᴀᴛɪᴏɴ :</b> {duration} ᴍɪɴᴜᴛᴇs
@@ -54,17 +42,40 @@ async def inline_query_handler(client, query):
 
 
 <u><b>➻ ɪɴʟɪɴᴇ sᴇᴀʀᴄʜ ᴍᴏᴅᴇ ʙʏ {app.name}</b></u>"""
-            answers.append(
-                InlineQueryResultPhoto(
-                    photo_url=thumbnail,
-                    title=title,
-                    thumb_url=thumbnail,
-                    description=description,
-                    caption=searched_text,
-                    reply_markup=buttons,
-                )
-            )
+    return InlineQueryResultPhoto(
+        photo_url=thumbnail,
+        title=title,
+        thumb_url=thumbnail,
+        description=description,
+        caption=searched_text,
+        reply_markup=buttons,
+    )
+
+
+inline_search = InlineSearch(build_result)
+
+
+@app.on_inline_query(~BANNED_USERS)
+async def inline_query_handler(client, query):
+    text = inline_search.normalize(query.query)
+    if text == "":
         try:
-            return await client.answer_inline_query(query.id, results=answers)
+            await client.answer_inline_query(query.id, results=answer, cache_time=10)
+        except:
+            return
+    else:
+        answers, exact = inline_search.cached(text)
+        if answers is None:
+            if not await inline_search.debounce(query.from_user.id):
+                return
+            try:
+                answers, exact = await inline_search.search(text), True
+            except:
+                return
+        try:
+            # Telegram may serve its own copy of exact results for a while
+            return await client.answer_inline_query(
+                query.id, results=answers, cache_time=300 if exact else 30
+            )
         except:
             return
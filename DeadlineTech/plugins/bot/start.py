@@ -22,6 +22,7 @@ from DeadlineTech.utils.database import (
 from DeadlineTech.utils.decorators.language import LanguageStart
 from DeadlineTech.utils.formatters import get_readable_time
 from DeadlineTech.utils.inline import help_pannel, private_panel, start_panel
+from DeadlineTech.utils.mediacache import reply_photo
 from config import BANNED_USERS
 from strings import get_string
 
@@ -34,7 +35,8 @@ async def start_pm(client, message: Message, _):
         name = message.text.split(None, 1)[1]
         if name[0:4] == "help":
             keyboard = help_pannel(_)
-            return await message.reply_photo(
+            return await reply_photo(
+                message,
                 photo=config.START_IMG_URL,
                 caption=_["help_1"].format(config.SUPPORT_CHAT),
                 reply_markup=keyboard,
@@ -86,7 +88,8 @@ async def start_pm(client, message: Message, _):
                 )
     else:
         out = private_panel(_)
-        await message.reply_photo(
+        await reply_photo(
+            message,
             photo=config.START_IMG_URL,
             caption=_["start_2"].format(message.from_user.mention, app.mention),
             reply_markup=InlineKeyboardMarkup(out),
@@ -103,7 +106,8 @@ async def start_pm(client, message: Message, _):
 async def start_gp(client, message: Message, _):
     out = start_panel(_)
     uptime = int(time.time() - _boot_)
-    await message.reply_photo(
+    await reply_photo(
+        message,
         photo=config.START_IMG_URL,
         caption=_["start_1"].format(app.mention, get_readable_time(uptime)),
         reply_markup=InlineKeyboardMarkup(out),
@@ -138,7 +142,8 @@ async def welcome(client, message: Message):
                     return await app.leave_chat(message.chat.id)
 
                 out = start_panel(_)
-                await message.reply_photo(
+                await reply_photo(
+                    message,
                     photo=config.START_IMG_URL,
                     caption=_["start_3"].format(
                         message.from_user.first_name,
@@ -7,6 +7,7 @@ from pyrogram.enums import ChatType
 
 import config
 from DeadlineTech import app
+from DeadlineTech.core.lifecycle import on_startup
 from DeadlineTech.utils.database import get_client, is_active_chat
 
 # Set up logging
@@ -76,4 +77,4 @@ async def auto_leave():
         logger.info("Cleanup complete. Sleeping again until next 4:35 AM.")
 
 # Start the background auto leave task
-asyncio.create_task(auto_leave())
+on_startup(auto_leave)
@@ -4,27 +4,25 @@
 # ==========================================================
 
 
-import time
 import logging
-import asyncio
 
 from pyrogram import filters
-from pyrogram.enums import ChatMembersFilter, ChatMembersFilter
-from pyrogram.errors import FloodWait, RPCError
 from pyrogram.types import Message
 
 from DeadlineTech import app
+from DeadlineTech.core.lifecycle import on_startup
 from DeadlineTech.misc import SUDOERS
 from DeadlineTech.utils.database import (
-    get_active_chats,
-    get_authuser_names,
-    get_client,
-    get_served_chats,
-    get_served_users,
+    count_served_chats,
+    count_served_users,
+    get_fanout_jobs,
+    iter_served_chats,
+    iter_served_users,
+    remove_fanout_job,
 )
 from DeadlineTech.utils.decorators.language import language
-from DeadlineTech.utils.formatters import alpha_to_int
-from config import adminlist
+from DeadlineTech.utils.fanout import AdaptiveFanOut, running
+from DeadlineTech.utils.progress import ProgressReporter
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s - [%(levelname)s] - %(message)s",
@@ -32,35 +30,161 @@ logging.basicConfig(
 )
 logger = logging.getLogger("Broadcast")
 
-SEMAPHORE = asyncio.Semaphore(10)
+JOB_ID = "broadcast"
+USERS, CHATS = 0, 1
+CONTROLS = ("-status", "-pause", "-resume", "-cancel")
+
+
+async def broadcast_targets(scope: str, cursor):
+    phase, after = cursor if cursor else (USERS, None)
+    if scope in ("all", "users") and phase == USERS:
+        async for user_id in iter_served_users(after=after):
+            yield (USERS, user_id)
+        after = None
+    if scope in ("all", "chats"):
+        async for chat_id in iter_served_chats(after=after):
+            yield (CHATS, chat_id)
+
+
+async def prepare_payload(state: dict):
+    """Resolve the broadcast content once and return a sender for a single target."""
+    if state.get("text"):
+        text = state["text"]
+        return lambda chat_id: app.send_message(chat_id, text)
+
+    from_chat, message_id = state["from_chat"], state["message_id"]
+    if state["mode"] == "forward":
+        return lambda chat_id: app.forward_messages(chat_id, from_chat, message_id)
+
+    content = await app.get_messages(from_chat, message_id)
+    if content.text:
+        text, entities = content.text, content.entities
+        return lambda chat_id: app.send_message(
+            chat_id, text, entities=entities, reply_markup=content.reply_markup
+        )
+    media = getattr(content, content.media.value, None) if content.media else None
+    file_id = getattr(media, "file_id", None)
+    if file_id:
+        caption, entities = content.caption or "", content.caption_entities
+        return lambda chat_id: app.send_cached_media(
+            chat_id,
+            file_id,
+            caption=caption,
+            caption_entities=entities,
+            reply_markup=content.reply_markup,
+        )
+    return lambda chat_id: content.copy(chat_id)
+
+
+def progress_text(job) -> str:
+    state = job.state
+    status = "⏸ Paused" if job.held else "📤 Sending"
+    return (
+        f"📢 <b>Broadcast {status}</b>\n\n"
+        f"➤ Mode: <code>{state['mode']}</code>\n"
+        f"📦 Progress: <code>{job.processed}/{state['total']}</code>\n"
+        f"👤 Users Sent: <code>{state['users']}</code>\n"
+        f"👥 Chats Sent: <code>{state['chats']}</code>\n"
+        f"❌ Failed: <code>{job.failed}</code>\n"
+        f"⚡ Rate: <code>{job.bucket.rate:.0f}/s</code>"
+    )
+
+
+async def run_broadcast(state: dict):
+    send = await prepare_payload(state)
+    cursor = tuple(state["cursor"]) if state.get("cursor") else None
+
+    async def deliver(target):
+        phase, chat_id = target
+        await send(chat_id)
+        job.state["users" if phase == USERS else "chats"] += 1
+
+    report = ProgressReporter(
+        lambda text: app.edit_message_text(state["chat_id"], state["status"], text),
+        lambda report: progress_text(job),
+    )
+
+    async def progress(job):
+        report.update(job.processed, state["total"])
+
+    job = AdaptiveFanOut(
+        JOB_ID,
+        "broadcast",
+        broadcast_targets(state["scope"], cursor),
+        deliver,
+        state=state,
+        on_progress=progress,
+        progress_every=10,
+        retries=1,
+    )
+    try:
+        await job.run()
+    finally:
+        report.close()
+    state = job.state
+    title = "🛑 <b>Broadcast Cancelled</b>" if job.cancelled else "✅ <b>Broadcast Completed</b>"
+    await app.send_message(
+        state["chat_id"],
+        f"{title}\n\n"
+        f"➤ Mode: <code>{state['mode']}</code>\n"
+        f"👤 Users Sent: <code>{state['users']}</code>\n"
+        f"👥 Chats Sent: <code>{state['chats']}</code>\n"
+        f"📦 Total Delivered: <code>{state['users'] + state['chats']}</code>\n"
+        f"❌ Failed: <code>{job.failed}</code>",
+    )
+
+
+async def broadcast_control(message: Message, command: str):
+    job = running.get(JOB_ID)
+    if not job:
+        return await message.reply_text("⚠ No broadcast is running.")
+    if command == "-pause":
+        job.pause()
+        await job.save()
+    elif command == "-resume":
+        job.resume()
+        await job.save()
+    elif command == "-cancel":
+        job.cancel()
+        return await message.reply_text("🛑 Cancelling the broadcast...")
+    await message.reply_text(progress_text(job))
+
 
 @app.on_message(filters.command("broadcast") & SUDOERS)
 async def broadcast_command(client, message: Message):
+    # Only a lone flag is a control, a broadcast text may mention them
+    if len(message.command) == 2 and message.command[1].lower() in CONTROLS:
+        return await broadcast_control(message, message.command[1].lower())
     command = message.text.lower()
+    if JOB_ID in running:
+        return await message.reply_text(
+            "⚠ A broadcast is already running.\n"
+            "Use /broadcast -status/-pause/-resume/-cancel to manage it."
+        )
     mode = "forward" if "-forward" in command else "copy"
 
     if "-all" in command:
-        users = await get_served_users()
-        chats = await get_served_chats()
-        target_users = [u["user_id"] for u in users]
-        target_chats = [c["chat_id"] for c in chats]
+        scope = "all"
     elif "-users" in command:
-        users = await get_served_users()
-        target_users = [u["user_id"] for u in users]
-        target_chats = []
+        scope = "users"
     elif "-chats" in command:
-        chats = await get_served_chats()
-        target_users = []
-        target_chats = [c["chat_id"] for c in chats]
+        scope = "chats"
     else:
-        return await message.reply_text("❗ Usage:\n/broadcast -all/-users/-chats [-forward]")
+        return await message.reply_text(
+            "❗ Usage:\n/broadcast -all/-users/-chats [-forward]\n"
+            "/broadcast -status/-pause/-resume/-cancel"
+        )
 
+    target_users = await count_served_users() if scope != "chats" else 0
+    target_chats = await count_served_chats() if scope != "users" else 0
     if not target_users and not target_chats:
         return await message.reply_text("⚠ No recipients found.")
 
+    state = {"mode": mode, "scope": scope, "users": 0, "chats": 0}
     # Get content
     if message.reply_to_message:
-        content = message.reply_to_message
+        state["from_chat"] = message.chat.id
+        state["message_id"] = message.reply_to_message.id
     else:
         text = message.text
         for kw in ["/broadcast", "-forward", "-all", "-users", "-chats"]:
@@ -68,83 +192,30 @@ async def broadcast_command(client, message: Message):
         text = text.strip()
         if not text:
             return await message.reply_text("📝 Provide a message or reply to one.")
-        content = text
-
-    total = len(target_users + target_chats)
-    sent_users = 0
-    sent_chats = 0
-    failed = 0
+        state["text"] = text
 
-    await message.reply_text(
+    total = target_users + target_chats
+    status = await message.reply_text(
         f"📢 <b>Broadcast Started</b>\n\n"
         f"➤ Mode: <code>{mode}</code>\n"
-        f"👤 Users: <code>{len(target_users)}</code>\n"
-        f"👥 Chats: <code>{len(target_chats)}</code>\n"
+        f"👤 Users: <code>{target_users}</code>\n"
+        f"👥 Chats: <code>{target_chats}</code>\n"
         f"📦 Total: <code>{total}</code>\n"
         f"⏳ Please wait while messages are being sent..."
     )
+    state.update(chat_id=message.chat.id, status=status.id, total=total)
+    await run_broadcast(state)
 
-    async def deliver(chat_id, is_user, retries=1):
-        nonlocal sent_users, sent_chats, failed
-        async with SEMAPHORE:
-            try:
-                if isinstance(content, str):
-                    await app.send_message(chat_id, content)
-                elif mode == "forward":
-                    await app.forward_messages(chat_id, message.chat.id, [content.id])
-                else:
-                    await content.copy(chat_id)
-                if is_user:
-                    sent_users += 1
-                else:
-                    sent_chats += 1
-            except FloodWait as e:
-                await asyncio.sleep(min(e.value, 60))
-                if retries > 0:
-                    return await deliver(chat_id, is_user, retries - 1)
-                failed += 1
-            except RPCError:
-                failed += 1
-            except Exception:
-                failed += 1
-
-    targets = [(uid, True) for uid in target_users] + [(cid, False) for cid in target_chats]
-    for i in range(0, len(targets), 100):
-        batch = targets[i:i + 100]
-        await asyncio.gather(*[deliver(chat_id, is_user) for chat_id, is_user in batch])
-        await asyncio.sleep(1.5)
-
-    await message.reply_text(
-        f"✅ <b>Broadcast Completed</b>\n\n"
-        f"➤ Mode: <code>{mode}</code>\n"
-        f"👤 Users Sent: <code>{sent_users}</code>\n"
-        f"👥 Chats Sent: <code>{sent_chats}</code>\n"
-        f"📦 Total Delivered: <code>{sent_users + sent_chats}</code>\n"
-        f"❌ Failed: <code>{failed}</code>"
-    )
 
-
-async def auto_clean():
-    while True:
-        await asyncio.sleep(10)
+async def resume_broadcasts():
+    for state in await get_fanout_jobs("broadcast"):
+        state.pop("_id", None)
+        logger.info(f"Resuming broadcast after {state.get('cursor')}")
         try:
-            chats = await get_active_chats()
-            for chat_id in chats:
-                if chat_id not in adminlist:
-                    adminlist[chat_id] = []
-
-                # use the proper enum here 👇
-                async for member in app.get_chat_members(
-                    chat_id, filter=ChatMembersFilter.ADMINISTRATORS
-                ):
-                    # some admins may not have .privileges (older Telegram versions)
-                    if getattr(member, "privileges", None) and member.privileges.can_manage_video_chats:
-                        adminlist[chat_id].append(member.user.id)
-
-                # add authorised helper‑users
-                for username in await get_authuser_names(chat_id):
-                    user_id = await alpha_to_int(username)
-                    adminlist[chat_id].append(user_id)
-
+            await run_broadcast(state)
         except Exception as e:
-            logger.warning(f"AutoClean error: {e}")
+            logger.warning(f"Unable to resume broadcast, dropping it: {e}")
+            await remove_fanout_job(JOB_ID)
+
+
+on_startup(resume_broadcasts)
@@ -2,6 +2,7 @@
 
 import asyncio
 
+from DeadlineTech.core.lifecycle import on_startup
 from DeadlineTech.misc import db
 from DeadlineTech.utils.database import get_active_chats, is_music_playing
 
@@ -23,4 +24,4 @@ async def timer():
             db[chat_id][0]["played"] += 1
 
 
-asyncio.create_task(timer())
+on_startup(timer)
@@ -23,6 +23,7 @@ from DeadlineTech.utils.inline import (
     track_markup,
 )
 from DeadlineTech.utils.logger import play_logs
+from DeadlineTech.utils.mediacache import reply_photo
 from DeadlineTech.utils.stream.stream import stream
 from config import BANNED_USERS, lyrical
 
@@ -363,7 +364,8 @@ async def play_commnd(
                 "f" if fplay else "d",
             )
             await mystic.delete()
-            await message.reply_photo(
+            await reply_photo(
+                message,
                 photo=img,
                 caption=cap,
                 reply_markup=InlineKeyboardMarkup(buttons),
@@ -381,7 +383,8 @@ async def play_commnd(
                     "f" if fplay else "d",
                 )
                 await mystic.delete()
-                await message.reply_photo(
+                await reply_photo(
+                    message,
                     photo=details["thumb"],
                     caption=_["play_10"].format(
                         details["title"].title(),
@@ -399,7 +402,8 @@ async def play_commnd(
                     "f" if fplay else "d",
                 )
                 await mystic.delete()
-                await message.reply_photo(
+                await reply_photo(
+                    message,
                     photo=img,
                     caption=cap,
                     reply_markup=InlineKeyboardMarkup(buttons),
@@ -0,0 +1,37 @@
+import time
+
+from pyrogram import filters
+from pyrogram.types import Message
+
+from DeadlineTech import app
+from DeadlineTech.core.mongo import query_audit
+from DeadlineTech.misc import SUDOERS
+from DeadlineTech.utils.formatters import get_readable_time
+
+
+@app.on_message(filters.command(["dbaudit", "querystats"]) & SUDOERS)
+async def db_audit(client, message: Message):
+    if len(message.command) == 2 and message.command[1].lower() == "reset":
+        query_audit.reset()
+        return await message.reply_text("🧹 <b>Query audit counters have been reset.</b>")
+
+    rows = query_audit.snapshot()
+    if not rows:
+        return await message.reply_text("📭 <b>No database operations recorded yet.</b>")
+
+    window = get_readable_time(int(time.time() - query_audit.since)) or "0s"
+    text = (
+        f"<b>📊 MongoDB Query Audit</b>\n"
+        f"<i>Last {window}, slow threshold {query_audit.slow_ms}ms</i>\n\n"
+    )
+    for coll, op, count, avg, peak, errors in rows[:25]:
+        text += (
+            f"<b>{coll}</b>.<code>{op}</code> » {count} ops, "
+            f"avg <code>{avg:.1f}ms</code>, max <code>{peak:.1f}ms</code>"
+        )
+        if errors:
+            text += f", {errors} failed"
+        text += "\n"
+    if len(rows) > 25:
+        text += f"\n<i>…and {len(rows) - 25} more</i>"
+    await message.reply_text(text)
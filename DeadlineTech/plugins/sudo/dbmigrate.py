@@ -0,0 +1,43 @@
+from pyrogram import filters
+from pyrogram.types import Message
+
+import config
+from DeadlineTech import app
+from DeadlineTech.core.localdb import copy_database
+from DeadlineTech.core.mongo import connect_local, connect_mongo, mongodb
+
+
+@app.on_message(filters.command(["dbmigrate"]) & filters.user(config.OWNER_ID))
+async def db_migrate(client, message: Message):
+    usage = "<b>Usage :</b>\n/dbmigrate [local | mongo]"
+    if len(message.command) != 2:
+        return await message.reply_text(usage)
+    target = message.command[1].lower()
+    if target not in ("local", "mongo"):
+        return await message.reply_text(usage)
+    if target == config.DATABASE_BACKEND:
+        return await message.reply_text(
+            f"» The bot is already running on the <b>{target}</b> backend."
+        )
+    if target == "mongo" and not config.MONGO_DB_URI:
+        return await message.reply_text("» Set <code>MONGO_DB_URI</code> before migrating to MongoDB.")
+
+    mystic = await message.reply_text(
+        f"📦 <b>Copying all collections to the {target} backend...</b>"
+    )
+    destination = connect_local() if target == "local" else connect_mongo()
+    try:
+        copied = await copy_database(mongodb, destination)
+    except Exception as e:
+        return await mystic.edit_text(f"❌ <b>Migration failed</b>\n<code>{e}</code>")
+    finally:
+        if target == "local":
+            destination.close()
+
+    text = f"<b>✅ Migrated to {target}</b>\n\n"
+    for name, total in sorted(copied.items()):
+        text += f"<b>{name}</b> » {total}\n"
+    text += (
+        f"\nSet <code>DATABASE_BACKEND={target}</code> and restart the bot to switch over."
+    )
+    await mystic.edit_text(text)
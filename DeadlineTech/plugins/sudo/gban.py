@@ -1,23 +1,96 @@
-import asyncio
-
 from pyrogram import filters
-from pyrogram.errors import FloodWait
 from pyrogram.types import Message
 
+import config
 from DeadlineTech import app
+from DeadlineTech.core.lifecycle import on_startup, spawn
+from DeadlineTech.logging import LOGGER
 from DeadlineTech.misc import SUDOERS
 from DeadlineTech.utils import get_readable_time
 from DeadlineTech.utils.database import (
     add_banned_user,
+    count_served_chats,
     get_banned_count,
     get_banned_users,
-    get_served_chats,
+    get_fanout_jobs,
+    get_lang,
     is_banned_user,
+    iter_served_chats,
     remove_banned_user,
 )
 from DeadlineTech.utils.decorators.language import language
 from DeadlineTech.utils.extraction import extract_user
+from DeadlineTech.utils.fanout import FanOut, running
 from config import BANNED_USERS
+from strings import get_string
+
+
+async def run_ban_fanout(kind: str, state: dict):
+    _ = get_string(await get_lang(state["chat_id"]))
+    user_id = state["user_id"]
+    action = app.ban_chat_member if kind == "gban" else app.unban_chat_member
+
+    async def apply(chat_id):
+        await action(chat_id, user_id)
+
+    async def progress(job: FanOut):
+        await app.edit_message_text(
+            state["chat_id"],
+            state["mystic"],
+            _["gban_13"].format(
+                state["user_mention"], job.processed, state["total"], job.failed
+            ),
+        )
+
+    job = FanOut(
+        f"{kind}:{user_id}",
+        kind,
+        iter_served_chats(after=state.get("cursor")),
+        apply,
+        state=state,
+        on_progress=progress,
+    )
+    await job.run()
+    if job.cancelled:
+        # The opposite command took over and posts its own progress
+        try:
+            await app.delete_messages(state["chat_id"], state["mystic"])
+        except:
+            pass
+        return
+    if kind == "gban":
+        text = _["gban_6"].format(
+            app.mention,
+            state["chat_title"],
+            state["chat_id"],
+            state["user_mention"],
+            user_id,
+            state["from_mention"],
+            job.done,
+        )
+    else:
+        text = _["gban_9"].format(state["user_mention"], job.done)
+    await app.send_message(state["chat_id"], text)
+    try:
+        await app.delete_messages(state["chat_id"], state["mystic"])
+    except:
+        pass
+
+
+async def start_ban_fanout(kind: str, message: Message, user, mystic_text: str):
+    total = await count_served_chats()
+    time_expected = get_readable_time(int(total / config.FANOUT_RATE) + 1)
+    mystic = await message.reply_text(mystic_text.format(user.mention, time_expected))
+    state = {
+        "user_id": user.id,
+        "user_mention": user.mention,
+        "chat_id": message.chat.id,
+        "chat_title": message.chat.title,
+        "from_mention": message.from_user.mention,
+        "mystic": mystic.id,
+        "total": total,
+    }
+    spawn(f"{kind}:{user.id}", run_ban_fanout(kind, state))
 
 
 @app.on_message(filters.command(["gban", "globalban"]) & SUDOERS)
@@ -38,34 +111,11 @@ async def global_ban(client, message: Message, _):
         return await message.reply_text(_["gban_4"].format(user.mention))
     if user.id not in BANNED_USERS:
         BANNED_USERS.add(user.id)
-    served_chats = []
-    chats = await get_served_chats()
-    for chat in chats:
-        served_chats.append(int(chat["chat_id"]))
-    time_expected = get_readable_time(len(served_chats))
-    mystic = await message.reply_text(_["gban_5"].format(user.mention, time_expected))
-    number_of_chats = 0
-    for chat_id in served_chats:
-        try:
-            await app.ban_chat_member(chat_id, user.id)
-            number_of_chats += 1
-        except FloodWait as fw:
-            await asyncio.sleep(int(fw.value))
-        except:
-            continue
+    pending = running.get(f"ungban:{user.id}")
+    if pending:
+        pending.cancel()
     await add_banned_user(user.id)
-    await message.reply_text(
-        _["gban_6"].format(
-            app.mention,
-            message.chat.title,
-            message.chat.id,
-            user.mention,
-            user.id,
-            message.from_user.mention,
-            number_of_chats,
-        )
-    )
-    await mystic.delete()
+    await start_ban_fanout("gban", message, user, _["gban_5"])
 
 
 @app.on_message(filters.command(["ungban"]) & SUDOERS)
@@ -80,24 +130,11 @@ async def global_un(client, message: Message, _):
         return await message.reply_text(_["gban_7"].format(user.mention))
     if user.id in BANNED_USERS:
         BANNED_USERS.remove(user.id)
-    served_chats = []
-    chats = await get_served_chats()
-    for chat in chats:
-        served_chats.append(int(chat["chat_id"]))
-    time_expected = get_readable_time(len(served_chats))
-    mystic = await message.reply_text(_["gban_8"].format(user.mention, time_expected))
-    number_of_chats = 0
-    for chat_id in served_chats:
-        try:
-            await app.unban_chat_member(chat_id, user.id)
-            number_of_chats += 1
-        except FloodWait as fw:
-            await asyncio.sleep(int(fw.value))
-        except:
-            continue
+    pending = running.get(f"gban:{user.id}")
+    if pending:
+        pending.cancel()
     await remove_banned_user(user.id)
-    await message.reply_text(_["gban_9"].format(user.mention, number_of_chats))
-    await mystic.delete()
+    await start_ban_fanout("ungban", message, user, _["gban_8"])
 
 
 @app.on_message(filters.command(["gbannedusers", "gbanlist"]) & SUDOERS)
@@ -123,3 +160,14 @@ async def gbanned_list(client, message: Message, _):
         return await mystic.edit_text(_["gban_10"])
     else:
         return await mystic.edit_text(msg)
+
+
+async def resume_ban_fanouts():
+    for kind in ("gban", "ungban"):
+        for state in await get_fanout_jobs(kind):
+            state.pop("_id", None)
+            LOGGER(__name__).info(f"Resuming {state['job_id']} after {state.get('cursor')}")
+            spawn(state["job_id"], run_ban_fanout(kind, state))
+
+
+on_startup(resume_ban_fanouts)
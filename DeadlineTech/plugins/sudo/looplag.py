@@ -0,0 +1,54 @@
+import time
+from html import escape
+
+from pyrogram import filters
+from pyrogram.types import Message
+
+from DeadlineTech import app
+from DeadlineTech.core.lifecycle import on_startup
+from DeadlineTech.misc import SUDOERS
+from DeadlineTech.utils.formatters import get_readable_time
+from DeadlineTech.utils.watchdog import watchdog
+
+
+@app.on_message(filters.command(["looplag", "blocking"]) & SUDOERS)
+async def loop_lag(client, message: Message):
+    arg = message.command[1].lower() if len(message.command) == 2 else None
+    if arg == "reset":
+        watchdog.reset()
+        return await message.reply_text("🧹 <b>Loop watchdog counters have been reset.</b>")
+
+    if arg and arg.isdigit():
+        entry = watchdog.offender(int(arg))
+        if entry is None:
+            return await message.reply_text("📭 <b>No such offender.</b>")
+        where, offender = entry
+        return await message.reply_text(
+            f"<b>🐢 {escape(where)}</b>\n"
+            f"<i>Worst stall {offender.max:.0f}ms, innermost frame {escape(offender.inner)}</i>\n\n"
+            f"<pre>{escape(offender.stack[-3500:])}</pre>",
+            disable_web_page_preview=True,
+        )
+
+    window = get_readable_time(int(time.time() - watchdog.since)) or "0s"
+    text = f"<b>🐢 Event Loop Watchdog</b>\n<i>Last {window}, threshold {watchdog.threshold * 1000:.0f}ms</i>\n\n"
+    for label, seconds in (("1 min", 60), ("5 min", 300)):
+        avg, worst, p95 = watchdog.lag(seconds)
+        text += (
+            f"<b>Lag {label} :</b> avg <code>{avg:.1f}ms</code>, "
+            f"p95 <code>{p95:.1f}ms</code>, max <code>{worst:.0f}ms</code>\n"
+        )
+    text += f"<b>Stalls :</b> {watchdog.stalls} at {len(watchdog.offenders)} locations\n"
+    top = watchdog.top(10)
+    if top:
+        text += "\n<b>Worst offenders :</b>\n"
+        for index, (where, offender) in enumerate(top, 1):
+            text += (
+                f"{index}. <code>{escape(where)}</code> » {offender.count}×, "
+                f"total <code>{offender.total / 1000:.1f}s</code>, max <code>{offender.max:.0f}ms</code>\n"
+            )
+        text += "\n<i>Use /looplag [n] for the stack of an offender.</i>"
+    await message.reply_text(text, disable_web_page_preview=True)
+
+
+on_startup(watchdog.run)
@@ -0,0 +1,41 @@
+import time
+from html import escape
+
+from pyrogram import filters
+from pyrogram.types import Message
+
+from DeadlineTech import app
+from DeadlineTech.core.lifecycle import on_startup
+from DeadlineTech.misc import SUDOERS
+from DeadlineTech.utils.database import count_track_matches, top_track_matches
+from DeadlineTech.utils.formatters import get_readable_time
+from DeadlineTech.utils.matchindex import track_matches
+
+
+@app.on_message(filters.command(["matchstats", "matches"]) & SUDOERS)
+async def match_stats(client, message: Message):
+    await track_matches.flush()
+    stats = track_matches.stats
+    window = get_readable_time(int(time.time() - track_matches.since)) or "0s"
+    text = (
+        f"<b>🎯 Track Match Index</b>\n"
+        f"<i>Last {window}</i>\n\n"
+        f"<b>Hit rate :</b> <code>{track_matches.hit_rate:.1f}%</code>\n"
+        f"<b>From memory :</b> {stats['memory']}\n"
+        f"<b>From database :</b> {stats['database']}\n"
+        f"<b>Searched :</b> {stats['misses']}\n"
+        f"<b>Stored matches :</b> {await count_track_matches()} "
+        f"({len(track_matches)} in memory)\n"
+    )
+    top = await top_track_matches(10)
+    if top:
+        text += "\n<b>Most played :</b>\n"
+        for match in top:
+            text += (
+                f"{match.get('hits', 0)} » <code>{escape(match['key'][:40])}</code>"
+                f" → {escape(match['title'][:40])}\n"
+            )
+    await message.reply_text(text, disable_web_page_preview=True)
+
+
+on_startup(track_matches.maintain)
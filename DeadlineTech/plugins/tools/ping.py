@@ -5,9 +5,12 @@ from pyrogram.types import Message
 
 from DeadlineTech import app
 from DeadlineTech.core.call import Anony
+from DeadlineTech.core.lifecycle import on_startup
 from DeadlineTech.utils import bot_sys_stats
 from DeadlineTech.utils.decorators.language import language
 from DeadlineTech.utils.inline import supp_markup
+from DeadlineTech.utils.mediacache import reply_photo
+from DeadlineTech.utils.sys import sampler, stats_history
 from config import BANNED_USERS, PING_IMG_URL
 
 
@@ -15,7 +18,8 @@ from config import BANNED_USERS, PING_IMG_URL
 @language
 async def ping_com(client, message: Message, _):
     start = datetime.now()
-    response = await message.reply_photo(
+    response = await reply_photo(
+        message,
         photo=PING_IMG_URL,
         caption=_["ping_1"].format(app.mention),
     )
@@ -23,6 +27,15 @@ async def ping_com(client, message: Message, _):
     UP, CPU, RAM, DISK = await bot_sys_stats()
     resp = (datetime.now() - start).microseconds / 1000
     await response.edit_text(
-        _["ping_2"].format(resp, app.mention, UP, RAM, CPU, DISK, pytgping),
+        _["ping_2"].format(resp, app.mention, UP, RAM, CPU, DISK, pytgping)
+        + "\n\n"
+        + stats_history(_),
         reply_markup=supp_markup(_),
     )
+
+
+async def sample_stats():
+    await sampler.run(Anony.pings)
+
+
+on_startup(sample_stats)
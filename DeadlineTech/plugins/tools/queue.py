@@ -2,21 +2,20 @@ import asyncio
 import os
 
 from pyrogram import filters
-from pyrogram.errors import FloodWait
 from pyrogram.types import CallbackQuery, InputMediaPhoto, Message
 
 import config
 from DeadlineTech import app
+from DeadlineTech.core.lifecycle import on_startup
 from DeadlineTech.misc import db
 from DeadlineTech.utils import AnonyBin, get_channeplayCB, seconds_to_min
-from DeadlineTech.utils.database import get_cmode, is_active_chat, is_music_playing
+from DeadlineTech.utils.database import get_cmode, is_active_chat
 from DeadlineTech.utils.decorators.language import language, languageCB
 from DeadlineTech.utils.inline import queue_back_markup, queue_markup
+from DeadlineTech.utils.mediacache import edit_photo, reply_photo
+from DeadlineTech.utils.nowplaying import now_playing
 from config import BANNED_USERS
 
-basic = {}
-
-
 def get_image(videoid):
     if os.path.isfile(f"cache/{videoid}.png"):
         return f"cache/{videoid}.png"
@@ -35,6 +34,17 @@ def get_duration(playing):
         return "Inline"
 
 
+def follow(_, chat_id: int, panel, cplay: str, videoid: str):
+    """Keeps the timer of a queue panel running until its track ends."""
+    now_playing.subscribe(
+        chat_id,
+        panel,
+        videoid,
+        ("queue", _["QU_B_2"], cplay, videoid),
+        lambda played, dur: queue_markup(_, "Inline", cplay, videoid, played, dur),
+    )
+
+
 @app.on_message(
     filters.command(["queue", "cqueue", "player", "cplayer", "playing", "cplaying"])
     & filters.group
@@ -96,35 +106,9 @@ async def get_queue(client, message: Message, _):
             got[0]["dur"],
         )
     )
-    basic[videoid] = True
-    mystic = await message.reply_photo(IMAGE, caption=cap, reply_markup=upl)
+    mystic = await reply_photo(message, IMAGE, caption=cap, reply_markup=upl)
     if DUR != "Unknown":
-        try:
-            while db[chat_id][0]["vidid"] == videoid:
-                await asyncio.sleep(5)
-                if await is_active_chat(chat_id):
-                    if basic[videoid]:
-                        if await is_music_playing(chat_id):
-                            try:
-                                buttons = queue_markup(
-                                    _,
-                                    DUR,
-                                    "c" if cplay else "g",
-                                    videoid,
-                                    seconds_to_min(db[chat_id][0]["played"]),
-                                    db[chat_id][0]["dur"],
-                                )
-                                await mystic.edit_reply_markup(reply_markup=buttons)
-                            except FloodWait:
-                                pass
-                        else:
-                            pass
-                    else:
-                        break
-                else:
-                    break
-        except:
-            return
+        follow(_, chat_id, mystic, "c" if cplay else "g", videoid)
 
 
 @app.on_callback_query(filters.regex("GetTimer") & ~BANNED_USERS)
@@ -153,13 +137,13 @@ async def queued_tracks(client, CallbackQuery: CallbackQuery, _):
     if len(got) == 1:
         return await CallbackQuery.answer(_["queue_5"], show_alert=True)
     await CallbackQuery.answer()
-    basic[videoid] = False
+    now_playing.unsubscribe(chat_id, CallbackQuery.message)
     buttons = queue_back_markup(_, what)
-    med = InputMediaPhoto(
-        media="https://telegra.ph//file/6f7d35131f69951c74ee5.jpg",
+    await edit_photo(
+        CallbackQuery,
+        "https://telegra.ph//file/6f7d35131f69951c74ee5.jpg",
         caption=_["queue_1"],
     )
-    await CallbackQuery.edit_message_media(media=med)
     j = 0
     msg = ""
     for x in got:
@@ -236,34 +220,9 @@ async def queue_back(client, CallbackQuery: CallbackQuery, _):
             got[0]["dur"],
         )
     )
-    basic[videoid] = True
-
-    med = InputMediaPhoto(media=IMAGE, caption=cap)
-    mystic = await CallbackQuery.edit_message_media(media=med, reply_markup=upl)
+    mystic = await edit_photo(CallbackQuery, IMAGE, caption=cap, reply_markup=upl)
     if DUR != "Unknown":
-        try:
-            while db[chat_id][0]["vidid"] == videoid:
-                await asyncio.sleep(5)
-                if await is_active_chat(chat_id):
-                    if basic[videoid]:
-                        if await is_music_playing(chat_id):
-                            try:
-                                buttons = queue_markup(
-                                    _,
-                                    DUR,
-                                    cplay,
-                                    videoid,
-                                    seconds_to_min(db[chat_id][0]["played"]),
-                                    db[chat_id][0]["dur"],
-                                )
-                                await mystic.edit_reply_markup(reply_markup=buttons)
-                            except FloodWait:
-                                pass
-                        else:
-                            pass
-                    else:
-                        break
-                else:
-                    break
-        except:
-            return
+        follow(_, chat_id, mystic, cplay, videoid)
+
+
+on_startup(now_playing.run)
@@ -2,18 +2,21 @@ import asyncio
 import time
 
 from pyrogram import filters
-from pyrogram.enums import ChatMembersFilter
-from pyrogram.types import CallbackQuery, Message
+from pyrogram.enums import ChatMemberStatus
+from pyrogram.types import CallbackQuery, ChatMemberUpdated, Message
 
 from DeadlineTech import app
 from DeadlineTech.core.call import Anony
 from DeadlineTech.misc import db
-from DeadlineTech.utils.database import get_assistant, get_authuser_names, get_cmode
+from DeadlineTech.utils.admincache import forget_admins, reload_admins, set_admin
+from DeadlineTech.utils.database import get_assistant, get_cmode
 from DeadlineTech.utils.decorators import ActualAdminCB, AdminActual, language
-from DeadlineTech.utils.formatters import alpha_to_int, get_readable_time
-from config import BANNED_USERS, adminlist, lyrical
+from DeadlineTech.utils.formatters import get_readable_time
+from DeadlineTech.utils.membercache import member_updated
+from config import BANNED_USERS, lyrical
 
 rel = {}
+admin_watch = 15
 
 
 @app.on_message(
@@ -29,16 +32,7 @@ async def reload_admin_cache(client, message: Message, _):
             if saved > time.time():
                 left = get_readable_time((int(saved) - int(time.time())))
                 return await message.reply_text(_["reload_1"].format(left))
-        adminlist[message.chat.id] = []
-        async for user in app.get_chat_members(
-            message.chat.id, filter=ChatMembersFilter.ADMINISTRATORS
-        ):
-            if user.privileges.can_manage_video_chats:
-                adminlist[message.chat.id].append(user.user.id)
-        authusers = await get_authuser_names(message.chat.id)
-        for user in authusers:
-            user_id = await alpha_to_int(user)
-            adminlist[message.chat.id].append(user_id)
+        await reload_admins(message.chat.id)
         now = int(time.time()) + 180
         rel[message.chat.id] = now
         await message.reply_text(_["reload_2"])
@@ -46,6 +40,26 @@ async def reload_admin_cache(client, message: Message, _):
         await message.reply_text(_["reload_3"])
 
 
+@app.on_chat_member_updated(filters.group, group=admin_watch)
+async def admin_cache_watcher(client, update: ChatMemberUpdated):
+    member = update.new_chat_member or update.old_chat_member
+    if not member or not member.user:
+        return
+    new = update.new_chat_member
+    member_updated(update.chat.id, member.user.id, new.status if new else None)
+    if member.user.id == app.id and (
+        not new or new.status in (ChatMemberStatus.LEFT, ChatMemberStatus.BANNED)
+    ):
+        return forget_admins(update.chat.id)
+    allowed = bool(
+        new
+        and new.status in (ChatMemberStatus.ADMINISTRATOR, ChatMemberStatus.OWNER)
+        and new.privileges
+        and new.privileges.can_manage_video_chats
+    )
+    set_admin(update.chat.id, member.user.id, allowed)
+
+
 @app.on_message(filters.command(["reboot"]) & filters.group & ~BANNED_USERS)
 @AdminActual
 async def restartbot(client, message: Message, _):
@@ -86,6 +100,25 @@ async def restartbot(client, message: Message, _):
     return await mystic.edit_text(_["reload_5"].format(app.mention))
 
 
+@app.on_callback_query(filters.regex("forceclose"))
+async def forceclose_command(_, CallbackQuery):
+    callback_data = CallbackQuery.data.strip()
+    callback_request = callback_data.split(None, 1)[1]
+    query, user_id = callback_request.split("|")
+    if CallbackQuery.from_user.id != int(user_id):
+        try:
+            return await CallbackQuery.answer(
+                "» ɪᴛ'ʟʟ ʙᴇ ʙᴇᴛᴛᴇʀ ɪғ ʏᴏᴜ sᴛᴀʏ ɪɴ ʏᴏᴜʀ ʟɪᴍɪᴛs ʙᴀʙʏ.", show_alert=True
+            )
+        except:
+            return
+    await CallbackQuery.message.delete()
+    try:
+        await CallbackQuery.answer()
+    except:
+        return
+
+
 @app.on_callback_query(filters.regex("close") & ~BANNED_USERS)
 async def close_menu(_, CallbackQuery):
     try:
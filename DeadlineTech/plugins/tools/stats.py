@@ -5,7 +5,7 @@ import psutil
 from pyrogram import __version__ as pyrover
 from pyrogram import filters
 from pyrogram.errors import MessageIdInvalid
-from pyrogram.types import InputMediaPhoto, Message
+from pyrogram.types import Message
 from pytgcalls.__version__ import __version__ as pytgver
 
 import config
@@ -16,6 +16,8 @@ from DeadlineTech.plugins import ALL_MODULES
 from DeadlineTech.utils.database import get_served_chats, get_served_users, get_sudoers
 from DeadlineTech.utils.decorators.language import language, languageCB
 from DeadlineTech.utils.inline.stats import back_stats_buttons, stats_buttons
+from DeadlineTech.utils.mediacache import edit_photo, reply_photo
+from DeadlineTech.utils.sys import stats_history
 from config import BANNED_USERS
 
 
@@ -23,7 +25,8 @@ from config import BANNED_USERS
 @language
 async def stats_global(client, message: Message, _):
     upl = stats_buttons(_, True if message.from_user.id in SUDOERS else False)
-    await message.reply_photo(
+    await reply_photo(
+        message,
         photo=config.STATS_IMG_URL,
         caption=_["gstats_2"].format(app.mention),
         reply_markup=upl,
@@ -61,13 +64,17 @@ async def overall_stats(client, CallbackQuery, _):
         len(ALL_MODULES),
         len(SUDOERS),
         config.DURATION_LIMIT_MIN,
-    )
-    med = InputMediaPhoto(media=config.STATS_IMG_URL, caption=text)
+    ) + "\n\n" + stats_history(_)
     try:
-        await CallbackQuery.edit_message_media(media=med, reply_markup=upl)
+        await edit_photo(
+            CallbackQuery, config.STATS_IMG_URL, caption=text, reply_markup=upl
+        )
     except MessageIdInvalid:
-        await CallbackQuery.message.reply_photo(
-            photo=config.STATS_IMG_URL, caption=text, reply_markup=upl
+        await reply_photo(
+            CallbackQuery.message,
+            photo=config.STATS_IMG_URL,
+            caption=text,
+            reply_markup=upl,
         )
 
 
@@ -125,10 +132,14 @@ async def bot_stats(client, CallbackQuery, _):
         call["collections"],
         call["objects"],
     )
-    med = InputMediaPhoto(media=config.STATS_IMG_URL, caption=text)
     try:
-        await CallbackQuery.edit_message_media(media=med, reply_markup=upl)
+        await edit_photo(
+            CallbackQuery, config.STATS_IMG_URL, caption=text, reply_markup=upl
+        )
     except MessageIdInvalid:
-        await CallbackQuery.message.reply_photo(
-            photo=config.STATS_IMG_URL, caption=text, reply_markup=upl
+        await reply_photo(
+            CallbackQuery.message,
+            photo=config.STATS_IMG_URL,
+            caption=text,
+            reply_markup=upl,
         )
@@ -0,0 +1,126 @@
+import asyncio
+import time
+
+from pyrogram.enums import ChatMembersFilter
+
+import config
+from DeadlineTech import app
+from DeadlineTech.logging import LOGGER
+from DeadlineTech.utils.database import get_authuser_names
+from DeadlineTech.utils.formatters import alpha_to_int
+from config import adminlist
+
+# adminlist[chat_id] is the set of users allowed to control playback (admins + auth users).
+# _admins keeps the real admins apart so demotions never drop an auth user and vice versa.
+_admins = {}
+_auths = {}
+_expiry = {}
+_loading = {}
+# (chat_id, user_id) -> (expiry, allowed) of live rights checks, see can_manage_calls
+_rights = {}
+
+
+def _publish(chat_id: int):
+    adminlist[chat_id] = _admins.get(chat_id, set()) | _auths.get(chat_id, set())
+
+
+def _evict():
+    if len(_expiry) <= config.ADMIN_CACHE_SIZE:
+        return
+    now = time.time()
+    stale = [chat_id for chat_id, expiry in _expiry.items() if expiry <= now]
+    if len(_expiry) - len(stale) > config.ADMIN_CACHE_SIZE:
+        oldest = sorted(_expiry, key=_expiry.get)
+        stale += oldest[: len(_expiry) - len(stale) - config.ADMIN_CACHE_SIZE]
+    for chat_id in stale:
+        forget_admins(chat_id)
+
+
+async def _load(chat_id: int):
+    admins = set()
+    async for member in app.get_chat_members(
+        chat_id, filter=ChatMembersFilter.ADMINISTRATORS
+    ):
+        if member.privileges and member.privileges.can_manage_video_chats:
+            admins.add(member.user.id)
+    auths = {await alpha_to_int(name) for name in await get_authuser_names(chat_id)}
+    _admins[chat_id] = admins
+    _auths[chat_id] = auths
+    _expiry[chat_id] = time.time() + config.ADMIN_CACHE_TTL
+    _publish(chat_id)
+    _evict()
+
+
+async def reload_admins(chat_id: int) -> set:
+    """Refetch admins and auth users of a chat, concurrent callers share one fetch."""
+    task = _loading.get(chat_id)
+    if task is None:
+        task = _loading[chat_id] = asyncio.ensure_future(_load(chat_id))
+        task.add_done_callback(lambda _: _loading.pop(chat_id, None))
+    await asyncio.shield(task)
+    return adminlist[chat_id]
+
+
+async def get_admins(chat_id: int) -> set:
+    if _expiry.get(chat_id, 0) <= time.time():
+        try:
+            await reload_admins(chat_id)
+        except Exception as e:
+            LOGGER(__name__).warning(f"Unable to load admins of {chat_id}: {e}")
+    return adminlist.get(chat_id, set())
+
+
+async def is_admin(chat_id: int, user_id: int) -> bool:
+    return user_id in await get_admins(chat_id)
+
+
+async def can_manage_calls(chat_id: int, user_id: int) -> bool:
+    """
+    Asks Telegram whether ``user_id`` may manage video chats, for admin-only
+    commands. Unlike the admin list a demotion counts within seconds even if
+    its member update never reaches us, errors count as no.
+    """
+    key = (chat_id, user_id)
+    now = time.time()
+    entry = _rights.get(key)
+    if entry and entry[0] > now:
+        return entry[1]
+    try:
+        member = await app.get_chat_member(chat_id, user_id)
+    except Exception:
+        return False
+    allowed = bool(member.privileges and member.privileges.can_manage_video_chats)
+    set_admin(chat_id, user_id, allowed)
+    if len(_rights) >= config.ADMIN_CACHE_SIZE:
+        for stale in [k for k, (expiry, _) in _rights.items() if expiry <= now]:
+            del _rights[stale]
+    _rights[key] = (now + config.ADMIN_CHECK_TTL, allowed)
+    return allowed
+
+
+def set_admin(chat_id: int, user_id: int, allowed: bool):
+    _rights.pop((chat_id, user_id), None)
+    if chat_id not in _expiry:
+        return
+    if allowed:
+        _admins[chat_id].add(user_id)
+    else:
+        _admins[chat_id].discard(user_id)
+    _publish(chat_id)
+
+
+def add_auth_user(chat_id: int, user_id: int):
+    if chat_id in _expiry:
+        _auths[chat_id].add(user_id)
+        _publish(chat_id)
+
+
+def remove_auth_user(chat_id: int, user_id: int):
+    if chat_id in _expiry:
+        _auths[chat_id].discard(user_id)
+        _publish(chat_id)
+
+
+def forget_admins(chat_id: int):
+    for store in (_admins, _auths, _expiry, adminlist):
+        store.pop(chat_id, None)
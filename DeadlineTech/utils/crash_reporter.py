@@ -1,26 +1,21 @@
 # Powered By DeadlineTech
 
 import asyncio
-from traceback import format_exc
-from pyrogram.errors import RPCError
+from html import escape
+from traceback import format_exception
 
-from DeadlineTech import app
-from config import LOGGER_ID  # Logger group ID
+from DeadlineTech.utils.logsink import CRASH, log_sink
 
 async def notify_logger_about_crash(error: Exception):
+    # Built from the error itself, the loop exception handler runs outside any except block
+    trace = "".join(format_exception(type(error), error, error.__traceback__))
     error_text = (
         "🚨 <b><u>Bot Crash Alert</u></b>\n\n"
-        f"<b>Error:</b> <code>{str(error)}</code>\n\n"
-        f"<b>Traceback:</b>\n<pre>{format_exc()}</pre>"
+        f"<b>Error:</b> <code>{escape(str(error)[:300])}</code>\n\n"
+        f"<b>Traceback:</b>\n<pre>{escape(trace[-2500:])}</pre>"
     )
-    try:
-        await app.send_message(
-            chat_id=LOGGER_ID,
-            text=error_text,
-            disable_web_page_preview=True
-        )
-    except RPCError:
-        pass
+    # Identical crashes in one digest are posted once with a repeat count
+    log_sink.emit(error_text, CRASH, key=f"{type(error).__name__}:{error}:{trace[-300:]}")
 
 def logger_alert_on_crash(func):
     async def wrapper(client, *args, **kwargs):
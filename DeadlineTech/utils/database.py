@@ -3,8 +3,11 @@ import asyncio
 from datetime import date
 from typing import Dict, List, Union
 
+from pymongo.errors import DuplicateKeyError, OperationFailure
+
 from DeadlineTech import userbot
 from DeadlineTech.core.mongo import mongodb
+from DeadlineTech.logging import LOGGER
 
 authdb = mongodb.adminauth
 authuserdb = mongodb.authuser
@@ -17,8 +20,11 @@ chatsdb = mongodb.chats
 chatdb = mongodb.chat
 channeldb = mongodb.cplaymode
 countdb = mongodb.upcount
+fanoutdb = mongodb.fanoutjobs
 gbansdb = mongodb.gban
 langdb = mongodb.language
+mediadb = mongodb.mediaids
+matchdb = mongodb.trackmatches
 onoffdb = mongodb.onoffper
 playmodedb = mongodb.playmode
 playtypedb = mongodb.playtypedb
@@ -26,6 +32,57 @@ skipdb = mongodb.skipmode
 sudoersdb = mongodb.sudoers
 usersdb = mongodb.tgusersdb
 
+# (collection, key, unique) - every hot lookup below filters on one of these
+INDEXES = [
+    (authdb, "chat_id", True),
+    (authuserdb, "chat_id", True),
+    (autoenddb, "chat_id", False),
+    (autoleavedb, "chat_id", False),
+    (assdb, "chat_id", True),
+    (blacklist_chatdb, "chat_id", True),
+    (blockeddb, "user_id", True),
+    (chatsdb, "chat_id", True),
+    (channeldb, "chat_id", True),
+    (countdb, "chat_id", True),
+    (fanoutdb, "job_id", True),
+    (gbansdb, "user_id", True),
+    (langdb, "chat_id", True),
+    (mediadb, "key", True),
+    (matchdb, "key", True),
+    (matchdb, "hits", False),
+    (matchdb, "expires", False),
+    (onoffdb, "on_off", True),
+    (playmodedb, "chat_id", True),
+    (playtypedb, "chat_id", True),
+    (skipdb, "chat_id", True),
+    (sudoersdb, "sudo", True),
+    (usersdb, "user_id", True),
+]
+
+
+async def ensure_indexes():
+    for collection, key, unique in INDEXES:
+        try:
+            await collection.create_index(key, unique=unique, background=True)
+        except OperationFailure as e:
+            if not unique:
+                LOGGER(__name__).warning(
+                    f"Unable to index {collection.name}.{key}: {e}"
+                )
+                continue
+            # Older deployments may already hold duplicates, keep lookups fast anyway
+            LOGGER(__name__).warning(
+                f"Duplicate {key} values in {collection.name}, creating a non-unique index instead."
+            )
+            try:
+                await collection.create_index(key, background=True)
+            except OperationFailure as e:
+                LOGGER(__name__).warning(
+                    f"Unable to index {collection.name}.{key}: {e}"
+                )
+    LOGGER(__name__).info("📇 Database indexes are in place.")
+
+
 # Shifting to memory [mongo sucks often]
 active = []
 activevideo = []
@@ -483,11 +540,29 @@ async def get_served_users() -> list:
     return users_list
 
 
+async def iter_served_users(after: int = None, page: int = 500):
+    while True:
+        query = {"$gt": after if after is not None else 0}
+        users = await usersdb.find({"user_id": query}).sort("user_id", 1).limit(page).to_list(page)
+        for user in users:
+            yield user["user_id"]
+        if len(users) < page:
+            return
+        after = users[-1]["user_id"]
+
+
+async def count_served_users() -> int:
+    return await usersdb.count_documents({"user_id": {"$gt": 0}})
+
+
 async def add_served_user(user_id: int):
     is_served = await is_served_user(user_id)
     if is_served:
         return
-    return await usersdb.insert_one({"user_id": user_id})
+    try:
+        return await usersdb.insert_one({"user_id": user_id})
+    except DuplicateKeyError:
+        return
 
 
 async def get_served_chats() -> list:
@@ -497,6 +572,24 @@ async def get_served_chats() -> list:
     return chats_list
 
 
+async def iter_served_chats(after: int = None, page: int = 500):
+    # Keyset pages instead of one long-lived cursor, so slow consumers never hit a cursor timeout
+    while True:
+        query = {"$lt": 0}
+        if after is not None:
+            query["$gt"] = after
+        chats = await chatsdb.find({"chat_id": query}).sort("chat_id", 1).limit(page).to_list(page)
+        for chat in chats:
+            yield chat["chat_id"]
+        if len(chats) < page:
+            return
+        after = chats[-1]["chat_id"]
+
+
+async def count_served_chats() -> int:
+    return await chatsdb.count_documents({"chat_id": {"$lt": 0}})
+
+
 async def is_served_chat(chat_id: int) -> bool:
     chat = await chatsdb.find_one({"chat_id": chat_id})
     if not chat:
@@ -508,7 +601,10 @@ async def add_served_chat(chat_id: int):
     is_served = await is_served_chat(chat_id)
     if is_served:
         return
-    return await chatsdb.insert_one({"chat_id": chat_id})
+    try:
+        return await chatsdb.insert_one({"chat_id": chat_id})
+    except DuplicateKeyError:
+        return
 
 
 async def blacklisted_chats() -> list:
@@ -666,3 +762,61 @@ async def remove_banned_user(user_id: int):
     if not is_gbanned:
         return
     return await blockeddb.delete_one({"user_id": user_id})
+
+
+async def save_fanout_job(job_id: str, job: dict):
+    await fanoutdb.update_one({"job_id": job_id}, {"$set": job}, upsert=True)
+
+
+async def get_fanout_jobs(kind: str = None) -> list:
+    query = {"kind": kind} if kind else {}
+    return [job async for job in fanoutdb.find(query)]
+
+
+async def remove_fanout_job(job_id: str):
+    await fanoutdb.delete_one({"job_id": job_id})
+
+
+async def get_media_id(key: str) -> Union[tuple, None]:
+    media = await mediadb.find_one({"key": key})
+    if not media:
+        return None
+    return media["file_id"], media.get("version")
+
+
+async def save_media_id(key: str, file_id: str, version: str = None):
+    await mediadb.update_one(
+        {"key": key}, {"$set": {"file_id": file_id, "version": version}}, upsert=True
+    )
+
+
+async def remove_media_id(key: str):
+    await mediadb.delete_one({"key": key})
+
+
+async def get_track_matches(keys: list) -> list:
+    return [match async for match in matchdb.find({"key": {"$in": keys}}, {"_id": 0})]
+
+
+async def save_track_match(key: str, match: dict):
+    await matchdb.update_one(
+        {"key": key}, {"$set": match, "$setOnInsert": {"hits": 0}}, upsert=True
+    )
+
+
+async def add_track_match_hits(key: str, hits: int):
+    await matchdb.update_one({"key": key}, {"$inc": {"hits": hits}})
+
+
+async def remove_expired_track_matches(now: float) -> int:
+    result = await matchdb.delete_many({"expires": {"$lte": now}})
+    return result.deleted_count
+
+
+async def top_track_matches(limit: int) -> list:
+    cursor = matchdb.find({}, {"_id": 0}).sort("hits", -1).limit(limit)
+    return await cursor.to_list(limit)
+
+
+async def count_track_matches() -> int:
+    return await matchdb.count_documents({})
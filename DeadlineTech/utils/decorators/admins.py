@@ -6,7 +6,6 @@ from pyrogram.types import InlineKeyboardButton, InlineKeyboardMarkup
 from DeadlineTech import app
 from DeadlineTech.misc import SUDOERS, db
 from DeadlineTech.utils.database import (
-    get_authuser_names,
     get_cmode,
     get_lang,
     get_upvote_count,
@@ -15,9 +14,10 @@ from DeadlineTech.utils.database import (
     is_nonadmin_chat,
     is_skipmode,
 )
-from config import SUPPORT_CHAT, adminlist, confirmer, LOGGER_ID as LOG_CHANNEL_ID
+from config import SUPPORT_CHAT, confirmer
 from strings import get_string
-from ..formatters import int_to_alpha
+from ..admincache import can_manage_calls, is_admin
+from ..logsink import ADMIN, log_sink
 
 logger = logging.getLogger(__name__)
 
@@ -32,10 +32,7 @@ async def log_admin_action(chat_id, user_id, reason, action=None):
         f"<b>Time:</b> <code>{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</code>"
     )
     logger.warning(msg.replace("<b>", "").replace("</b>", ""))
-    try:
-        await app.send_message(LOG_CHANNEL_ID, msg)
-    except Exception as e:
-        logger.warning(f"Failed to send log to channel: {e}")
+    log_sink.emit(msg, ADMIN)
 
 def AdminRightsCheck(mystic):
     async def wrapper(client, message):
@@ -85,8 +82,7 @@ def AdminRightsCheck(mystic):
 
             if not await is_nonadmin_chat(message.chat.id):
                 if message.from_user.id not in SUDOERS:
-                    admins = adminlist.get(message.chat.id)
-                    if not admins or message.from_user.id not in admins:
+                    if not await is_admin(message.chat.id, message.from_user.id):
                         if await is_skipmode(message.chat.id):
                             upvote = await get_upvote_count(chat_id)
                             command = message.command[0].lstrip("c").lower()
@@ -162,13 +158,8 @@ def AdminActual(mystic):
                 )
 
             if message.from_user.id not in SUDOERS:
-                try:
-                    member = await app.get_chat_member(message.chat.id, message.from_user.id)
-                    if not member.privileges or not member.privileges.can_manage_video_chats:
-                        await log_admin_action(message.chat.id, message.from_user.id, "No permission to manage video chats")
-                        return await message.reply_text(_["general_4"])
-                except:
-                    await log_admin_action(message.chat.id, message.from_user.id, "Error fetching member privileges")
+                if not await can_manage_calls(message.chat.id, message.from_user.id):
+                    await log_admin_action(message.chat.id, message.from_user.id, "No permission to manage video chats")
                     return await message.reply_text(_["general_4"])
 
             return await mystic(client, message, _)
@@ -198,22 +189,10 @@ def ActualAdminCB(mystic):
                 return await mystic(client, CallbackQuery, _)
 
             if not await is_nonadmin_chat(CallbackQuery.message.chat.id):
-                try:
-                    privileges = (
-                        await app.get_chat_member(
-                            CallbackQuery.message.chat.id,
-                            CallbackQuery.from_user.id
-                        )
-                    ).privileges
-                    if not privileges or not privileges.can_manage_video_chats:
-                        if CallbackQuery.from_user.id not in SUDOERS:
-                            token = await int_to_alpha(CallbackQuery.from_user.id)
-                            if token not in await get_authuser_names(CallbackQuery.from_user.id):
-                                await log_admin_action(CallbackQuery.message.chat.id, CallbackQuery.from_user.id, "No CB admin rights", CallbackQuery.data)
-                                return await CallbackQuery.answer(_["general_4"], show_alert=True)
-                except:
-                    await log_admin_action(CallbackQuery.message.chat.id, CallbackQuery.from_user.id, "Error fetching CB member")
-                    return await CallbackQuery.answer(_["general_4"], show_alert=True)
+                if CallbackQuery.from_user.id not in SUDOERS:
+                    if not await is_admin(CallbackQuery.message.chat.id, CallbackQuery.from_user.id):
+                        await log_admin_action(CallbackQuery.message.chat.id, CallbackQuery.from_user.id, "No CB admin rights", CallbackQuery.data)
+                        return await CallbackQuery.answer(_["general_4"], show_alert=True)
 
             return await mystic(client, CallbackQuery, _)
         except Exception as e:
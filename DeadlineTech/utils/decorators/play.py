@@ -11,6 +11,8 @@ import traceback
 from pyrogram.enums import ChatMemberStatus
 from pyrogram.errors import (
     ChatAdminRequired,
+    InviteHashExpired,
+    InviteHashInvalid,
     InviteRequestSent,
     UserAlreadyParticipant,
     UserNotParticipant,
@@ -21,6 +23,7 @@ from pyrogram.types import InlineKeyboardButton, InlineKeyboardMarkup
 
 from DeadlineTech import YouTube, app
 from DeadlineTech.misc import SUDOERS
+from DeadlineTech.utils.admincache import is_admin
 from DeadlineTech.utils.database import (
     get_assistant,
     get_cmode,
@@ -31,7 +34,17 @@ from DeadlineTech.utils.database import (
     is_maintenance,
 )
 from DeadlineTech.utils.inline import botplaylist_markup
-from config import PLAYLIST_IMG_URL, SUPPORT_CHAT, adminlist
+from DeadlineTech.utils.mediacache import reply_photo
+from DeadlineTech.utils.membercache import (
+    assistant_status,
+    bot_status,
+    forget_invite_link,
+    get_invite_link,
+    set_invite_link,
+    set_present,
+    timed,
+)
+from config import PLAYLIST_IMG_URL, SUPPORT_CHAT
 from strings import get_string
 
 logger = logging.getLogger(__name__)
@@ -40,8 +53,6 @@ logging.basicConfig(
     format='[%(asctime)s] [%(levelname)s] - %(message)s',
 )
 
-links = {}
-
 def PlayWrapper(command):
     async def wrapper(client, message):
         try:
@@ -75,7 +86,8 @@ def PlayWrapper(command):
                 if len(message.command) < 2:
                     if "stream" in message.command:
                         return await message.reply_text(_["str_1"])
-                    return await message.reply_photo(
+                    return await reply_photo(
+                        message,
                         photo=PLAYLIST_IMG_URL,
                         caption=_["play_18"],
                         reply_markup=InlineKeyboardMarkup(botplaylist_markup(_)),
@@ -98,8 +110,7 @@ def PlayWrapper(command):
             playmode = await get_playmode(message.chat.id)
             playty = await get_playtype(message.chat.id)
             if playty != "Everyone" and message.from_user.id not in SUDOERS:
-                admins = adminlist.get(message.chat.id)
-                if not admins or message.from_user.id not in admins:
+                if not await is_admin(message.chat.id, message.from_user.id):
                     return await message.reply_text(_["play_4"])
 
             is_video = (
@@ -108,9 +119,12 @@ def PlayWrapper(command):
             )
             fplay = True if message.command[0][-1] == "e" else None
 
+            checks = []
             try:
-                bot_member = await app.get_chat_member(chat_id, (await app.get_me()).id)
-                if bot_member.status != ChatMemberStatus.ADMINISTRATOR:
+                with timed("bot_status") as check:
+                    status = await bot_status(chat_id)
+                checks.append(check)
+                if status != ChatMemberStatus.ADMINISTRATOR:
                     return await message.reply_text("❌ Please promote the bot to admin to use music features.")
             except Exception as e:
                 logger.warning(f"Couldn't check bot admin status: {e}")
@@ -118,8 +132,10 @@ def PlayWrapper(command):
             if not await is_active_chat(chat_id):
                 userbot = await get_assistant(chat_id)
                 try:
-                    member = await app.get_chat_member(chat_id, userbot.id)
-                    if member.status in [ChatMemberStatus.BANNED, ChatMemberStatus.RESTRICTED]:
+                    with timed("assistant_status") as check:
+                        status = await assistant_status(chat_id, userbot.id)
+                    checks.append(check)
+                    if status in [ChatMemberStatus.BANNED, ChatMemberStatus.RESTRICTED]:
                         return await message.reply_text(
                             _["call_2"].format(app.mention, userbot.id, userbot.name, userbot.username)
                         )
@@ -127,14 +143,16 @@ def PlayWrapper(command):
                     return await message.reply_text("❌ Bot must be admin to check assistant's membership status.")
                 except UserNotParticipant:
                     logger.info(f"Assistant not in chat: {chat_id}")
-                    invite_link = links.get(chat_id)
+                    invite_link = get_invite_link(chat_id)
 
                     if not invite_link:
                         if message.chat.username:
                             invite_link = message.chat.username
                         else:
                             try:
-                                invite_link = await app.export_chat_invite_link(chat_id)
+                                with timed("invite_link") as check:
+                                    invite_link = await app.export_chat_invite_link(chat_id)
+                                checks.append(check)
                             except ChatAdminRequired:
                                 return await message.reply_text(_["call_1"])
                             except Exception as e:
@@ -146,10 +164,17 @@ def PlayWrapper(command):
                     if invite_link.startswith("https://t.me/+"):
                         invite_link = invite_link.replace("https://t.me/+", "https://t.me/joinchat/")
 
-                    links[chat_id] = invite_link
+                    set_invite_link(chat_id, invite_link)
                     msg = await message.reply_text(_["call_4"].format(app.mention))
                     try:
                         await userbot.join_chat(invite_link)
+                        set_present(chat_id, userbot.id)
+                    except (InviteHashExpired, InviteHashInvalid) as e:
+                        # A revoked link must not be served from the cache again
+                        forget_invite_link(chat_id)
+                        return await message.reply_text(
+                            f"🚫 <b>RPC Error:</b> <code>{type(e).__name__}</code>"
+                        )
                     except InviteRequestSent:
                         try:
                             await app.approve_chat_join_request(chat_id, userbot.id)
@@ -158,8 +183,9 @@ def PlayWrapper(command):
                             return await message.reply_text(_["call_3"].format(app.mention, type(e).__name__))
                         await asyncio.sleep(3)
                         await msg.edit(_["call_5"].format(app.mention))
+                        set_present(chat_id, userbot.id)
                     except UserAlreadyParticipant:
-                        pass
+                        set_present(chat_id, userbot.id)
                     except ChannelsTooMuch:
                         try:
                             chat_title = (await app.get_chat(chat_id)).title
@@ -185,7 +211,8 @@ def PlayWrapper(command):
                         )
 
             logger.info(
-                f"▶️ A Song is played by {message.from_user.id} in {chat_id}"
+                f"▶️ A Song is played by {message.from_user.id} in {chat_id} "
+                f"(checks: {', '.join(f'{c.name} {c.ms:.0f}ms' for c in checks) or 'none'})"
             )
 
             return await command(
@@ -0,0 +1,275 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, Optional
+
+from pyrogram.errors import FloodWait
+
+import config
+from DeadlineTech.logging import LOGGER
+from DeadlineTech.utils.database import remove_fanout_job, save_fanout_job
+
+# job_id -> FanOut, for every job currently running in this process
+running = {}
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        self.rate = rate
+        self.capacity = burst or max(1, int(rate))
+        self._tokens = float(self.capacity)
+        self._stamp = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def set_rate(self, rate: float):
+        self.rate = rate
+        self.capacity = max(1, int(rate))
+        self._tokens = min(self._tokens, self.capacity)
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.capacity, self._tokens + (now - self._stamp) * self.rate
+                )
+                self._stamp = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class FanOut:
+    """
+    Applies ``action`` to every target from ``source`` with bounded concurrency
+    and a shared rate limit. A FloodWait on any worker pauses all of them.
+
+    Targets must arrive in ascending order: ``cursor`` is the last target below
+    which everything has been handled, and is checkpointed so an interrupted
+    job can restart from it.
+    """
+
+    def __init__(
+        self,
+        job_id: str,
+        kind: str,
+        source,
+        action: Callable[..., Awaitable],
+        state: dict = None,
+        on_progress: Callable[["FanOut"], Awaitable] = None,
+        concurrency: int = config.FANOUT_CONCURRENCY,
+        rate: float = config.FANOUT_RATE,
+        progress_every: int = 5,
+        retries: int = 2,
+    ):
+        self.job_id = job_id
+        self.kind = kind
+        self.source = source
+        self.action = action
+        self.state = dict(state or {})
+        self.on_progress = on_progress
+        self.concurrency = concurrency
+        self.bucket = TokenBucket(rate)
+        self.progress_every = progress_every
+        self.retries = retries
+
+        self.cursor = self.state.get("cursor")
+        self.done = self.state.get("done", 0)
+        self.failed = self.state.get("failed", 0)
+        self.flood_waits = 0
+        self.started = time.time()
+        self.cancelled = False
+        self.held = self.state.get("held", False)
+
+        self._resume = asyncio.Event()
+        self._resume.set()
+        self._paused_until = 0.0
+        self._waker = None
+        self._pending = {}
+        self._finished = set()
+        self._next_seq = 0
+
+    @property
+    def processed(self) -> int:
+        return self.done + self.failed
+
+    @property
+    def paused(self) -> bool:
+        return not self._resume.is_set()
+
+    def checkpoint(self) -> dict:
+        return {
+            **self.state,
+            "job_id": self.job_id,
+            "kind": self.kind,
+            "cursor": self.cursor,
+            "done": self.done,
+            "failed": self.failed,
+            "held": self.held,
+        }
+
+    async def save(self):
+        try:
+            await save_fanout_job(self.job_id, self.checkpoint())
+        except Exception as e:
+            LOGGER(__name__).warning(f"Unable to checkpoint {self.job_id}: {e}")
+
+    def pause(self):
+        self.held = True
+        self._resume.clear()
+
+    def resume(self):
+        self.held = False
+        if time.monotonic() >= self._paused_until:
+            self._resume.set()
+
+    def cancel(self):
+        self.cancelled = True
+        self._resume.set()
+
+    def on_flood(self, seconds: int):
+        """Hook for subclasses that tune their pace from FloodWait values."""
+
+    async def _wake(self):
+        while (delay := self._paused_until - time.monotonic()) > 0:
+            await asyncio.sleep(delay)
+        self._waker = None
+        if not self.held:
+            self._resume.set()
+
+    def _flood(self, seconds: int):
+        self.flood_waits += 1
+        self.on_flood(seconds)
+        until = time.monotonic() + seconds
+        if until <= self._paused_until:
+            return
+        LOGGER(__name__).warning(
+            f"{self.job_id} hit a FloodWait of {seconds}s, pausing all workers."
+        )
+        self._paused_until = until
+        self._resume.clear()
+        if self._waker is None:
+            self._waker = asyncio.create_task(self._wake())
+
+    async def _attempt(self, target) -> Optional[bool]:
+        for _ in range(self.retries + 1):
+            await self._resume.wait()
+            if self.cancelled:
+                return None
+            await self.bucket.acquire()
+            # A flood may have started while this worker waited for a token
+            await self._resume.wait()
+            if self.cancelled:
+                return None
+            try:
+                await self.action(target)
+                return True
+            except FloodWait as e:
+                self._flood(int(e.value) + 1)
+            except Exception:
+                return False
+        return False
+
+    def _complete(self, seq: int, ok: Optional[bool]):
+        if ok is True:
+            self.done += 1
+        elif ok is False:
+            self.failed += 1
+        self._finished.add(seq)
+        while self._next_seq in self._finished:
+            self._finished.discard(self._next_seq)
+            self.cursor = self._pending.pop(self._next_seq)
+            self._next_seq += 1
+
+    async def _worker(self, queue: asyncio.Queue):
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            seq, target = item
+            self._complete(seq, await self._attempt(target))
+
+    async def _report(self):
+        while True:
+            await asyncio.sleep(self.progress_every)
+            await self.save()
+            if self.on_progress:
+                try:
+                    await self.on_progress(self)
+                except Exception:
+                    pass
+
+    async def _targets(self):
+        if hasattr(self.source, "__aiter__"):
+            async for target in self.source:
+                yield target
+        else:
+            for target in self.source:
+                yield target
+
+    async def run(self) -> "FanOut":
+        running[self.job_id] = self
+        if self.held:
+            self._resume.clear()
+        await self.save()
+        queue = asyncio.Queue(maxsize=self.concurrency * 2)
+        workers = [
+            asyncio.create_task(self._worker(queue)) for _ in range(self.concurrency)
+        ]
+        reporter = asyncio.create_task(self._report())
+        try:
+            seq = 0
+            async for target in self._targets():
+                if self.cancelled:
+                    break
+                self._pending[seq] = target
+                await queue.put((seq, target))
+                seq += 1
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers)
+        except BaseException:
+            # Interrupted (shutdown, restart): keep the checkpoint so the job resumes
+            for task in workers:
+                task.cancel()
+            await self.save()
+            raise
+        finally:
+            reporter.cancel()
+            if self._waker:
+                self._waker.cancel()
+            running.pop(self.job_id, None)
+        await remove_fanout_job(self.job_id)
+        return self
+
+
+class AdaptiveFanOut(FanOut):
+    """
+    FanOut whose rate follows observed FloodWaits: halved (quartered for long
+    waits) on every flood, raised by one request/s after ten clean seconds.
+    """
+
+    def __init__(self, *args, min_rate: float = 1, max_rate: float = 30, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        if self.state.get("rate"):
+            self.bucket.set_rate(self.state["rate"])
+        self._calm = 0
+
+    def checkpoint(self) -> dict:
+        return {**super().checkpoint(), "rate": self.bucket.rate}
+
+    def on_flood(self, seconds: int):
+        factor = 4 if seconds >= 10 else 2
+        self.bucket.set_rate(max(self.min_rate, self.bucket.rate / factor))
+        self._calm = 0
+
+    def _complete(self, seq: int, ok):
+        super()._complete(seq, ok)
+        if not ok:
+            return
+        self._calm += 1
+        if self._calm >= self.bucket.rate * 10:
+            self.bucket.set_rate(min(self.max_rate, self.bucket.rate + 1))
+            self._calm = 0
@@ -0,0 +1,107 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Callable, List, Optional, Tuple
+
+from youtubesearchpython.__future__ import VideosSearch
+
+
+class InlineSearch:
+    """
+    YouTube search for inline queries, which arrive once per keystroke.
+
+    Built results are kept per normalized query. While a query is still being
+    typed, the cached results of its longest cached prefix are filtered and
+    reused when enough of them still match. Identical searches share one
+    request and each user's query only goes out once they pause typing.
+    """
+
+    def __init__(
+        self,
+        build: Callable[[dict], object],
+        limit: int = 15,
+        size: int = 512,
+        ttl: int = 600,
+        debounce: float = 0.35,
+        prefix_min: int = 5,
+    ):
+        self.build = build
+        self.limit = limit
+        self.size = size
+        self.ttl = ttl
+        self.delay = debounce
+        self.prefix_min = prefix_min
+        # query -> (expiry, [(haystack, result)])
+        self._cache = OrderedDict()
+        self._inflight = {}
+        self._typing = {}
+        self.hits = self.prefix_hits = self.searches = 0
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        return " ".join(text.lower().split())
+
+    def _get(self, text: str):
+        entry = self._cache.get(text)
+        if not entry:
+            return None
+        if entry[0] <= time.monotonic():
+            del self._cache[text]
+            return None
+        self._cache.move_to_end(text)
+        return entry[1]
+
+    def cached(self, text: str) -> Tuple[Optional[List], bool]:
+        """Results for ``text`` and whether they are its own, not a prefix's."""
+        rows = self._get(text)
+        if rows is not None:
+            self.hits += 1
+            return [result for _, result in rows], True
+        words = text.split()
+        for end in range(len(text) - 1, 0, -1):
+            rows = self._get(text[:end])
+            if rows is None:
+                continue
+            matches = [
+                result
+                for haystack, result in rows
+                if all(word in haystack for word in words)
+            ]
+            if len(matches) >= self.prefix_min:
+                self.prefix_hits += 1
+                return matches, False
+            # A shorter prefix matches even less of what is being typed
+            break
+        return None, False
+
+    async def debounce(self, user_id: int) -> bool:
+        """False when the user typed on and this query is no longer worth answering."""
+        token = object()
+        self._typing[user_id] = token
+        await asyncio.sleep(self.delay)
+        if self._typing.get(user_id) is not token:
+            return False
+        del self._typing[user_id]
+        return True
+
+    async def _search(self, text: str) -> list:
+        self.searches += 1
+        search = VideosSearch(text, limit=self.limit + 5)
+        found = (await search.next()).get("result") or []
+        rows = []
+        for item in found[: self.limit]:
+            haystack = self.normalize(
+                f"{item.get('title', '')} {item.get('channel', {}).get('name', '')}"
+            )
+            rows.append((haystack, self.build(item)))
+        self._cache[text] = (time.monotonic() + self.ttl, rows)
+        while len(self._cache) > self.size:
+            self._cache.popitem(last=False)
+        return [result for _, result in rows]
+
+    async def search(self, text: str) -> list:
+        task = self._inflight.get(text)
+        if task is None:
+            task = self._inflight[text] = asyncio.ensure_future(self._search(text))
+            task.add_done_callback(lambda _: self._inflight.pop(text, None))
+        return await asyncio.shield(task)
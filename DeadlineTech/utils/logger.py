@@ -1,7 +1,6 @@
-from pyrogram.enums import ParseMode
-
 from DeadlineTech import app
 from DeadlineTech.utils.database import is_on_off
+from DeadlineTech.utils.logsink import PLAY, log_sink
 from config import LOGGER_ID
 
 
@@ -24,13 +23,5 @@ async def play_logs(message, streamtype):
 ───────────────────────
 """
         if message.chat.id != LOGGER_ID:
-            try:
-                await app.send_message(
-                    chat_id=LOGGER_ID,
-                    text=logger_text,
-                    parse_mode=ParseMode.HTML,
-                    disable_web_page_preview=True,
-                )
-            except:
-                pass
+            log_sink.emit(logger_text.strip(), PLAY)
         return
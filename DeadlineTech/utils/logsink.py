@@ -0,0 +1,162 @@
+import asyncio
+from collections import Counter, deque
+from typing import Optional
+
+from pyrogram.enums import ParseMode
+from pyrogram.errors import FloodWait
+
+import config
+from DeadlineTech import app
+from DeadlineTech.core.lifecycle import on_shutdown
+from DeadlineTech.logging import LOGGER
+
+CRASH, ADMIN, PLAY = 0, 1, 2
+NAMES = {CRASH: "crash", ADMIN: "admin", PLAY: "play"}
+
+MAX_CHARS = 4000
+SEPARATOR = "\n\n"
+
+
+class LogSink:
+    """
+    Collects log chat events and posts them as digests.
+
+    ``emit`` only queues, so handlers never wait on Telegram. Every
+    ``interval`` seconds (sooner for crashes) pending events are packed into
+    at most ``per_flush`` messages, most severe first. Once ``size`` events
+    are waiting, play logs are sampled and then the least severe event is
+    dropped, with the losses summed up in the next digest. Repeats of an event
+    with the same ``key`` are counted instead of queued again.
+    """
+
+    def __init__(self, chat_id: int, interval: int, size: int, per_flush: int = 3):
+        self.chat_id = chat_id
+        self.interval = interval
+        self.size = size
+        self.per_flush = per_flush
+        # severity -> deque of [key, text, repeats]
+        self._queues = {severity: deque() for severity in NAMES}
+        self._keys = {}
+        self._urgent = asyncio.Event()
+        self._task = None
+        self._seen = Counter()
+        self.dropped = Counter()
+        self.sent = 0
+
+    def __len__(self) -> int:
+        return sum(len(queue) for queue in self._queues.values())
+
+    def _start(self):
+        if self._task is not None and not self._task.done():
+            return
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._task = asyncio.create_task(self._run())
+
+    def _make_room(self, severity: int) -> bool:
+        for lower in sorted(NAMES, reverse=True):
+            if lower < severity:
+                break
+            if self._queues[lower]:
+                entry = self._queues[lower].popleft()
+                self._keys.pop(entry[0], None)
+                self.dropped[lower] += 1
+                return True
+        return False
+
+    def emit(self, text: str, severity: int = PLAY, key: Optional[str] = None):
+        self._start()
+        if key is not None and key in self._keys:
+            self._keys[key][2] += 1
+            return
+        self._seen[severity] += 1
+        pending = len(self)
+        if severity == PLAY and pending >= self.size // 2:
+            # Keep one play log in ``rate`` while the backlog is past half full
+            rate = 1 + (pending * 4) // self.size
+            if self._seen[severity] % rate:
+                self.dropped[severity] += 1
+                return
+        if pending >= self.size and not self._make_room(severity):
+            self.dropped[severity] += 1
+            return
+        entry = [key, text, 1]
+        self._queues[severity].append(entry)
+        if key is not None:
+            self._keys[key] = entry
+        if severity == CRASH:
+            self._urgent.set()
+
+    def _take(self) -> list:
+        """Pops up to ``per_flush`` messages worth of events, most severe first."""
+        messages, current = [], ""
+        if self.dropped:
+            lost = ", ".join(
+                f"{count} {NAMES[severity]}" for severity, count in sorted(self.dropped.items())
+            )
+            current = f"⚠️ <b>Log backlog:</b> dropped {lost} event(s)"
+            self.dropped.clear()
+        for severity in sorted(NAMES):
+            queue = self._queues[severity]
+            while queue:
+                key, text, repeats = queue[0]
+                if repeats > 1:
+                    text = f"{text}\n<b>Repeated:</b> <code>{repeats}×</code>"
+                text = text[:MAX_CHARS]
+                if current and len(current) + len(SEPARATOR) + len(text) > MAX_CHARS:
+                    messages.append(current)
+                    current = ""
+                    if len(messages) == self.per_flush:
+                        return messages
+                current = f"{current}{SEPARATOR}{text}" if current else text
+                queue.popleft()
+                self._keys.pop(key, None)
+        if current:
+            messages.append(current)
+        return messages
+
+    async def flush(self):
+        for text in self._take():
+            while True:
+                try:
+                    await app.send_message(
+                        self.chat_id,
+                        text,
+                        parse_mode=ParseMode.HTML,
+                        disable_web_page_preview=True,
+                    )
+                    self.sent += 1
+                    break
+                except FloodWait as e:
+                    await asyncio.sleep(e.value)
+                except Exception as e:
+                    LOGGER(__name__).warning(f"Failed to send log digest: {e}")
+                    break
+
+    async def close(self):
+        """Stops the flush loop and posts everything still queued."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        while len(self) or self.dropped:
+            await self.flush()
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._urgent.wait(), self.interval)
+                # Let the rest of a crash burst arrive before posting it
+                await asyncio.sleep(1)
+            except asyncio.TimeoutError:
+                pass
+            self._urgent.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                LOGGER(__name__).warning(f"Log sink flush failed: {e}")
+
+
+log_sink = LogSink(config.LOGGER_ID, config.LOG_DIGEST_INTERVAL, config.LOG_QUEUE_SIZE)
+on_shutdown(log_sink.close)
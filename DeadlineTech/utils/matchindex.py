@@ -0,0 +1,164 @@
+import asyncio
+import time
+from collections import Counter, OrderedDict
+from typing import Optional, Tuple
+
+import config
+from DeadlineTech.logging import LOGGER
+from DeadlineTech.utils.database import (
+    add_track_match_hits,
+    get_track_matches,
+    remove_expired_track_matches,
+    save_track_match,
+    top_track_matches,
+)
+
+FIELDS = ("title", "duration_min", "duration_sec", "thumb", "vidid")
+# Seconds between deletions of expired matches from the database
+PURGE_INTERVAL = 3600
+
+
+class MatchIndex:
+    """
+    Remembers which YouTube video a track from another service resolved to.
+
+    Matches are stored under the track's id on its service ("spotify:<id>")
+    and under its normalized search query ("q:<query>"), so a known track
+    resolves without asking either service. Entries expire after ``ttl`` so
+    deleted videos get searched again. Hit counts are buffered and flushed
+    by ``maintain``, which also warms memory with the most played tracks and
+    deletes expired entries from the database.
+    """
+
+    def __init__(self, ttl: int, size: int):
+        self.ttl = ttl
+        self.size = size
+        self._memory = OrderedDict()
+        self._hits = Counter()
+        self.stats = Counter()
+        self.since = time.time()
+
+    def __len__(self) -> int:
+        return len(self._memory)
+
+    @staticmethod
+    def keys(query: str = None, source: Tuple[str, str] = None) -> list:
+        keys = []
+        if source:
+            keys.append(f"{source[0]}:{source[1]}")
+        if query:
+            keys.append("q:" + " ".join(query.lower().split()))
+        return keys
+
+    def _remember(self, key: str, match: dict):
+        self._memory[key] = match
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.size:
+            self._memory.popitem(last=False)
+
+    async def get(
+        self, query: str = None, source: Tuple[str, str] = None, checked: bool = False
+    ) -> Optional[tuple]:
+        """``checked`` means ``source`` was just looked up and missed, only the query is."""
+        keys = self.keys(query, source)
+        lookup = keys[1:] if checked and source else keys
+        now = time.time()
+        found, where = None, "memory"
+        for key in lookup:
+            match = self._memory.get(key)
+            if match and match["expires"] > now:
+                found = match
+                self._memory.move_to_end(key)
+                break
+        if found is None:
+            where = "database"
+            try:
+                stored = await get_track_matches(lookup) if lookup else []
+            except Exception:
+                stored = []
+            # Prefer the source id over the query, in the order of ``keys``
+            stored.sort(key=lambda match: keys.index(match["key"]))
+            for match in stored:
+                if match.get("expires", 0) > now:
+                    found = match
+                    break
+        if found is None:
+            # The lookup of ``source`` already counted this miss
+            if not checked:
+                self.stats["misses"] += 1
+            return None
+        self.stats[where] += 1
+        for key in keys:
+            self._remember(key, found)
+        self._hits[found["key"]] += 1
+        return tuple(found[field] for field in FIELDS)
+
+    async def put(self, details: tuple, query: str = None, source: Tuple[str, str] = None):
+        match = dict(zip(FIELDS, details))
+        match["expires"] = time.time() + self.ttl
+        for key in self.keys(query, source):
+            entry = {**match, "key": key}
+            self._remember(key, entry)
+            try:
+                await save_track_match(key, entry)
+            except Exception as e:
+                LOGGER(__name__).warning(f"Unable to save track match {key}: {e}")
+
+    async def flush(self):
+        hits, self._hits = self._hits, Counter()
+        for key, count in hits.items():
+            try:
+                await add_track_match_hits(key, count)
+            except Exception:
+                self._hits[key] += count
+
+    async def warm(self, limit: int):
+        now = time.time()
+        warmed = 0
+        for match in await top_track_matches(limit):
+            if match.get("expires", 0) > now:
+                self._remember(match["key"], match)
+                warmed += 1
+        return warmed
+
+    async def maintain(self, interval: int = 60):
+        try:
+            warmed = await self.warm(min(self.size, 1000))
+            LOGGER(__name__).info(f"Loaded {warmed} most played track matches.")
+        except Exception as e:
+            LOGGER(__name__).warning(f"Unable to warm track matches: {e}")
+        purged = 0
+        while True:
+            if time.time() - purged >= PURGE_INTERVAL:
+                purged = time.time()
+                try:
+                    removed = await remove_expired_track_matches(purged)
+                    if removed:
+                        LOGGER(__name__).info(f"Deleted {removed} expired track matches.")
+                except Exception as e:
+                    LOGGER(__name__).warning(f"Unable to delete expired track matches: {e}")
+            await asyncio.sleep(interval)
+            await self.flush()
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.stats["memory"] + self.stats["database"] + self.stats["misses"]
+        if not total:
+            return 0.0
+        return (self.stats["memory"] + self.stats["database"]) * 100 / total
+
+
+track_matches = MatchIndex(config.MATCH_TTL_DAYS * 86400, config.MATCH_CACHE_SIZE)
+
+
+def as_track(details: tuple):
+    """``details`` in the shape the platforms' ``track`` returns."""
+    title, duration_min, _, thumbnail, vidid = details
+    track_details = {
+        "title": title,
+        "link": f"https://www.youtube.com/watch?v={vidid}",
+        "vidid": vidid,
+        "duration_min": duration_min,
+        "thumb": thumbnail,
+    }
+    return track_details, vidid
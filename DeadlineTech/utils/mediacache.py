@@ -0,0 +1,123 @@
+import os
+from collections import OrderedDict
+from functools import partial
+from typing import Optional
+
+from pyrogram.errors import (
+    FileIdInvalid,
+    FileReferenceExpired,
+    FileReferenceInvalid,
+    MediaEmpty,
+)
+from pyrogram.types import InputMediaPhoto
+
+from DeadlineTech import app
+from DeadlineTech.logging import LOGGER
+from DeadlineTech.utils.database import get_media_id, remove_media_id, save_media_id
+
+# key -> (file_id, version) of photos Telegram already stores, so repeats are sent by reference
+_file_ids = OrderedDict()
+MEMORY_SIZE = 1000
+
+# Raised when a remembered file_id can no longer be used, the photo is uploaded again
+STALE = (FileIdInvalid, FileReferenceExpired, FileReferenceInvalid, MediaEmpty, ValueError)
+
+
+def media_key(photo) -> Optional[str]:
+    """Local files are keyed by path and URLs by themselves, anything else is already a file_id."""
+    if not isinstance(photo, str):
+        return None
+    if os.path.isfile(photo) or photo.startswith(("http://", "https://")):
+        return photo
+    return None
+
+
+def media_version(photo: str) -> Optional[str]:
+    """mtime and size of a local file, a re-rendered image no longer matches the file_id saved for its path."""
+    try:
+        stat = os.stat(photo)
+    except OSError:
+        return None
+    return f"{int(stat.st_mtime)}:{stat.st_size}"
+
+
+def _remember(key: str, file_id: str, version: Optional[str]):
+    _file_ids[key] = (file_id, version)
+    _file_ids.move_to_end(key)
+    while len(_file_ids) > MEMORY_SIZE:
+        _file_ids.popitem(last=False)
+
+
+async def _lookup(key: str, version: Optional[str]) -> Optional[str]:
+    entry = _file_ids.get(key)
+    if entry:
+        _file_ids.move_to_end(key)
+        # The file changed since, upload it and overwrite the entry
+        return entry[0] if entry[1] == version else None
+    try:
+        media = await get_media_id(key)
+    except Exception:
+        return None
+    if not media:
+        return None
+    _remember(key, *media)
+    return media[0] if media[1] == version else None
+
+
+async def _forget(key: str):
+    _file_ids.pop(key, None)
+    try:
+        await remove_media_id(key)
+    except Exception:
+        pass
+
+
+async def _store(key: str, version: Optional[str], message):
+    photo = getattr(message, "photo", None)
+    if not photo or _file_ids.get(key) == (photo.file_id, version):
+        return
+    _remember(key, photo.file_id, version)
+    try:
+        await save_media_id(key, photo.file_id, version)
+    except Exception as e:
+        LOGGER(__name__).warning(f"Unable to save file_id of {key}: {e}")
+
+
+async def _deliver(send, photo, **kwargs):
+    key = media_key(photo)
+    if key:
+        version = media_version(photo)
+        file_id = await _lookup(key, version)
+        if file_id:
+            try:
+                return await send(photo=file_id, **kwargs)
+            except STALE:
+                await _forget(key)
+    message = await send(photo=photo, **kwargs)
+    if key:
+        await _store(key, version, message)
+    return message
+
+
+async def send_photo(chat_id, photo, **kwargs):
+    """``app.send_photo`` that reuses the file_id of a photo it has sent before."""
+    return await _deliver(partial(app.send_photo, chat_id), photo, **kwargs)
+
+
+async def reply_photo(message, photo, **kwargs):
+    return await _deliver(message.reply_photo, photo, **kwargs)
+
+
+async def edit_photo(target, photo, caption: str = None, reply_markup=None):
+    """Swap the photo of a message or callback query's message, see ``send_photo``."""
+
+    # CallbackQuery.edit_message_media / Message.edit_media
+    editor = getattr(target, "edit_message_media", None) or target.edit_media
+
+    async def edit(photo):
+        return await editor(
+            media=InputMediaPhoto(media=photo, caption=caption),
+            reply_markup=reply_markup,
+        )
+
+    return await _deliver(edit, photo)
@@ -0,0 +1,113 @@
+import time
+from collections import defaultdict
+from typing import Optional
+
+from pyrogram.enums import ChatMemberStatus
+
+import config
+from DeadlineTech import app
+from DeadlineTech.core.userbot import assistantids
+
+PRESENT = (
+    ChatMemberStatus.MEMBER,
+    ChatMemberStatus.ADMINISTRATOR,
+    ChatMemberStatus.OWNER,
+)
+
+# chat_id -> (expiry, status) of the bot itself
+_bot = {}
+# (chat_id, user_id) -> (expiry, status), for assistants known to be in a chat
+_present = {}
+# chat_id -> (expiry, invite link)
+_links = {}
+
+# check name -> [count, total ms, max ms]
+timings = defaultdict(lambda: [0, 0.0, 0.0])
+
+
+class timed:
+    """``with timed("bot_status") as t:`` records how long a check took in ``timings``."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.ms = 0.0
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.ms = (time.perf_counter() - self._start) * 1000
+        stat = timings[self.name]
+        stat[0] += 1
+        stat[1] += self.ms
+        stat[2] = max(stat[2], self.ms)
+        return False
+
+
+def _prune(store: dict):
+    if len(store) <= config.ADMIN_CACHE_SIZE:
+        return
+    now = time.time()
+    for key in [key for key, entry in store.items() if entry[0] <= now]:
+        del store[key]
+
+
+async def bot_status(chat_id: int) -> ChatMemberStatus:
+    entry = _bot.get(chat_id)
+    if entry and entry[0] > time.time():
+        return entry[1]
+    member = await app.get_chat_member(chat_id, app.id)
+    _bot[chat_id] = (time.time() + config.MEMBER_CACHE_TTL, member.status)
+    _prune(_bot)
+    return member.status
+
+
+async def assistant_status(chat_id: int, user_id: int) -> ChatMemberStatus:
+    """Raises UserNotParticipant like ``get_chat_member`` when the assistant is not in the chat."""
+    entry = _present.get((chat_id, user_id))
+    if entry and entry[0] > time.time():
+        return entry[1]
+    member = await app.get_chat_member(chat_id, user_id)
+    if member.status in PRESENT:
+        set_present(chat_id, user_id, member.status)
+    return member.status
+
+
+def set_present(chat_id: int, user_id: int, status=ChatMemberStatus.MEMBER):
+    _present[(chat_id, user_id)] = (time.time() + config.MEMBER_CACHE_TTL, status)
+    _prune(_present)
+
+
+def get_invite_link(chat_id: int) -> Optional[str]:
+    entry = _links.get(chat_id)
+    if entry and entry[0] > time.time():
+        return entry[1]
+    _links.pop(chat_id, None)
+    return None
+
+
+def set_invite_link(chat_id: int, link: str):
+    _links[chat_id] = (time.time() + config.INVITE_LINK_TTL, link)
+    _prune(_links)
+
+
+def forget_invite_link(chat_id: int):
+    _links.pop(chat_id, None)
+
+
+def member_updated(chat_id: int, user_id: int, status: Optional[ChatMemberStatus]):
+    """Keeps the cache in step with chat member updates, ``status`` None when the member is gone."""
+    if user_id == app.id:
+        if status in (None, ChatMemberStatus.LEFT, ChatMemberStatus.BANNED):
+            _bot.pop(chat_id, None)
+            _links.pop(chat_id, None)
+        else:
+            _bot[chat_id] = (time.time() + config.MEMBER_CACHE_TTL, status)
+        return
+    if user_id not in assistantids:
+        return
+    if status in PRESENT:
+        set_present(chat_id, user_id, status)
+    else:
+        _present.pop((chat_id, user_id), None)
@@ -0,0 +1,71 @@
+import asyncio
+import html
+import re
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from DeadlineTech.core.http import get_session
+
+META = re.compile(r"<meta\s[^>]*>", re.I)
+ATTR = re.compile(r"""([\w:-]+)\s*=\s*(?:"([^"]*)"|'([^']*)')""")
+HEAD_END = b"</head>"
+
+# Pages whose <head> is larger than this are parsed in a thread
+OFFLOOP_BYTES = 64 * 1024
+MAX_BYTES = 4 * 1024 * 1024
+
+_pages = OrderedDict()
+_inflight = {}
+TTL = 3600
+SIZE = 256
+
+
+def parse_meta(head: str) -> Dict[str, List[str]]:
+    """``<meta property|name=... content=...>`` of a page, every value in document order."""
+    tags = {}
+    for tag in META.findall(head):
+        attrs = {m[0].lower(): m[1] or m[2] for m in ATTR.findall(tag)}
+        key = attrs.get("property") or attrs.get("name")
+        if key and "content" in attrs:
+            tags.setdefault(key, []).append(html.unescape(attrs["content"]))
+    return tags
+
+
+async def _fetch(url: str) -> Optional[Dict[str, List[str]]]:
+    async with get_session().get(url) as resp:
+        if resp.status != 200:
+            return None
+        head = bytearray()
+        # Everything needed lives in <head>, stop reading once it closes
+        async for chunk in resp.content.iter_chunked(16 * 1024):
+            head += chunk
+            end = head.find(HEAD_END, max(0, len(head) - len(chunk) - len(HEAD_END)))
+            if end != -1:
+                del head[end:]
+                break
+            if len(head) >= MAX_BYTES:
+                break
+    text = head.decode(resp.charset or "utf-8", errors="replace")
+    if len(head) > OFFLOOP_BYTES:
+        return await asyncio.to_thread(parse_meta, text)
+    return parse_meta(text)
+
+
+async def fetch_meta(url: str) -> Optional[Dict[str, List[str]]]:
+    """Meta tags of ``url``, cached per url for an hour. None when the page is unavailable."""
+    entry = _pages.get(url)
+    if entry and entry[0] > time.monotonic():
+        _pages.move_to_end(url)
+        return entry[1]
+    task = _inflight.get(url)
+    if task is None:
+        task = _inflight[url] = asyncio.ensure_future(_fetch(url))
+        task.add_done_callback(lambda _: _inflight.pop(url, None))
+    tags = await asyncio.shield(task)
+    if tags is not None:
+        _pages[url] = (time.monotonic() + TTL, tags)
+        _pages.move_to_end(url)
+        while len(_pages) > SIZE:
+            _pages.popitem(last=False)
+    return tags
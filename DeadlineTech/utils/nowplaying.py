@@ -0,0 +1,164 @@
+import asyncio
+import time
+from typing import Callable, Hashable
+
+from pyrogram.errors import FloodWait, MessageNotModified
+from pyrogram.types import InlineKeyboardMarkup
+
+import config
+from DeadlineTech.misc import db
+from DeadlineTech.utils.database import (
+    get_active_chats,
+    get_lang,
+    is_active_chat,
+    is_music_playing,
+)
+from DeadlineTech.utils.formatters import seconds_to_min
+from DeadlineTech.utils.inline import stream_markup_timer
+from strings import get_string
+
+# Longest a chat waits between updates however many panels or FloodWaits it has
+MAX_INTERVAL = 60
+
+
+class Panel:
+    __slots__ = ("message", "videoid", "key", "render", "played")
+
+    def __init__(self, message, videoid: str, key: Hashable, render: Callable):
+        self.message = message
+        self.videoid = videoid
+        # Panels with the same key share one rendered markup per tick
+        self.key = key
+        self.render = render
+        self.played = None
+
+
+class NowPlaying:
+    """
+    Keeps the progress bar of every "now playing" panel in step with the track.
+
+    Each chat's player panel (the message ``db[chat_id][0]["mystic"]``) is
+    updated automatically, /queue and /player panels subscribe. One loop ticks
+    all chats: per chat the position is read once, every distinct markup is
+    rendered once and only panels whose position text changed are edited. A
+    chat's interval grows with its number of panels and doubles on FloodWait.
+    Panels are dropped when their track ends or their message can't be edited.
+    """
+
+    def __init__(self, interval: int = config.NOWPLAYING_INTERVAL):
+        self.interval = interval
+        # chat_id -> {(chat id, message id): Panel}
+        self._panels = {}
+        # chat_id -> Panel for the player message of the current track
+        self._players = {}
+        self._due = {}
+        self._backoff = {}
+        self.edits = 0
+
+    def subscribe(self, chat_id: int, message, videoid: str, key: Hashable, render: Callable):
+        """``render(played, dur)`` returns the panel's markup at that position."""
+        panel = Panel(message, videoid, key, render)
+        self._panels.setdefault(chat_id, {})[(message.chat.id, message.id)] = panel
+
+    def unsubscribe(self, chat_id: int, message):
+        panels = self._panels.get(chat_id)
+        if panels:
+            panels.pop((message.chat.id, message.id), None)
+            if not panels:
+                del self._panels[chat_id]
+
+    def _forget(self, chat_id: int):
+        self._panels.pop(chat_id, None)
+        self._players.pop(chat_id, None)
+        self._due.pop(chat_id, None)
+        self._backoff.pop(chat_id, None)
+
+    async def _player(self, chat_id: int, track: dict):
+        mystic = track.get("mystic")
+        if not mystic:
+            return None
+        panel = self._players.get(chat_id)
+        if panel is None or panel.message is not mystic:
+            try:
+                _ = get_string(await get_lang(chat_id))
+            except Exception:
+                _ = get_string("en")
+            panel = self._players[chat_id] = Panel(
+                mystic,
+                track["vidid"],
+                ("player", chat_id),
+                lambda played, dur: InlineKeyboardMarkup(
+                    stream_markup_timer(_, chat_id, played, dur)
+                ),
+            )
+        # A player that failed to update has its videoid cleared until the next track
+        return panel if panel.videoid is not None else None
+
+    async def _tick(self, chat_id: int) -> bool:
+        """False once the chat stopped playing and was forgotten."""
+        playing = db.get(chat_id)
+        if not playing or not await is_active_chat(chat_id):
+            self._forget(chat_id)
+            return False
+        track = playing[0]
+        panels = self._panels.get(chat_id, {})
+        for where, panel in list(panels.items()):
+            if panel.videoid != track["vidid"]:
+                del panels[where]
+        if not int(track.get("seconds") or 0) or not await is_music_playing(chat_id):
+            return True
+        targets = list(panels.items())
+        player = await self._player(chat_id, track)
+        if player:
+            targets.append((None, player))
+        played = seconds_to_min(track["played"])
+        markups = {}
+        for where, panel in targets:
+            if panel.played == played:
+                continue
+            if panel.key not in markups:
+                markups[panel.key] = panel.render(played, track["dur"])
+            try:
+                await panel.message.edit_reply_markup(reply_markup=markups[panel.key])
+                self.edits += 1
+            except FloodWait as e:
+                self._backoff[chat_id] = min(8, self._backoff.get(chat_id, 1) * 2)
+                self._due[chat_id] = time.monotonic() + e.value
+                return True
+            except MessageNotModified:
+                pass
+            except Exception:
+                # Deleted or no longer editable, stop updating it for this track
+                if where is None:
+                    panel.videoid = None
+                else:
+                    panels.pop(where, None)
+                continue
+            panel.played = played
+        self._backoff[chat_id] = max(1, self._backoff.get(chat_id, 1) // 2)
+        if not panels:
+            self._panels.pop(chat_id, None)
+        return True
+
+    def _interval(self, chat_id: int) -> float:
+        load = 1 + len(self._panels.get(chat_id, ())) // 4
+        return min(MAX_INTERVAL, self.interval * load * self._backoff.get(chat_id, 1))
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(1)
+            now = time.monotonic()
+            for chat_id in set(await get_active_chats()) | set(self._panels):
+                if self._due.get(chat_id, 0) > now:
+                    continue
+                try:
+                    if not await self._tick(chat_id):
+                        continue
+                except Exception:
+                    pass
+                self._due[chat_id] = max(
+                    self._due.get(chat_id, 0), now + self._interval(chat_id)
+                )
+
+
+now_playing = NowPlaying()
@@ -0,0 +1,137 @@
+import asyncio
+import time
+from typing import Awaitable, Callable
+
+from pyrogram.errors import FloodWait, MessageNotModified
+
+import config
+from DeadlineTech import app
+from DeadlineTech.utils.formatters import convert_bytes, get_readable_time
+
+
+class ProgressReporter:
+    """
+    Time throttled status message for long running work.
+
+    ``update`` only stores the latest numbers, so it is cheap enough for every
+    chunk. It may be called from worker threads (yt-dlp hooks), which leave
+    the rest to the event loop. At most once per ``interval`` an edit is
+    scheduled, which renders the newest numbers when it runs. There is never more than one edit pending per reporter,
+    nothing is edited for work that ends within the first ``interval`` and
+    unchanged text is not sent again.
+    """
+
+    def __init__(
+        self,
+        edit: Callable[[str], Awaitable],
+        render: Callable[["ProgressReporter"], str],
+        interval: float = config.PROGRESS_INTERVAL,
+    ):
+        self.edit = edit
+        self.render = render
+        self.interval = interval
+        self.loop = asyncio.get_running_loop()
+        self.current = self.total = 0
+        self.started = time.monotonic()
+        self._base = None
+        self._next = self.started + interval
+        self._pending = None
+        self._text = None
+        self.closed = False
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    @property
+    def percent(self) -> float:
+        return self.current * 100 / self.total if self.total else 0.0
+
+    @property
+    def speed(self) -> float:
+        """Per second, counted from the first update so resumed work does not inflate it."""
+        if self._base is None:
+            return 0.0
+        elapsed = time.monotonic() - self._base[0]
+        return (self.current - self._base[1]) / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def eta(self) -> int:
+        speed = self.speed
+        return int((self.total - self.current) / speed) if speed > 0 else 0
+
+    def update(self, current: int, total: int = None):
+        if self._base is None:
+            self._base = (time.monotonic(), current)
+        self.current = current
+        if total:
+            self.total = total
+        if self.closed:
+            return
+        try:
+            in_loop = asyncio.get_running_loop() is self.loop
+        except RuntimeError:
+            in_loop = False
+        if in_loop:
+            self._schedule()
+        else:
+            try:
+                self.loop.call_soon_threadsafe(self._schedule)
+            except RuntimeError:
+                # The loop is gone, nobody is left to show the progress to
+                pass
+
+    def _schedule(self):
+        # Only ever runs in the loop, the throttle state is not shared with threads
+        if self.closed or self._pending is not None:
+            return
+        now = time.monotonic()
+        if now < self._next:
+            return
+        self._next = now + self.interval
+        self._pending = self.loop.create_task(self._flush())
+
+    async def _flush(self):
+        try:
+            text = self.render(self)
+            if text != self._text:
+                self._text = text
+                await self.edit(text)
+        except FloodWait as e:
+            self._next = time.monotonic() + e.value
+        except MessageNotModified:
+            pass
+        except Exception:
+            pass
+        finally:
+            self._pending = None
+
+    def close(self):
+        """Stops reporting, call it before the message is edited for anything else."""
+        self.closed = True
+        if self._pending is not None:
+            self._pending.cancel()
+            self._pending = None
+
+
+def download_text(_, report: ProgressReporter) -> str:
+    """The downloader status message (``tg_1``) for ``report``."""
+    return _["tg_1"].format(
+        app.mention,
+        convert_bytes(report.total),
+        convert_bytes(report.current),
+        f"{report.percent:.2f}",
+        convert_bytes(report.speed),
+        get_readable_time(report.eta) or "0 sᴇᴄᴏɴᴅs",
+    )
+
+
+def youtube_download_text(_, report: ProgressReporter) -> str:
+    """The YouTube download status message (``play_24``) for ``report``."""
+    return _["play_24"].format(
+        f"{report.percent:.2f}",
+        convert_bytes(report.current),
+        convert_bytes(report.total),
+        convert_bytes(report.speed),
+        get_readable_time(report.eta) or "0 sᴇᴄᴏɴᴅs",
+    )
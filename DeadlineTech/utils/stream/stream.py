@@ -1,19 +1,71 @@
+import asyncio
 import os
-from random import randint
+from collections import deque
+from contextlib import aclosing
 from typing import Union
 
 from pyrogram.types import InlineKeyboardMarkup
 
 import config
-from DeadlineTech import Carbon, YouTube, app
+from DeadlineTech import YouTube, app
 from DeadlineTech.core.call import Anony
 from DeadlineTech.misc import db
 from DeadlineTech.utils.database import add_active_video_chat, is_active_chat
 from DeadlineTech.utils.exceptions import AssistantErr
 from DeadlineTech.utils.inline import aq_markup, close_markup, stream_markup
+from DeadlineTech.utils.mediacache import send_photo
 from DeadlineTech.utils.pastebin import AnonyBin
 from DeadlineTech.utils.stream.queue import put_queue, put_queue_index
-from DeadlineTech.utils.thumbnails import get_thumb
+from DeadlineTech.utils.thumbnails import get_playlist_card, get_thumb
+
+
+async def resolve_playlist(items, videoid: bool, ahead: int = config.PLAYLIST_CONCURRENCY):
+    """
+    Yields ``YouTube.details`` of every playlist entry (video ids, or search queries
+    when ``videoid`` is False) in order, or None for entries that failed, while up
+    to ``ahead`` of the following ones resolve in the background.
+    """
+    items = iter(items)
+    pending = deque()
+
+    def schedule():
+        for item in items:
+            lookup = YouTube.details(item, True) if videoid else YouTube.match(item)
+            task = asyncio.ensure_future(lookup)
+            # Lookahead that is never awaited must not log unretrieved exceptions
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+            pending.append(task)
+            return
+
+    for _ in range(ahead):
+        schedule()
+    try:
+        while pending:
+            task = pending.popleft()
+            schedule()
+            try:
+                details = await task
+            except Exception:
+                details = None
+            yield details
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def attach_paste(_, run, msg, position, upl):
+    """Adds the full playlist link to the summary once the paste is up."""
+    try:
+        link = await AnonyBin(msg)
+        if not link:
+            return
+        text = _["play_21"].format(position, link)
+        if run.photo:
+            await run.edit_caption(text, reply_markup=upl)
+        else:
+            await run.edit_text(text, reply_markup=upl)
+    except Exception:
+        pass
 
 
 async def stream(
@@ -36,100 +88,102 @@ async def stream(
     if streamtype == "playlist":
         msg = f"{_['play_19']}\n\n"
         count = 0
-        for search in result:
-            if int(count) == config.PLAYLIST_FETCH_LIMIT:
-                continue
-            try:
-                (
-                    title,
-                    duration_min,
-                    duration_sec,
-                    thumbnail,
-                    vidid,
-                ) = await YouTube.details(search, False if spotify else True)
-            except:
-                continue
-            if str(duration_min) == "None":
-                continue
-            if duration_sec > config.DURATION_LIMIT:
-                continue
-            if await is_active_chat(chat_id):
-                await put_queue(
-                    chat_id,
-                    original_chat_id,
-                    f"vid_{vidid}",
-                    title,
-                    duration_min,
-                    user_name,
-                    vidid,
-                    user_id,
-                    "video" if video else "audio",
-                )
-                position = len(db.get(chat_id)) - 1
-                count += 1
-                msg += f"{count}. {title[:70]}\n"
-                msg += f"{_['play_20']} {position}\n\n"
-            else:
-                if not forceplay:
-                    db[chat_id] = []
-                status = True if video else None
-                try:
-                    file_path, direct = await YouTube.download(
-                        vidid, mystic, video=status, videoid=True
+        entries = resolve_playlist(result, False if spotify else True)
+        async with aclosing(entries):
+            async for details in entries:
+                if int(count) == config.PLAYLIST_FETCH_LIMIT:
+                    break
+                if not details:
+                    continue
+                title, duration_min, duration_sec, thumbnail, vidid = details
+                if str(duration_min) == "None":
+                    continue
+                if duration_sec > config.DURATION_LIMIT:
+                    continue
+                if await is_active_chat(chat_id):
+                    await put_queue(
+                        chat_id,
+                        original_chat_id,
+                        f"vid_{vidid}",
+                        title,
+                        duration_min,
+                        user_name,
+                        vidid,
+                        user_id,
+                        "video" if video else "audio",
                     )
-                except:
-                    raise AssistantErr(_["play_14"])
-                await Anony.join_call(
-                    chat_id,
-                    original_chat_id,
-                    file_path,
-                    video=status,
-                    image=thumbnail,
-                )
-                await put_queue(
-                    chat_id,
-                    original_chat_id,
-                    file_path if direct else f"vid_{vidid}",
-                    title,
-                    duration_min,
-                    user_name,
-                    vidid,
-                    user_id,
-                    "video" if video else "audio",
-                    forceplay=forceplay,
-                )
-                img = await get_thumb(vidid)
-                button = stream_markup(_, chat_id)
-                run = await app.send_photo(
-                    original_chat_id,
-                    photo=img,
-                    caption=_["stream_1"].format(
-                        f"https://t.me/{app.username}?start=info_{vidid}",
-                        title[:23],
+                    position = len(db.get(chat_id)) - 1
+                    count += 1
+                    msg += f"{count}. {title[:70]}\n"
+                    msg += f"{_['play_20']} {position}\n\n"
+                else:
+                    if not forceplay:
+                        db[chat_id] = []
+                    status = True if video else None
+                    try:
+                        file_path, direct = await YouTube.download(
+                            vidid, mystic, video=status, videoid=True
+                        )
+                    except:
+                        raise AssistantErr(_["play_14"])
+                    await Anony.join_call(
+                        chat_id,
+                        original_chat_id,
+                        file_path,
+                        video=status,
+                        image=thumbnail,
+                    )
+                    await put_queue(
+                        chat_id,
+                        original_chat_id,
+                        file_path if direct else f"vid_{vidid}",
+                        title,
                         duration_min,
                         user_name,
-                    ),
-                    reply_markup=InlineKeyboardMarkup(button),
-                )
-                db[chat_id][0]["mystic"] = run
-                db[chat_id][0]["markup"] = "stream"
+                        vidid,
+                        user_id,
+                        "video" if video else "audio",
+                        forceplay=forceplay,
+                    )
+                    img = await get_thumb(vidid)
+                    button = stream_markup(_, chat_id)
+                    run = await send_photo(
+                        original_chat_id,
+                        photo=img,
+                        caption=_["stream_1"].format(
+                            f"https://t.me/{app.username}?start=info_{vidid}",
+                            title[:23],
+                            duration_min,
+                            user_name,
+                        ),
+                        reply_markup=InlineKeyboardMarkup(button),
+                    )
+                    db[chat_id][0]["mystic"] = run
+                    db[chat_id][0]["markup"] = "stream"
         if count == 0:
             return
         else:
-            link = await AnonyBin(msg)
             lines = msg.count("\n")
             if lines >= 17:
                 car = os.linesep.join(msg.split(os.linesep)[:17])
             else:
                 car = msg
-            carbon = await Carbon.generate(car, randint(100, 10000000))
+            card = await get_playlist_card(car)
             upl = close_markup(_)
-            return await app.send_photo(
-                original_chat_id,
-                photo=carbon,
-                caption=_["play_21"].format(position, link),
-                reply_markup=upl,
-            )
+            if card:
+                run = await send_photo(
+                    original_chat_id,
+                    photo=card,
+                    caption=_["play_23"].format(position),
+                    reply_markup=upl,
+                )
+            else:
+                run = await app.send_message(
+                    original_chat_id, _["play_23"].format(position), reply_markup=upl
+                )
+            if config.PLAYLIST_PASTE:
+                asyncio.create_task(attach_paste(_, run, msg, position, upl))
+            return run
     elif streamtype == "youtube":
         link = result["link"]
         vidid = result["vidid"]
@@ -187,7 +241,7 @@ async def stream(
             )
             img = await get_thumb(vidid)
             button = stream_markup(_, chat_id)
-            run = await app.send_photo(
+            run = await send_photo(
                 original_chat_id,
                 photo=img,
                 caption=_["stream_1"].format(
@@ -240,7 +294,7 @@ async def stream(
                 forceplay=forceplay,
             )
             button = stream_markup(_, chat_id)
-            run = await app.send_photo(
+            run = await send_photo(
                 original_chat_id,
                 photo=config.SOUNCLOUD_IMG_URL,
                 caption=_["stream_1"].format(
@@ -294,7 +348,7 @@ async def stream(
             if video:
                 await add_active_video_chat(chat_id)
             button = stream_markup(_, chat_id)
-            run = await app.send_photo(
+            run = await send_photo(
                 original_chat_id,
                 photo=config.TELEGRAM_VIDEO_URL if video else config.TELEGRAM_AUDIO_URL,
                 caption=_["stream_1"].format(link, title[:23], duration_min, user_name),
@@ -355,7 +409,7 @@ async def stream(
             )
             img = await get_thumb(vidid)
             button = stream_markup(_, chat_id)
-            run = await app.send_photo(
+            run = await send_photo(
                 original_chat_id,
                 photo=img,
                 caption=_["stream_1"].format(
@@ -412,7 +466,7 @@ async def stream(
                 forceplay=forceplay,
             )
             button = stream_markup(_, chat_id)
-            run = await app.send_photo(
+            run = await send_photo(
                 original_chat_id,
                 photo=config.STREAM_IMG_URL,
                 caption=_["stream_2"].format(user_name),
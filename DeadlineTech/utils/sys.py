@@ -1,15 +1,105 @@
+import asyncio
 import time
+from collections import deque, namedtuple
+from typing import Awaitable, Callable, List, Optional
 
 import psutil
 
+import config
 from DeadlineTech.misc import _boot_
 from DeadlineTech.utils.formatters import get_readable_time
+from DeadlineTech.utils.watchdog import watchdog
+
+Sample = namedtuple("Sample", "time cpu ram disk lag pings")
+
+
+class StatsSampler:
+    """
+    Samples CPU, RAM, disk, event loop lag and assistant pings every
+    ``interval`` seconds into a ring buffer covering ``window`` seconds, so
+    /ping and /stats read numbers instead of measuring them. CPU is the
+    average since the previous sample, which needs no blocking interval, and
+    loop lag is the watchdog's average over the same span.
+    """
+
+    def __init__(self, interval: int = config.STATS_INTERVAL, window: int = 900):
+        self.interval = interval
+        self.samples = deque(maxlen=window // interval + 1)
+
+    @staticmethod
+    def _measure():
+        return (
+            psutil.cpu_percent(interval=None),
+            psutil.virtual_memory().percent,
+            psutil.disk_usage("/").percent,
+        )
+
+    async def sample(self, ping: Callable[[], Awaitable[List[float]]] = None):
+        cpu, ram, disk = await asyncio.to_thread(self._measure)
+        lag = watchdog.lag(self.interval)[0]
+        pings = []
+        if ping:
+            try:
+                pings = await asyncio.wait_for(ping(), self.interval)
+            except Exception:
+                pass
+        self.samples.append(Sample(time.time(), cpu, ram, disk, lag, pings))
+
+    async def run(self, ping: Callable[[], Awaitable[List[float]]] = None):
+        # The first cpu_percent(None) only sets the baseline
+        await asyncio.to_thread(psutil.cpu_percent, None)
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.sample(ping)
+            except Exception:
+                pass
+
+    @property
+    def latest(self) -> Optional[Sample]:
+        return self.samples[-1] if self.samples else None
+
+    def average(self, field: str, minutes: int) -> Optional[float]:
+        since = time.time() - minutes * 60
+        values = [
+            getattr(sample, field)
+            for sample in reversed(self.samples)
+            if sample.time >= since
+        ]
+        if field == "pings":
+            values = [sum(pings) / len(pings) for pings in values if pings]
+        return round(sum(values) / len(values), 1) if values else None
+
+    def history(self, field: str = "cpu", unit: str = "") -> str:
+        """1, 5 and 15 minute averages of ``field`` as ``a / b / c``."""
+        return " / ".join(
+            "-" if value is None else f"{value}{unit}"
+            for value in (self.average(field, minutes) for minutes in (1, 5, 15))
+        )
+
+
+sampler = StatsSampler()
 
 
 async def bot_sys_stats():
     bot_uptime = int(time.time() - _boot_)
     UP = f"{get_readable_time(bot_uptime)}"
-    CPU = f"{psutil.cpu_percent(interval=0.5)}%"
-    RAM = f"{psutil.virtual_memory().percent}%"
-    DISK = f"{psutil.disk_usage('/').percent}%"
+    sample = sampler.latest
+    if sample is None:
+        await sampler.sample()
+        sample = sampler.latest
+    CPU = f"{sample.cpu}%"
+    RAM = f"{sample.ram}%"
+    DISK = f"{sample.disk}%"
     return UP, CPU, RAM, DISK
+
+
+def stats_history(_) -> str:
+    """Recent averages from the sampler for /ping and /stats."""
+    sample = sampler.latest
+    return _["ping_3"].format(
+        sampler.history("cpu", "%"),
+        sampler.history("ram", "%"),
+        f"{sample.lag:.1f}" if sample else "-",
+        sampler.history("pings"),
+    )
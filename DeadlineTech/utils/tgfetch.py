@@ -0,0 +1,231 @@
+import asyncio
+import json
+import os
+from collections import deque
+from typing import Callable, Optional
+
+from pyrogram.errors import FloodWait
+
+import config
+from DeadlineTech import app
+from DeadlineTech.logging import LOGGER
+
+# stream_media hands out files in 1 MiB chunks, offsets and limits count chunks
+CHUNK = 1024 * 1024
+SEGMENT = 8
+RETRIES = 3
+
+# file_unique_id -> MediaFetch still running
+_fetches = {}
+
+
+def incomplete(path: str) -> bool:
+    """True while ``path`` is missing or still has parts to download."""
+    return not os.path.exists(path) or os.path.exists(path + ".parts")
+
+
+class MediaFetch:
+    """
+    Downloads one Telegram file into ``path`` with several segment streams.
+
+    The file is preallocated and each chunk is written at its own offset, so
+    segments can finish in any order. Finished chunks are recorded next to it
+    in ``<path>.parts``, which lets a cancelled or interrupted download resume
+    and marks the file as incomplete until the last chunk lands.
+
+    A ``sequential`` download is played while it runs. A preallocated file
+    would look complete to ffmpeg, which plays the missing chunks as silence
+    or garbage, so it uses one stream and the file only grows as chunks are
+    appended.
+    """
+
+    def __init__(self, message, size: int, path: str, sequential: bool = False):
+        self.message = message
+        self.size = size
+        self.path = path
+        self.sequential = sequential
+        self.state = path + ".parts"
+        self.chunks = -(-size // CHUNK)
+        self.done = self._load()
+        if sequential and self.done:
+            # Chunks past a gap of an earlier attempt go with the file's tail, now since
+            # what is left may be enough to start playing
+            self.done = set(range(self._gapless()))
+            os.truncate(path, self.prefix)
+        self.received = min(size, len(self.done) * CHUNK)
+        self.progress = []
+        self.waiters = 0
+        # Set once a caller started playing the file before it was complete
+        self.pinned = False
+        self._changed = asyncio.Event()
+        self.task = None
+
+    def _load(self) -> set:
+        try:
+            with open(self.state) as f:
+                done = set(json.load(f))
+            if os.path.getsize(self.path) >= min(self.size, (max(done, default=-1) + 1) * CHUNK):
+                return done
+        except (OSError, ValueError):
+            pass
+        return set()
+
+    def _save(self):
+        tmp = self.state + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(sorted(self.done), f)
+        os.replace(tmp, self.state)
+
+    def _gapless(self) -> int:
+        count = 0
+        while count in self.done:
+            count += 1
+        return count
+
+    @property
+    def prefix(self) -> int:
+        """Bytes downloaded without gaps from the start of the file."""
+        return min(self.size, self._gapless() * CHUNK)
+
+    async def wait_prefix(self, size: int):
+        size = min(size, self.size)
+        while self.prefix < size:
+            if self.task.done():
+                self.task.result()
+                return
+            self._changed.clear()
+            await self._changed.wait()
+
+    async def _report(self):
+        for progress in list(self.progress):
+            try:
+                await progress(self.received, self.size)
+            except Exception:
+                pass
+
+    async def _segment(self, fd: int, start: int, count: int):
+        for attempt in range(RETRIES):
+            missing = [i for i in range(start, start + count) if i not in self.done]
+            if not missing:
+                return
+            offset = missing[0]
+            try:
+                index = offset
+                async for chunk in app.stream_media(
+                    self.message, limit=start + count - offset, offset=offset
+                ):
+                    await asyncio.to_thread(os.pwrite, fd, chunk, index * CHUNK)
+                    if index not in self.done:
+                        self.done.add(index)
+                        self.received = min(self.size, self.received + len(chunk))
+                        await self._report()
+                    self._changed.set()
+                    index += 1
+                return
+            except FloodWait as e:
+                await asyncio.sleep(e.value)
+            except (OSError, asyncio.TimeoutError, ConnectionError) as e:
+                if attempt == RETRIES - 1:
+                    raise
+                LOGGER(__name__).warning(f"Retrying chunk {offset} of {self.path}: {e}")
+                await asyncio.sleep(1 + attempt)
+        if any(i not in self.done for i in range(start, start + count)):
+            raise RuntimeError(f"Unable to download chunks {start}+{count} of {self.path}")
+
+    async def _run(self, workers: int):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if self.sequential:
+                os.ftruncate(fd, self.prefix)
+                self._save()
+            elif not self.done:
+                os.ftruncate(fd, self.size)
+                self._save()
+            segments = deque(
+                (start, min(SEGMENT, self.chunks - start))
+                for start in range(0, self.chunks, SEGMENT)
+                if any(i not in self.done for i in range(start, min(start + SEGMENT, self.chunks)))
+            )
+
+            async def worker():
+                while segments:
+                    await self._segment(fd, *segments.popleft())
+                    await asyncio.to_thread(self._save)
+
+            tasks = [asyncio.create_task(worker()) for _ in range(max(1, workers))]
+            try:
+                await asyncio.gather(*tasks)
+            finally:
+                # Nothing may write once the file is closed
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            os.close(fd)
+            self._changed.set()
+            if len(self.done) < self.chunks:
+                # Keep what arrived for the next attempt
+                self._save()
+        if len(self.done) < self.chunks:
+            raise RuntimeError(f"Download of {self.path} stopped early")
+        os.remove(self.state)
+
+
+def fetch(
+    message,
+    media,
+    path: str,
+    progress: Optional[Callable] = None,
+    workers: int = config.TG_DOWNLOAD_WORKERS,
+    sequential: bool = False,
+) -> MediaFetch:
+    """
+    Starts (or joins) the download of ``media`` from ``message`` into ``path``.
+
+    Chats asking for the same file at the same time share one download,
+    ``progress(current, total)`` is awaited as chunks arrive. A new
+    ``sequential`` download uses a single stream, see :class:`MediaFetch`.
+    """
+    key = media.file_unique_id
+    job = _fetches.get(key)
+    if job is None or job.task.done():
+        job = _fetches[key] = MediaFetch(message, media.file_size, path, sequential)
+        job.task = asyncio.create_task(job._run(1 if sequential else workers))
+
+        def forget(_):
+            if _fetches.get(key) is job:
+                del _fetches[key]
+
+        job.task.add_done_callback(forget)
+    if progress:
+        job.progress.append(progress)
+    return job
+
+
+async def download(message, media, path: str, progress: Optional[Callable] = None, early: int = 0):
+    """
+    Downloads ``media`` into ``path`` and returns once it is complete, or once
+    its first ``early`` bytes are when ``early`` is set. The download keeps
+    going in the background after an early return. Joining a parallel download
+    that is already running waits for the whole file, its gaps are unplayable.
+
+    Cancelling a waiter leaves the download to the others, the last one to
+    go cancels it and what was fetched so far is kept for the next attempt.
+    """
+    job = fetch(message, media, path, progress, sequential=bool(early))
+    job.waiters += 1
+    finished = False
+    try:
+        if early and job.sequential:
+            await job.wait_prefix(early)
+            job.pinned = finished = True
+            return
+        await asyncio.shield(job.task)
+        finished = True
+    finally:
+        job.waiters -= 1
+        if progress in job.progress:
+            job.progress.remove(progress)
+        if not finished and not job.waiters and not job.pinned:
+            job.task.cancel()
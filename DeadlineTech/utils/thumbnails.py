@@ -1,13 +1,25 @@
 import os
 import re
+import glob
+import hashlib
 import random
-import aiohttp
-import aiofiles
+import asyncio
 import traceback
+import unicodedata
+import multiprocessing
+from collections import OrderedDict
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
 
 from PIL import Image, ImageDraw, ImageEnhance, ImageFilter, ImageFont, ImageOps
 from youtubesearchpython.__future__ import VideosSearch
 
+from config import THUMB_CACHE_SIZE, THUMB_WORKERS
+from DeadlineTech.core.http import get_session
+from DeadlineTech.logging import LOGGER
+
 
 def changeImageSize(maxWidth, maxHeight, image):
     ratio = min(maxWidth / image.size[0], maxHeight / image.size[1])
@@ -40,106 +52,304 @@ def add_rounded_corners(im, radius):
     return im
 
 
+@lru_cache(maxsize=64)
+def load_font(font_path, size):
+    return ImageFont.truetype(font_path, size)
+
+
+@lru_cache(maxsize=4096)
+def text_width(text, font_path, size):
+    return load_font(font_path, size).getlength(text)
+
+
+@lru_cache(maxsize=1024)
+def fit_size(text, max_width, font_path, start_size, min_size):
+    # Width grows with the font size, so binary search the largest size that fits
+    low, high = min_size, start_size
+    while low < high:
+        mid = (low + high + 1) // 2
+        if text_width(text, font_path, mid) <= max_width:
+            low = mid
+        else:
+            high = mid - 1
+    return low
+
+
 def fit_text(draw, text, max_width, font_path, start_size, min_size):
-    size = start_size
-    while size >= min_size:
-        font = ImageFont.truetype(font_path, size)
-        if draw.textlength(text, font=font) <= max_width:
-            return font
-        size -= 1
-    return ImageFont.truetype(font_path, min_size)
+    return load_font(font_path, fit_size(text, max_width, font_path, start_size, min_size))
 
 
-async def get_thumb(videoid: str):
-    url = f"https://www.youtube.com/watch?v={videoid}"
-    try:
-        results = VideosSearch(url, limit=1)
-        for result in (await results.next())["result"]:
-            title = re.sub(r"\W+", " ", result.get("title", "Unsupported Title")).title()
-            duration = result.get("duration", "Unknown Mins")
-            thumbnail = result["thumbnails"][0]["url"].split("?")[0]
-            views = result.get("viewCount", {}).get("short", "Unknown Views")
-            channel = result.get("channel", {}).get("name", "Unknown Channel")
+ASSETS = "DeadlineTech/assets"
+
+# Per worker process, loaded once by _init_worker
+_icons = None
+_fonts = {}
+
+
+def _init_worker():
+    global _icons
+    icons = Image.open(f"{ASSETS}/icons.png")
+    _icons = icons.resize((580, 62))
+    for name, size in (("info", 28), ("time", 26), ("watermark", 24)):
+        _fonts[name] = load_font(f"{ASSETS}/font2.ttf", size)
+
+
+def render_thumb(videoid, raw, title, duration, views, channel):
+    youtube = Image.open(BytesIO(raw))
+    image1 = changeImageSize(1280, 720, youtube)
+    image2 = image1.convert("RGBA")
+
+    gradient = Image.new("RGBA", image2.size, (0, 0, 0, 255))
+    enhancer = ImageEnhance.Brightness(image2.filter(ImageFilter.GaussianBlur(15)))
+    blurred = enhancer.enhance(0.5)
+    background = Image.alpha_composite(gradient, blurred)
+
+    Xcenter = image2.width / 2
+    Ycenter = image2.height / 2
+    logo = youtube.crop((Xcenter - 200, Ycenter - 200, Xcenter + 200, Ycenter + 200))
+    logo.thumbnail((340, 340), Image.ANTIALIAS)
+
+    shadow = Image.new("RGBA", logo.size, (0, 0, 0, 0))
+    shadow_draw = ImageDraw.Draw(shadow)
+    shadow_draw.ellipse((0, 0, logo.size[0], logo.size[1]), fill=(0, 0, 0, 100))
+    background.paste(shadow, (110, 160), shadow)
+
+    rand = (random.randint(100, 255), random.randint(100, 255), random.randint(100, 255))
+    logo = ImageOps.expand(logo, border=15, fill=rand)
+    background.paste(logo, (100, 150))
+
+    draw = ImageDraw.Draw(background)
+    font_info = _fonts["info"]
+    font_time = _fonts["time"]
+    font_path = f"{ASSETS}/font3.ttf"
+
+    title_max_width = 540
+    title_lines = truncate(title, 35)
+
+    title_font1 = fit_text(draw, title_lines[0], title_max_width, font_path, 42, 28)
+    draw.text((565, 180), title_lines[0], (255, 255, 255), font=title_font1)
+
+    if title_lines[1]:
+        title_font2 = fit_text(draw, title_lines[1], title_max_width, font_path, 36, 24)
+        draw.text((565, 225), title_lines[1], (220, 220, 220), font=title_font2)
+
+    draw.text((565, 305), f"{channel} | {views}", (240, 240, 240), font=font_info)
 
-        async with aiohttp.ClientSession() as session:
-            async with session.get(thumbnail) as resp:
-                if resp.status == 200:
-                    f = await aiofiles.open(f"cache/thumb{videoid}.png", mode="wb")
-                    await f.write(await resp.read())
-                    await f.close()
+    draw.line([(565, 370), (1130, 370)], fill="white", width=6)
+    draw.line([(565, 370), (990, 370)], fill=rand, width=6)
+    draw.ellipse([(990, 362), (1010, 382)], outline=rand, fill=rand, width=12)
 
-        icons = Image.open("DeadlineTech/assets/icons.png")
-        youtube = Image.open(f"cache/thumb{videoid}.png")
-        image1 = changeImageSize(1280, 720, youtube)
-        image2 = image1.convert("RGBA")
+    draw.text((565, 385), "00:00", (255, 255, 255), font=font_time)
+    draw.text((1080, 385), duration, (255, 255, 255), font=font_time)
 
-        gradient = Image.new("RGBA", image2.size, (0, 0, 0, 255))
-        enhancer = ImageEnhance.Brightness(image2.filter(ImageFilter.GaussianBlur(15)))
-        blurred = enhancer.enhance(0.5)
-        background = Image.alpha_composite(gradient, blurred)
+    background.paste(_icons, (565, 430), _icons)
 
-        Xcenter = image2.width / 2
-        Ycenter = image2.height / 2
-        logo = youtube.crop((Xcenter - 200, Ycenter - 200, Xcenter + 200, Ycenter + 200))
-        logo.thumbnail((340, 340), Image.ANTIALIAS)
+    watermark_font = _fonts["watermark"]
+    watermark_text = "Team DeadlineTech"
+    text_size = draw.textsize(watermark_text, font=watermark_font)
+    x = background.width - text_size[0] - 25
+    y = background.height - text_size[1] - 25
+    glow_pos = [(x + dx, y + dy) for dx in (-1, 1) for dy in (-1, 1)]
+    for pos in glow_pos:
+        draw.text(pos, watermark_text, font=watermark_font, fill=(0, 0, 0, 180))
+    draw.text((x, y), watermark_text, font=watermark_font, fill=(255, 255, 255, 240))
 
-        shadow = Image.new("RGBA", logo.size, (0, 0, 0, 0))
-        shadow_draw = ImageDraw.Draw(shadow)
-        shadow_draw.ellipse((0, 0, logo.size[0], logo.size[1]), fill=(0, 0, 0, 100))
-        background.paste(shadow, (110, 160), shadow)
+    background = add_rounded_corners(background, 30)
 
-        rand = (random.randint(100, 255), random.randint(100, 255), random.randint(100, 255))
-        logo = ImageOps.expand(logo, border=15, fill=rand)
-        background.paste(logo, (100, 150))
+    tpath = f"cache/{videoid}.png"
+    background.save(tpath)
+    return tpath
 
-        draw = ImageDraw.Draw(background)
-        font_info = ImageFont.truetype("DeadlineTech/assets/font2.ttf", 28)
-        font_time = ImageFont.truetype("DeadlineTech/assets/font2.ttf", 26)
-        font_path = "DeadlineTech/assets/font3.ttf"
 
-        title_max_width = 540
-        title_lines = truncate(title, 35)
+# (background, window, text, accent) - stand-ins for the old carbon themes
+PALETTES = [
+    ((40, 42, 54), (30, 31, 41), (248, 248, 242), (189, 147, 249)),
+    ((46, 52, 64), (36, 41, 51), (216, 222, 233), (136, 192, 208)),
+    ((0, 43, 54), (7, 54, 66), (238, 232, 213), (181, 137, 0)),
+    ((39, 40, 34), (30, 31, 28), (248, 248, 240), (166, 226, 46)),
+    ((38, 20, 71), (26, 14, 48), (255, 255, 255), (255, 126, 219)),
+    ((16, 24, 32), (1, 22, 39), (214, 222, 235), (127, 219, 202)),
+]
 
-        title_font1 = fit_text(draw, title_lines[0], title_max_width, font_path, 42, 28)
-        draw.text((565, 180), title_lines[0], (255, 255, 255), font=title_font1)
 
-        if title_lines[1]:
-            title_font2 = fit_text(draw, title_lines[1], title_max_width, font_path, 36, 24)
-            draw.text((565, 225), title_lines[1], (220, 220, 220), font=title_font2)
+def render_playlist(path, text, palette):
+    background, window, foreground, accent = palette
+    # NFKC folds the language packs' styled letters into ones the font has glyphs for
+    lines = unicodedata.normalize("NFKC", text).rstrip("\n").split("\n")
+    font_path = f"{ASSETS}/font2.ttf"
+    font = load_font(font_path, 26)
+    line_height = 38
+    margin, padding, bar = 48, 36, 44
 
-        draw.text((565, 305), f"{channel} | {views}", (240, 240, 240), font=font_info)
+    width = max([text_width(line, font_path, 26) for line in lines] + [480])
+    width = int(min(width, 1400)) + 2 * (margin + padding)
+    height = len(lines) * line_height + bar + 2 * (margin + padding)
 
-        draw.line([(565, 370), (1130, 370)], fill="white", width=6)
-        draw.line([(565, 370), (990, 370)], fill=rand, width=6)
-        draw.ellipse([(990, 362), (1010, 382)], outline=rand, fill=rand, width=12)
+    image = Image.new("RGB", (width, height), background)
+    draw = ImageDraw.Draw(image)
+    draw.rounded_rectangle(
+        (margin, margin, width - margin, height - margin), radius=18, fill=window
+    )
+    for i, colour in enumerate(((255, 95, 86), (255, 189, 46), (39, 201, 63))):
+        x = margin + padding + i * 30
+        draw.ellipse((x, margin + 22, x + 16, margin + 38), fill=colour)
 
-        draw.text((565, 385), "00:00", (255, 255, 255), font=font_time)
-        draw.text((1080, 385), duration, (255, 255, 255), font=font_time)
+    y = margin + bar + padding
+    for line in lines:
+        # Numbered rows are the titles, the rest is headers and positions
+        colour = foreground if line[:1].isdigit() else accent
+        draw.text((margin + padding, y), line, colour, font=font)
+        y += line_height
 
-        picons = icons.resize((580, 62))
-        background.paste(picons, (565, 430), picons)
+    image.save(path)
+    return path
 
-        watermark_font = ImageFont.truetype("DeadlineTech/assets/font2.ttf", 24)
-        watermark_text = "Team DeadlineTech"
-        text_size = draw.textsize(watermark_text, font=watermark_font)
-        x = background.width - text_size[0] - 25
-        y = background.height - text_size[1] - 25
-        glow_pos = [(x + dx, y + dy) for dx in (-1, 1) for dy in (-1, 1)]
-        for pos in glow_pos:
-            draw.text(pos, watermark_text, font=watermark_font, fill=(0, 0, 0, 180))
-        draw.text((x, y), watermark_text, font=watermark_font, fill=(255, 255, 255, 240))
 
-        background = add_rounded_corners(background, 30)
+class ThumbService:
+    """
+    Renders cards in worker processes and keeps the last few on disk by key.
 
+    The workers are forked, so they inherit the loaded modules instead of
+    re-importing the bot. Forkserver or spawn would run the package init, git
+    sync included, in every worker. Forking a process with running threads
+    can leave a child stuck on a lock some thread held, so :meth:`start`
+    forks them all first thing in ``init()``. The database clients exist by
+    then but have not started a thread: Motor is created with
+    ``connect=False`` and the local store's executor starts on first use. A
+    pool broken by a dead worker is replaced on demand, the only time a fork
+    happens while the bot is running.
+    """
+
+    def __init__(self, workers: int, size: int):
+        self.workers = workers
+        self.size = size
+        self._pool = None
+        self._rendered = OrderedDict()
+        self._inflight = {}
+
+    @property
+    def pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("fork"),
+                initializer=_init_worker,
+            )
+        return self._pool
+
+    def start(self):
+        """Picks up cached thumbnails and forks every worker, call before anything starts a thread."""
+        # Thumbnails survive restarts in cache/, pick them up oldest first
+        cached = glob.glob("cache/*.png")
+        for path in sorted(cached, key=os.path.getmtime):
+            name = os.path.basename(path)[:-4]
+            if not name.startswith("thumb"):
+                self._rendered[name] = path
+        # Images from the remote carbon API were never cleaned up
+        for path in glob.glob("cache/carbon*.jpg"):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        self._evict()
+        # Workers fork as tasks arrive, one task each gets them all forked here
+        for future in [self.pool.submit(os.getpid) for _ in range(self.workers)]:
+            future.result()
+
+    def stop(self):
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+    def _evict(self):
+        while len(self._rendered) > self.size:
+            _, path = self._rendered.popitem(last=False)
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def cached(self, videoid: str):
+        path = self._rendered.get(videoid)
+        if path and os.path.isfile(path):
+            self._rendered.move_to_end(videoid)
+            return path
+        self._rendered.pop(videoid, None)
+        return None
+
+    async def _render(self, videoid: str):
+        url = f"https://www.youtube.com/watch?v={videoid}"
+        results = VideosSearch(url, limit=1)
+        for result in (await results.next())["result"]:
+            title = re.sub(r"\W+", " ", result.get("title", "Unsupported Title")).title()
+            duration = result.get("duration", "Unknown Mins")
+            thumbnail = result["thumbnails"][0]["url"].split("?")[0]
+            views = result.get("viewCount", {}).get("short", "Unknown Views")
+            channel = result.get("channel", {}).get("name", "Unknown Channel")
+
+        async with get_session().get(thumbnail) as resp:
+            if resp.status != 200:
+                return None
+            raw = await resp.read()
+
+        return await self._run(
+            videoid, render_thumb, videoid, raw, title, duration, views, channel
+        )
+
+    async def _run(self, key: str, func, *args):
+        loop = asyncio.get_running_loop()
+        pool = self.pool
         try:
-            os.remove(f"cache/thumb{videoid}.png")
-        except:
-            pass
+            path = await loop.run_in_executor(pool, func, *args)
+        except BrokenProcessPool:
+            # A worker died (OOM killer, crash in Pillow), renders that were waiting fail with it
+            if self._pool is pool:
+                LOGGER(__name__).warning("Thumbnail worker died, restarting the pool")
+                pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+            path = await loop.run_in_executor(self.pool, func, *args)
+        self._rendered[key] = path
+        self._evict()
+        return path
+
+    async def _get(self, key: str, render):
+        path = self.cached(key)
+        if path:
+            return path
+        task = self._inflight.get(key)
+        if task is None:
+            task = self._inflight[key] = asyncio.ensure_future(render())
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def get(self, videoid: str):
+        return await self._get(videoid, lambda: self._render(videoid))
 
-        tpath = f"cache/{videoid}.png"
-        background.save(tpath)
-        return tpath
+    async def playlist(self, text: str):
+        """Summary card of a queued playlist, identical texts share one image."""
+        digest = hashlib.sha1(text.encode()).digest()
+        key = f"carbon{digest.hex()[:16]}"
+        palette = PALETTES[digest[0] % len(PALETTES)]
+        return await self._get(
+            key,
+            lambda: self._run(key, render_playlist, f"cache/{key}.png", text, palette),
+        )
 
+
+thumbs = ThumbService(THUMB_WORKERS, THUMB_CACHE_SIZE)
+
+
+async def get_thumb(videoid: str):
+    try:
+        return await thumbs.get(videoid)
+    except:
+        traceback.print_exc()
+        return None
+
+
+async def get_playlist_card(text: str):
+    try:
+        return await thumbs.playlist(text)
     except:
         traceback.print_exc()
         return None
@@ -0,0 +1,149 @@
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import List, Optional
+
+import config
+from DeadlineTech.logging import LOGGER
+
+# How often the loop checks in and the thread looks for a stalled loop
+TICK = 0.1
+# Seconds between log lines about the same blocking location
+LOG_EVERY = 60
+
+
+def _short(filename: str) -> str:
+    for marker in ("/DeadlineTech/", "/site-packages/", "/lib/python"):
+        if marker in filename:
+            return filename[filename.rindex(marker) + 1 :]
+    return filename
+
+
+def _where(frame: traceback.FrameSummary) -> str:
+    return f"{_short(frame.filename)}:{frame.lineno} in {frame.name}"
+
+
+class Offender:
+    __slots__ = ("count", "total", "max", "inner", "stack", "logged")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.inner = ""
+        self.stack = ""
+        self.logged = 0.0
+
+
+class LoopWatchdog:
+    """
+    Measures event loop lag and finds what blocks it.
+
+    A heartbeat task checks in every ``TICK`` seconds and records how late it
+    woke up. A daemon thread watches the heartbeat, and once the loop has not
+    checked in for ``threshold`` ms it grabs the loop thread's stack. When the
+    loop recovers the stall is charged to the innermost frame of our own code
+    in that stack (or the innermost frame at all), so repeat offenders add up
+    under one location with their count, total and worst time.
+    """
+
+    def __init__(self, threshold_ms: int = config.WATCHDOG_THRESHOLD_MS):
+        self.threshold = threshold_ms / 1000
+        # Lag of recent heartbeats in ms, about the last five minutes
+        self.lags = deque(maxlen=int(300 / TICK))
+        self.offenders = {}
+        self.stalls = 0
+        self.since = time.time()
+        self._beat = time.monotonic()
+        self._thread_id = None
+        self._captured = None
+        self._pending = None
+
+    def _watch(self):
+        while True:
+            time.sleep(TICK)
+            beat = self._beat
+            if time.monotonic() - beat < self.threshold or self._captured == beat:
+                continue
+            frame = sys._current_frames().get(self._thread_id)
+            if frame is None:
+                continue
+            self._captured = beat
+            self._pending = traceback.extract_stack(frame, limit=40)
+            del frame
+
+    def _record(self, stack: List[traceback.FrameSummary], lag: float):
+        # Start at the callback the loop was running, uvloop has no Python frames above it
+        for index in range(len(stack) - 1, 0, -1):
+            if stack[index - 1].filename.endswith("asyncio/events.py"):
+                stack = stack[index:]
+                break
+        ours = [frame for frame in stack if "/DeadlineTech/" in frame.filename]
+        where = _where(ours[-1] if ours else stack[-1])
+        offender = self.offenders.get(where)
+        if offender is None:
+            offender = self.offenders[where] = Offender()
+        ms = lag * 1000
+        offender.count += 1
+        offender.total += ms
+        if ms >= offender.max:
+            offender.max = ms
+            offender.inner = _where(stack[-1])
+            offender.stack = "".join(traceback.format_list(stack[-12:]))
+        self.stalls += 1
+        now = time.monotonic()
+        if now - offender.logged >= LOG_EVERY:
+            offender.logged = now
+            LOGGER(__name__).warning(
+                f"Event loop blocked for {ms:.0f}ms at {where} ({offender.inner}), "
+                f"{offender.count} times so far"
+            )
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        self._thread_id = threading.get_ident()
+        self._beat = time.monotonic()
+        threading.Thread(target=self._watch, name="loop-watchdog", daemon=True).start()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(TICK)
+            lag = max(0.0, loop.time() - start - TICK)
+            self._beat = time.monotonic()
+            self.lags.append(lag * 1000)
+            stack, self._pending = self._pending, None
+            # A capture racing a heartbeat that was on time is not a stall
+            if stack and lag >= self.threshold / 2:
+                self._record(stack, lag)
+
+    def lag(self, seconds: int = 60) -> tuple:
+        """Average, worst and 95th percentile lag in ms over the last ``seconds``."""
+        recent = list(self.lags)[-int(seconds / TICK) :]
+        if not recent:
+            return 0.0, 0.0, 0.0
+        ordered = sorted(recent)
+        return (
+            sum(recent) / len(recent),
+            ordered[-1],
+            ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+        )
+
+    def top(self, limit: int = 10) -> list:
+        return sorted(
+            self.offenders.items(), key=lambda item: item[1].total, reverse=True
+        )[:limit]
+
+    def reset(self):
+        self.offenders.clear()
+        self.stalls = 0
+        self.since = time.time()
+
+    def offender(self, index: int) -> Optional[tuple]:
+        """The ``index``-th entry of :meth:`top`, counting from 1."""
+        top = self.top(index)
+        return top[index - 1] if 0 < index <= len(top) else None
+
+
+watchdog = LoopWatchdog()
@@ -0,0 +1 @@
+"""Offline benchmarks of the bot, see ``python -m bench --help``."""
@@ -0,0 +1,382 @@
+"""
+Offline load test of the play path.
+
+    python -m bench --chats 20 --requests 400 --mix play=5,vplay=1,skip=2,seek=1,end=1
+
+Simulates ``--chats`` group chats sending commands at the same time. /play,
+/vplay, /skip and /seek go through the bot's real handlers (PlayWrapper,
+play_commnd, stream, put_queue, AdminRightsCheck...) and ``end`` finishes the
+current track so ``Call.change_stream`` moves the queue along. Telegram,
+PyTgCalls, the song API and YouTube search are the fakes in bench/fakes.py,
+the database is the embedded SQLite backend in a temporary directory.
+
+Reports latency percentiles per command, CPU time and API calls per request,
+memory and event loop lag. ``--json`` saves the results and ``--baseline``
+compares against a saved run, exiting with 1 when it got slower than
+``--tolerance`` allows, so it can gate performance changes.
+
+Run it from the repository root with the bot's requirements installed. No
+.env values are needed and none are used for the network.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import glob
+import importlib
+import io
+import json
+import logging
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import psutil
+
+BOT_ID = 5000000000
+ASSISTANT_ID = 5000000100
+USER_ID = 6000000000
+CHAT_ID = -1001000000000
+LOGGER_ID = -1009999999999
+
+COMMANDS = {
+    "play": "/play {query}",
+    "vplay": "/vplay {query}",
+    "skip": "/skip",
+    "seek": "/seek 20",
+}
+# Commands that only make sense while the chat is playing, a play is sent instead
+NEED_STREAM = ("skip", "seek", "end")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(prog="python -m bench", description=__doc__.split("\n\n")[0])
+    parser.add_argument("--chats", type=int, default=20, help="concurrent chats")
+    parser.add_argument("--requests", type=int, default=400, help="total commands across all chats")
+    parser.add_argument(
+        "--mix",
+        default="play=5,vplay=1,skip=2,seek=1,end=1",
+        help="relative weights of play, vplay, skip, seek and end",
+    )
+    parser.add_argument("--think", type=float, default=0, help="mean ms a chat waits between commands")
+    parser.add_argument("--tracks", type=int, default=200, help="songs in the fake catalog")
+    parser.add_argument("--assistants", type=int, default=1, choices=range(1, 6))
+    parser.add_argument("--rtt", type=float, default=40, help="Telegram and PyTgCalls round trip in ms")
+    parser.add_argument("--api-latency", type=float, default=80, help="song API and search latency in ms")
+    parser.add_argument("--jitter", type=float, default=0.3, help="latency spread, 0.3 is ±30%%")
+    parser.add_argument("--file-kb", type=int, default=256, help="size of each downloaded song")
+    parser.add_argument("--timeout", type=float, default=60, help="seconds before a command counts as failed")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--background", action="store_true", help="also run the plugins' background jobs")
+    parser.add_argument("--tracemalloc", action="store_true", help="trace Python allocations (slower)")
+    parser.add_argument("--verbose", action="store_true", help="keep the bot's logs and prints")
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--baseline", help="results of an earlier run to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown against the baseline")
+    args = parser.parse_args()
+    try:
+        args.mix = {
+            op: float(weight)
+            for op, weight in (part.split("=") for part in args.mix.split(","))
+        }
+    except ValueError:
+        parser.error("--mix takes op=weight pairs, e.g. play=5,skip=1")
+    unknown = set(args.mix) - set(COMMANDS) - {"end"}
+    if unknown:
+        parser.error(f"unknown ops in --mix: {', '.join(sorted(unknown))}")
+    return args
+
+
+def environment(args, workdir: str):
+    """Config for an offline bot, set before config.py reads it so .env can't point anywhere real."""
+    os.environ.update(
+        {
+            "API_ID": "1",
+            "API_HASH": "bench",
+            "BOT_TOKEN": f"{BOT_ID}:bench",
+            "LOGGER_ID": str(LOGGER_ID),
+            "API_KEY": "bench",
+            "DATABASE_BACKEND": "local",
+            "LOCAL_DB_PATH": os.path.join(workdir, "bench.db"),
+            "HEROKU_API_KEY": "",
+            "HEROKU_APP_NAME": "",
+        }
+    )
+    for number, name in enumerate(
+        ("STRING_SESSION", "STRING_SESSION2", "STRING_SESSION3", "STRING_SESSION4", "STRING_SESSION5"),
+        1,
+    ):
+        os.environ[name] = "bench" if number <= args.assistants else ""
+
+
+def percentile(values: list, q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+def summary(values: list) -> dict:
+    return {
+        "mean": sum(values) / len(values),
+        "p50": percentile(values, 0.5),
+        "p90": percentile(values, 0.9),
+        "p99": percentile(values, 0.99),
+        "max": max(values),
+    }
+
+
+async def dispatch(client, update):
+    """Runs a message through the client's handlers the way pyrogram's dispatcher does."""
+    from pyrogram import ContinuePropagation, StopPropagation
+    from pyrogram.handlers import MessageHandler
+
+    for group in list(client.dispatcher.groups.values()):
+        for handler in list(group):
+            if not isinstance(handler, MessageHandler):
+                continue
+            try:
+                if await handler.check(client, update):
+                    await handler.callback(client, update)
+                    break
+            except StopPropagation:
+                return
+            except ContinuePropagation:
+                continue
+
+
+async def memory(process: psutil.Process, peak: list):
+    while True:
+        peak[0] = max(peak[0], process.memory_info().rss)
+        await asyncio.sleep(0.2)
+
+
+async def bench(args) -> dict:
+    from pyrogram.types import User
+
+    import config
+    from DeadlineTech import app, userbot
+    from DeadlineTech.core import userbot as assistants
+    from DeadlineTech.core.call import Anony
+    from DeadlineTech.core.http import close_session
+    from DeadlineTech.core.lifecycle import start_background, stop_background
+    from DeadlineTech.core.loader import load_plugins
+    from DeadlineTech.misc import db, sudo
+    from DeadlineTech.platforms import Youtube
+    from DeadlineTech.plugins import ALL_MODULES, LAZY_MODULES
+    from DeadlineTech.utils import thumbnails
+    from DeadlineTech.utils.database import ensure_indexes, group_assistant
+    from DeadlineTech.utils.watchdog import watchdog
+
+    from .fakes import FakeBackend, FakeCalls, FakeTelegram, Latency
+
+    thumbnails.thumbs.start()
+    rng = random.Random(args.seed)
+    telegram = FakeTelegram(Latency(args.rtt, args.jitter, random.Random(args.seed + 1)))
+    backend = FakeBackend(args.tracks, Latency(args.api_latency, args.jitter, random.Random(args.seed + 2)), args.file_kb)
+    await backend.start()
+    config.API_URL = backend.url
+    Youtube.VideosSearch = backend.search
+    thumbnails.VideosSearch = backend.search
+
+    bot = User(client=app, id=BOT_ID, is_bot=True, first_name="Bench", username="benchbot")
+    telegram.attach(app, bot)
+    app.id, app.name, app.username, app.mention = bot.id, bot.first_name, bot.username, bot.mention
+    clients = (userbot.one, userbot.two, userbot.three, userbot.four, userbot.five)
+    for number, client in enumerate(clients[: args.assistants], 1):
+        me = User(client=client, id=ASSISTANT_ID + number, first_name=f"Assistant {number}", username=f"benchass{number}")
+        telegram.attach(client, me)
+        client.id, client.name, client.username = me.id, me.mention, me.username
+        assistants.assistants.append(number)
+        assistants.assistantids.append(me.id)
+    Anony.one, Anony.two, Anony.three, Anony.four, Anony.five = (FakeCalls(telegram) for _ in range(5))
+
+    await sudo()
+    await ensure_indexes()
+    load_plugins(app, ALL_MODULES, LAZY_MODULES)
+    await Anony.decorators()
+    if args.background:
+        await start_background()
+    # add_handler only schedules the registration
+    await asyncio.sleep(0)
+
+    chats = []
+    for index in range(args.chats):
+        chat_id = CHAT_ID - index
+        user = User(client=app, id=USER_ID + index, first_name=f"Listener {index}")
+        # The requester may skip and seek
+        telegram.admins[chat_id].add(user.id)
+        chats.append((chat_id, user))
+
+    ops, weights = zip(*args.mix.items())
+    latencies = {op: [] for op in set(ops) | {"play"}}
+    errors = {op: 0 for op in latencies}
+
+    async def perform(op: str, chat_id: int, user):
+        if op == "end":
+            calls = await group_assistant(Anony, chat_id)
+            return await calls.end(chat_id)
+        text = COMMANDS[op].format(query=backend.query(rng.randrange(args.tracks)))
+        await dispatch(app, telegram.message(app, chat_id, user, text))
+
+    async def listener(index: int, count: int):
+        chat_id, user = chats[index]
+        choose = random.Random(args.seed * 1000 + index)
+        for number in range(count):
+            op = "play" if number == 0 else choose.choices(ops, weights)[0]
+            if op in NEED_STREAM and not db.get(chat_id):
+                op = "play"
+            start = time.perf_counter()
+            try:
+                await asyncio.wait_for(perform(op, chat_id, user), args.timeout)
+            except Exception:
+                errors[op] += 1
+            latencies[op].append((time.perf_counter() - start) * 1000)
+            if args.think:
+                await asyncio.sleep(choose.expovariate(1000 / args.think))
+
+    process = psutil.Process()
+    rss_start = process.memory_info().rss
+    peak = [rss_start]
+    sampler = asyncio.create_task(memory(process, peak))
+    lag = asyncio.create_task(watchdog.run())
+    if args.tracemalloc:
+        tracemalloc.start()
+    calls_before = telegram.calls.copy()
+    cpu = time.process_time()
+    start = time.perf_counter()
+    counts = [args.requests // args.chats + (index < args.requests % args.chats) for index in range(args.chats)]
+    quiet = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+    with quiet:
+        await asyncio.gather(*(listener(index, count) for index, count in enumerate(counts) if count))
+    elapsed = time.perf_counter() - start
+    cpu = time.process_time() - cpu
+    traced = tracemalloc.get_traced_memory()[1] if args.tracemalloc else None
+    if args.tracemalloc:
+        tracemalloc.stop()
+
+    requests = sum(len(values) for values in latencies.values())
+    api_calls = dict(telegram.calls - calls_before)
+    api_calls.update({f"http.{name}": count for name, count in backend.calls.items()})
+    average, worst, p95 = watchdog.lag(int(elapsed) + 1)
+    result = {
+        "settings": {
+            name: value
+            for name, value in vars(args).items()
+            if name not in ("json", "baseline", "tolerance", "verbose")
+        },
+        "elapsed": elapsed,
+        "requests": requests,
+        "throughput": requests / elapsed,
+        "cpu_ms_per_request": cpu * 1000 / requests,
+        "api_calls_per_request": sum(api_calls.values()) / requests,
+        "ops": {
+            op: {"count": len(values), "errors": errors[op], **summary(values)}
+            for op, values in sorted(latencies.items())
+            if values
+        },
+        "api_calls": dict(sorted(api_calls.items())),
+        "memory_mb": {
+            "rss_start": rss_start / 2**20,
+            "rss_peak": peak[0] / 2**20,
+            "rss_end": process.memory_info().rss / 2**20,
+            "traced_peak": traced / 2**20 if traced is not None else None,
+        },
+        "loop_lag_ms": {"avg": average, "p95": p95, "max": worst},
+        "blocking": [
+            {"where": where, "count": offender.count, "max_ms": offender.max}
+            for where, offender in watchdog.top(5)
+        ],
+    }
+
+    for task in (sampler, lag):
+        task.cancel()
+    if args.background:
+        await stop_background()
+    await backend.stop()
+    await close_session()
+    thumbnails.thumbs.stop()
+    return result
+
+
+def report(result: dict):
+    print(
+        f"\n{result['requests']} requests from {result['settings']['chats']} chats in "
+        f"{result['elapsed']:.1f}s, {result['throughput']:.1f} req/s, "
+        f"{result['cpu_ms_per_request']:.1f}ms CPU and "
+        f"{result['api_calls_per_request']:.1f} API calls per request\n"
+    )
+    print(f"{'op':<8}{'count':>7}{'errors':>8}{'mean':>9}{'p50':>9}{'p90':>9}{'p99':>9}{'max':>9}  (ms)")
+    for op, stats in result["ops"].items():
+        print(
+            f"{op:<8}{stats['count']:>7}{stats['errors']:>8}"
+            + "".join(f"{stats[key]:>9.1f}" for key in ("mean", "p50", "p90", "p99", "max"))
+        )
+    memory = result["memory_mb"]
+    print(
+        f"\nRSS {memory['rss_start']:.0f} → {memory['rss_end']:.0f}MB, peak {memory['rss_peak']:.0f}MB"
+        + (f", traced peak {memory['traced_peak']:.1f}MB" if memory["traced_peak"] is not None else "")
+    )
+    lag = result["loop_lag_ms"]
+    print(f"Loop lag avg {lag['avg']:.1f}ms, p95 {lag['p95']:.1f}ms, max {lag['max']:.0f}ms")
+    for entry in result["blocking"]:
+        print(f"  blocked {entry['count']}× up to {entry['max_ms']:.0f}ms at {entry['where']}")
+    print("API calls: " + ", ".join(f"{name} {count}" for name, count in result["api_calls"].items()))
+
+
+def compare(result: dict, baseline: dict, tolerance: float) -> list:
+    """What got worse than ``baseline`` by more than ``tolerance``."""
+    worse = []
+
+    def check(name: str, now: float, before: float):
+        if before and now > before * (1 + tolerance):
+            worse.append(f"{name}: {before:.1f} → {now:.1f} (+{(now / before - 1) * 100:.0f}%)")
+
+    for op, stats in result["ops"].items():
+        before = baseline["ops"].get(op)
+        if before:
+            check(f"{op} p90 ms", stats["p90"], before["p90"])
+    check("CPU ms per request", result["cpu_ms_per_request"], baseline["cpu_ms_per_request"])
+    check("API calls per request", result["api_calls_per_request"], baseline["api_calls_per_request"])
+    check("peak RSS MB", result["memory_mb"]["rss_peak"], baseline["memory_mb"]["rss_peak"])
+    if result["throughput"] < baseline["throughput"] * (1 - tolerance):
+        worse.append(f"throughput: {baseline['throughput']:.1f} → {result['throughput']:.1f} req/s")
+    return worse
+
+
+def cleanup(workdir: str):
+    for path in glob.glob("downloads/*/bench*") + glob.glob("cache/bench*"):
+        with contextlib.suppress(OSError):
+            os.remove(path)
+    shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main():
+    args = parse_args()
+    workdir = tempfile.mkdtemp(prefix="bench")
+    environment(args, workdir)
+    if not args.verbose:
+        logging.disable(logging.WARNING)
+    try:
+        # Importing the bot installs uvloop and binds its clients to this loop
+        importlib.import_module("DeadlineTech")
+        result = asyncio.get_event_loop().run_until_complete(bench(args))
+    finally:
+        cleanup(workdir)
+    report(result)
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(result, file, indent=2)
+    if args.baseline:
+        with open(args.baseline) as file:
+            worse = compare(result, json.load(file), args.tolerance)
+        if worse:
+            print("\nSlower than the baseline:\n  " + "\n  ".join(worse))
+            sys.exit(1)
+        print("\nWithin the baseline.")
+
+
+if __name__ == "__main__":
+    main()
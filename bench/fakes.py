@@ -0,0 +1,371 @@
+"""
+In-process stand-ins for everything the play path talks to over the network.
+
+``FakeTelegram`` answers the Bot API methods of the bot and assistant clients,
+``FakeCalls`` replaces each assistant's PyTgCalls and ``FakeBackend`` serves the
+song API, the stream files and thumbnails over local HTTP and answers YouTube
+searches. Every call waits a simulated round trip so concurrency behaves like
+production, and is counted so a change that adds API calls shows up.
+"""
+
+import asyncio
+import hashlib
+import io
+import itertools
+import random
+import re
+from collections import Counter, defaultdict
+from datetime import datetime
+from typing import Dict, List
+
+from aiohttp import web
+from PIL import Image
+from pyrogram.enums import ChatMemberStatus, ChatType
+from pyrogram.errors import UserNotParticipant
+from pyrogram.types import Chat, ChatMember, ChatPrivileges, Message, Photo, User
+from pytgcalls.exceptions import AlreadyJoinedError, NotInGroupCallError
+from pytgcalls.types.stream import StreamAudioEnded
+
+
+class Latency:
+    """A round trip of ``ms`` milliseconds, spread evenly by ``jitter`` either way."""
+
+    def __init__(self, ms: float, jitter: float, rng: random.Random):
+        self.ms = ms
+        self.jitter = jitter
+        self.rng = rng
+
+    async def wait(self):
+        if self.ms > 0:
+            await asyncio.sleep(self.ms * self.rng.uniform(1 - self.jitter, 1 + self.jitter) / 1000)
+
+
+class FakeTelegram:
+    """
+    The Bot API as seen by the bot and its assistants. Chats are supergroups
+    where the bot is an admin, assistants are members once they joined through
+    an invite link and ``admins`` holds the users with video chat rights.
+    """
+
+    # Client methods routed here, each implemented as ``_<name>``
+    METHODS = (
+        "send_message",
+        "send_photo",
+        "edit_message_text",
+        "edit_message_caption",
+        "edit_message_reply_markup",
+        "edit_message_media",
+        "delete_messages",
+        "get_chat",
+        "get_chat_member",
+        "export_chat_invite_link",
+        "join_chat",
+        "approve_chat_join_request",
+        "answer_callback_query",
+    )
+
+    def __init__(self, latency: Latency):
+        self.latency = latency
+        self.calls = Counter()
+        self.members = set()
+        self.admins = defaultdict(set)
+        self._chats = {}
+        self._message_ids = itertools.count(1)
+        self._file_ids = itertools.count(1)
+
+    def chat(self, chat_id: int, client=None) -> Chat:
+        chat = self._chats.get(chat_id)
+        if chat is None:
+            chat = self._chats[chat_id] = Chat(
+                client=client,
+                id=chat_id,
+                type=ChatType.SUPERGROUP,
+                title=f"Bench {abs(chat_id) % 100000}",
+            )
+        return chat
+
+    def message(self, client, chat_id: int, sender: User, text: str = None, **fields) -> Message:
+        return Message(
+            client=client,
+            id=next(self._message_ids),
+            chat=self.chat(chat_id, client),
+            from_user=sender,
+            date=datetime.now(),
+            text=text,
+            **fields,
+        )
+
+    def attach(self, client, me: User):
+        """Routes ``client``'s API methods to this fake, acting as ``me``."""
+        client.me = me
+
+        def route(name):
+            method = getattr(self, f"_{name}")
+
+            async def call(*args, **kwargs):
+                self.calls[name] += 1
+                await self.latency.wait()
+                return method(client, *args, **kwargs)
+
+            setattr(client, name, call)
+
+        for name in self.METHODS:
+            route(name)
+        client.get_chat_members = lambda *args, **kwargs: self._get_chat_members(client, *args, **kwargs)
+
+    def _sent(self, client, chat_id, **fields) -> Message:
+        return self.message(client, chat_id, client.me, **fields)
+
+    def _send_message(self, client, chat_id, text, reply_markup=None, **_):
+        return self._sent(client, chat_id, text=text, reply_markup=reply_markup)
+
+    def _send_photo(self, client, chat_id, photo, caption=None, reply_markup=None, **_):
+        number = next(self._file_ids)
+        photo = Photo(
+            client=client,
+            file_id=f"benchphoto{number}",
+            file_unique_id=f"benchunique{number}",
+            width=1280,
+            height=720,
+            file_size=100000,
+            date=datetime.now(),
+        )
+        return self._sent(client, chat_id, photo=photo, caption=caption, reply_markup=reply_markup)
+
+    def _edited(self, client, chat_id, message_id, **fields) -> Message:
+        message = self._sent(client, chat_id, **fields)
+        message.id = message_id
+        return message
+
+    def _edit_message_text(self, client, chat_id, message_id, text, reply_markup=None, **_):
+        return self._edited(client, chat_id, message_id, text=text, reply_markup=reply_markup)
+
+    def _edit_message_caption(self, client, chat_id, message_id, caption, reply_markup=None, **_):
+        return self._edited(client, chat_id, message_id, caption=caption, reply_markup=reply_markup)
+
+    def _edit_message_reply_markup(self, client, chat_id, message_id, reply_markup=None, **_):
+        return self._edited(client, chat_id, message_id, reply_markup=reply_markup)
+
+    def _edit_message_media(self, client, chat_id, message_id, media, reply_markup=None, **_):
+        return self._edited(client, chat_id, message_id, reply_markup=reply_markup)
+
+    def _delete_messages(self, client, chat_id, message_ids, revoke=True):
+        return len(message_ids) if isinstance(message_ids, list) else 1
+
+    def _get_chat(self, client, chat_id):
+        return self.chat(chat_id, client)
+
+    def _member(self, client, user_id, status, privileges=None) -> ChatMember:
+        return ChatMember(
+            client=client,
+            status=status,
+            user=User(client=client, id=user_id, first_name=f"User {user_id}"),
+            privileges=privileges,
+        )
+
+    def _get_chat_member(self, client, chat_id, user_id):
+        if user_id == client.me.id or user_id in self.admins[chat_id]:
+            return self._member(
+                client,
+                user_id,
+                ChatMemberStatus.ADMINISTRATOR,
+                ChatPrivileges(can_manage_video_chats=True, can_delete_messages=True),
+            )
+        if (chat_id, user_id) in self.members:
+            return self._member(client, user_id, ChatMemberStatus.MEMBER)
+        raise UserNotParticipant()
+
+    async def _get_chat_members(self, client, chat_id, filter=None, **_):
+        self.calls["get_chat_members"] += 1
+        await self.latency.wait()
+        for user_id in sorted(self.admins[chat_id]):
+            yield self._get_chat_member(client, chat_id, user_id)
+
+    def _export_chat_invite_link(self, client, chat_id):
+        return f"https://t.me/+bench{abs(chat_id)}"
+
+    def _join_chat(self, client, chat_id):
+        if isinstance(chat_id, str):
+            chat_id = -int(re.search(r"bench(\d+)", chat_id).group(1))
+        self.members.add((chat_id, client.me.id))
+        return self.chat(chat_id, client)
+
+    def _approve_chat_join_request(self, client, chat_id, user_id):
+        self.members.add((chat_id, user_id))
+        return True
+
+    def _answer_callback_query(self, client, callback_query_id, *args, **_):
+        return True
+
+
+class FakeCalls:
+    """One assistant's PyTgCalls: tracks which chats it streams to and ends streams on demand."""
+
+    def __init__(self, telegram: FakeTelegram, participants: int = 5):
+        self.telegram = telegram
+        self.participants = participants
+        self.streams = {}
+        self._handlers = defaultdict(list)
+
+    async def _call(self, name: str):
+        self.telegram.calls[f"calls.{name}"] += 1
+        await self.telegram.latency.wait()
+
+    def _on(self, event: str):
+        def decorator(func):
+            self._handlers[event].append(func)
+            return func
+
+        return decorator
+
+    def on_stream_end(self):
+        return self._on("stream_end")
+
+    def on_kicked(self):
+        return self._on("kicked")
+
+    def on_closed_voice_chat(self):
+        return self._on("closed_voice_chat")
+
+    def on_left(self):
+        return self._on("left")
+
+    async def start(self):
+        pass
+
+    @property
+    async def ping(self) -> float:
+        return self.telegram.latency.ms
+
+    async def join_group_call(self, chat_id: int, stream, stream_type=None, **_):
+        await self._call("join_group_call")
+        if chat_id in self.streams:
+            raise AlreadyJoinedError()
+        self.streams[chat_id] = stream
+
+    async def leave_group_call(self, chat_id: int):
+        await self._call("leave_group_call")
+        if self.streams.pop(chat_id, None) is None:
+            raise NotInGroupCallError()
+
+    async def change_stream(self, chat_id: int, stream):
+        await self._call("change_stream")
+        if chat_id not in self.streams:
+            raise NotInGroupCallError()
+        self.streams[chat_id] = stream
+
+    async def pause_stream(self, chat_id: int):
+        await self._call("pause_stream")
+
+    async def resume_stream(self, chat_id: int):
+        await self._call("resume_stream")
+
+    async def get_participants(self, chat_id: int) -> list:
+        await self._call("get_participants")
+        return list(range(self.participants))
+
+    async def end(self, chat_id: int):
+        """Runs the stream end handlers as if the current track finished playing."""
+        for handler in self._handlers["stream_end"]:
+            await handler(self, StreamAudioEnded(chat_id))
+
+
+class FakeBackend:
+    """
+    The song API (``/song/<id>`` answering with a stream url), the files it
+    points at (``/file/<id>``) and thumbnails (``/thumb/<id>.jpg``) on a local
+    port, plus a drop-in for ``youtubesearchpython``'s ``VideosSearch`` whose
+    results come from a fixed catalog of ``tracks`` songs.
+    """
+
+    def __init__(self, tracks: int, latency: Latency, file_kb: int):
+        self.latency = latency
+        self.calls = Counter()
+        self.file = bytes(file_kb * 1024)
+        self.catalog: List[Dict] = [
+            {
+                "id": f"bench{number:06d}",
+                "title": f"bench track {number}",
+                "duration": f"{2 + number % 4}:{number * 7 % 60:02d}",
+            }
+            for number in range(tracks)
+        ]
+        self.url = None
+        self._runner = None
+        buffer = io.BytesIO()
+        Image.new("RGB", (1280, 720), (40, 60, 90)).save(buffer, "JPEG")
+        self.thumb = buffer.getvalue()
+
+    def query(self, number: int) -> str:
+        return self.catalog[number % len(self.catalog)]["title"]
+
+    def _lookup(self, query: str, limit: int) -> List[Dict]:
+        found = re.search(r"bench\d{6}", query)
+        if found:
+            start = int(found.group()[5:])
+        else:
+            found = re.search(r"bench track (\d+)", query)
+            start = int(found.group(1)) if found else int(hashlib.md5(query.encode()).hexdigest(), 16)
+        results = []
+        for offset in range(limit):
+            track = self.catalog[(start + offset) % len(self.catalog)]
+            results.append(
+                {
+                    "id": track["id"],
+                    "title": track["title"],
+                    "duration": track["duration"],
+                    "link": f"https://www.youtube.com/watch?v={track['id']}",
+                    "thumbnails": [{"url": f"{self.url}/thumb/{track['id']}.jpg?sqp=bench"}],
+                    "viewCount": {"short": "1M views"},
+                    "channel": {"name": "Bench"},
+                }
+            )
+        return results
+
+    @property
+    def search(self):
+        backend = self
+
+        class VideosSearch:
+            def __init__(self, query: str, limit: int = 20, **_):
+                self.query = query
+                self.limit = limit
+
+            async def next(self) -> dict:
+                backend.calls["search"] += 1
+                await backend.latency.wait()
+                return {"result": backend._lookup(self.query, self.limit)}
+
+        return VideosSearch
+
+    async def _song(self, request):
+        self.calls["song"] += 1
+        await self.latency.wait()
+        videoid = request.match_info["videoid"]
+        return web.json_response({"status": "done", "stream_url": f"{self.url}/file/{videoid}"})
+
+    async def _file(self, request):
+        self.calls["file"] += 1
+        await self.latency.wait()
+        return web.Response(body=self.file, content_type="audio/mp4")
+
+    async def _thumb(self, request):
+        self.calls["thumb"] += 1
+        await self.latency.wait()
+        return web.Response(body=self.thumb, content_type="image/jpeg")
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get("/song/{videoid}", self._song)
+        app.router.add_get("/file/{videoid}", self._file)
+        app.router.add_get("/thumb/{name}", self._thumb)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}"
+
+    async def stop(self):
+        if self._runner:
+            await self._runner.cleanup()
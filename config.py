@@ -20,6 +20,13 @@ API_KEY = getenv("API_KEY")
 # Get your mongo url from cloud.mongodb.com
 MONGO_DB_URI = getenv("MONGO_DB_URI", None)
 
+# Storage backend: "mongo" or "local" (embedded SQLite file, no server needed)
+DATABASE_BACKEND = getenv("DATABASE_BACKEND", "mongo" if MONGO_DB_URI else "local").lower()
+LOCAL_DB_PATH = getenv("LOCAL_DB_PATH", "deadline.db")
+
+# Queries slower than this (in milliseconds) are written to the log
+MONGO_SLOW_QUERY_MS = int(getenv("MONGO_SLOW_QUERY_MS", 100))
+
 DURATION_LIMIT_MIN = int(getenv("DURATION_LIMIT", 60))
 
 # Chat id of a group for logging bot's activities
@@ -57,12 +64,65 @@ SPOTIFY_CLIENT_SECRET = getenv("SPOTIFY_CLIENT_SECRET", None)
 
 # Maximum limit for fetching playlist's track from youtube, spotify, apple links.
 PLAYLIST_FETCH_LIMIT = int(getenv("PLAYLIST_FETCH_LIMIT", 25))
+# How many playlist entries are looked up at once while the first ones start playing.
+PLAYLIST_CONCURRENCY = int(getenv("PLAYLIST_CONCURRENCY", 5))
+# Upload the full list of queued playlist tracks to batbin and link it under the summary.
+PLAYLIST_PASTE = getenv("PLAYLIST_PASTE", "True").lower() != "false"
+
+
+# Concurrency and requests per second used by gban/broadcast fan-outs
+FANOUT_CONCURRENCY = int(getenv("FANOUT_CONCURRENCY", 10))
+FANOUT_RATE = float(getenv("FANOUT_RATE", 25))
+
+
+# Seconds an admin list stays cached (member updates keep it fresh meanwhile) and max chats kept
+ADMIN_CACHE_TTL = int(getenv("ADMIN_CACHE_TTL", 3600))
+ADMIN_CACHE_SIZE = int(getenv("ADMIN_CACHE_SIZE", 5000))
+# Seconds a live check of video chat rights for admin-only commands is reused
+ADMIN_CHECK_TTL = int(getenv("ADMIN_CHECK_TTL", 10))
+# Seconds the bot's own status and assistant presence in a chat are trusted, and invite link lifetime
+MEMBER_CACHE_TTL = int(getenv("MEMBER_CACHE_TTL", 600))
+INVITE_LINK_TTL = int(getenv("INVITE_LINK_TTL", 21600))
+# Seconds between log chat digests and how many log events may wait for one
+LOG_DIGEST_INTERVAL = int(getenv("LOG_DIGEST_INTERVAL", 10))
+LOG_QUEUE_SIZE = int(getenv("LOG_QUEUE_SIZE", 200))
+
+
+# Worker processes rendering thumbnails and how many rendered thumbnails to keep in cache/
+THUMB_WORKERS = int(getenv("THUMB_WORKERS", 2))
+THUMB_CACHE_SIZE = int(getenv("THUMB_CACHE_SIZE", 300))
+
+
+# Days a Spotify/Apple/Resso -> YouTube match is trusted and how many are kept in memory
+MATCH_TTL_DAYS = int(getenv("MATCH_TTL_DAYS", 30))
+MATCH_CACHE_SIZE = int(getenv("MATCH_CACHE_SIZE", 5000))
+
+
+# Play SoundCloud tracks straight from their media url instead of downloading them first
+SOUNDCLOUD_STREAM = getenv("SOUNDCLOUD_STREAM", "False").lower() == "true"
 
 
 # Telegram audio and video file size limit (in bytes)
 TG_AUDIO_FILESIZE_LIMIT = int(getenv("TG_AUDIO_FILESIZE_LIMIT", 104857600))
 TG_VIDEO_FILESIZE_LIMIT = int(getenv("TG_VIDEO_FILESIZE_LIMIT", 1073741824))
 # Checkout https://www.gbmb.org/mb-to-bytes for converting mb to bytes
+# Parallel segment streams per Telegram download
+TG_DOWNLOAD_WORKERS = int(getenv("TG_DOWNLOAD_WORKERS", 4))
+# MiB downloaded before playback may start, 0 waits for the whole file. Early playback downloads
+# with a single stream, and a track that catches up with a slow download stops short
+TG_EARLY_PLAYBACK_MB = int(getenv("TG_EARLY_PLAYBACK_MB", 0))
+# Seconds between edits of download and broadcast progress messages
+PROGRESS_INTERVAL = float(getenv("PROGRESS_INTERVAL", 6))
+# Seconds between progress bar updates of "now playing" panels in a chat
+NOWPLAYING_INTERVAL = int(getenv("NOWPLAYING_INTERVAL", 6))
+# Seconds between system stats samples shown by /ping and /stats
+STATS_INTERVAL = int(getenv("STATS_INTERVAL", 10))
+# Milliseconds the event loop may stay blocked before the watchdog records the stack (see /looplag)
+WATCHDOG_THRESHOLD_MS = int(getenv("WATCHDOG_THRESHOLD_MS", 250))
+
+
+# Load rarely used plugins (dev, speedtest, restart) on their first command instead of at boot
+LAZY_PLUGINS = getenv("LAZY_PLUGINS", "True").lower() == "true"
 
 
 # Get your pyrogram v2 session from @StringFatherBot on Telegram
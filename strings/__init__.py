@@ -1,34 +1,88 @@
+import marshal
 import os
+import sys
 from typing import List
 
 import yaml
 
-languages = {}
+LANGS = "./strings/langs/"
+# Compiled packs live beside the sources like .pyc files, keyed to this interpreter
+CACHE = os.path.join(LANGS, "__pycache__")
+MAGIC = f"langpack-1-{sys.version_info[0]}.{sys.version_info[1]}"
+
 languages_present = {}
 
 
+def _stamp(path: str) -> tuple:
+    stat = os.stat(path)
+    return (MAGIC, stat.st_mtime_ns, stat.st_size)
+
+
+def _compile(path: str, cache: str) -> dict:
+    with open(path, encoding="utf8") as f:
+        pack = yaml.safe_load(f)
+    pack = {sys.intern(key): value for key, value in pack.items()}
+    try:
+        os.makedirs(CACHE, exist_ok=True)
+        tmp = f"{cache}.{os.getpid()}"
+        with open(tmp, "wb") as f:
+            marshal.dump((_stamp(path), pack.get("name")), f)
+            marshal.dump(pack, f)
+        os.replace(tmp, cache)
+    except OSError:
+        pass
+    return pack
+
+
+def _read(lang: str, header_only: bool = False):
+    """``(name, pack)`` of a language, ``pack`` is None for ``header_only``."""
+    path = os.path.join(LANGS, f"{lang}.yml")
+    cache = os.path.join(CACHE, f"{lang}.marshal")
+    try:
+        with open(cache, "rb") as f:
+            stamp, name = marshal.load(f)
+            if stamp == _stamp(path):
+                return name, None if header_only else marshal.load(f)
+    except (OSError, EOFError, ValueError, TypeError):
+        pass
+    pack = _compile(path, cache)
+    return pack.get("name"), pack
+
+
+class Packs(dict):
+    """Language packs, each one read from its compiled cache on first use."""
+
+    def __missing__(self, lang: str) -> dict:
+        if lang not in languages_present:
+            raise KeyError(lang)
+        _, pack = _read(lang)
+        english = self["en"]
+        # Untranslated keys fall back to English and equal strings share one object
+        merged = dict(english)
+        for key, value in pack.items():
+            merged[key] = english[key] if english.get(key) == value else value
+        self[lang] = merged
+        return merged
+
+
+languages = Packs()
+
+
 def get_string(lang: str):
     return languages[lang]
 
 
-for filename in os.listdir(r"./strings/langs/"):
-    if "en" not in languages:
-        languages["en"] = yaml.safe_load(
-            open(r"./strings/langs/en.yml", encoding="utf8")
-        )
-        languages_present["en"] = languages["en"]["name"]
-    if filename.endswith(".yml"):
-        language_name = filename[:-4]
-        if language_name == "en":
-            continue
-        languages[language_name] = yaml.safe_load(
-            open(r"./strings/langs/" + filename, encoding="utf8")
-        )
-        for item in languages["en"]:
-            if item not in languages[language_name]:
-                languages[language_name][item] = languages["en"][item]
+languages["en"] = _read("en")[1]
+languages_present["en"] = languages["en"]["name"]
+for filename in sorted(os.listdir(LANGS)):
+    if not filename.endswith(".yml") or filename == "en.yml":
+        continue
+    language_name = filename[:-4]
     try:
-        languages_present[language_name] = languages[language_name]["name"]
+        name, _ = _read(language_name, header_only=True)
+        if not name:
+            raise KeyError("name")
+        languages_present[language_name] = name
     except:
         print("There is some issue with the language file inside bot.")
         exit()
@@ -119,6 +119,14 @@ HELP_9 = """
   • In this mode, the bot will stop responding to commands in user chats.  
   • Useful when performing updates or backend fixes.
 
+🔹 <b>/dbaudit [reset]</b> – Show per-collection database operation counts and latencies, or reset the counters.
+
+🔹 <b>/dbmigrate [local/mongo]</b> – Copy every collection to the other storage backend (owner only). Switch with <code>DATABASE_BACKEND</code> afterwards.
+
+🔹 <b>/matchstats</b> – Show how many Spotify/Apple/Resso plays were resolved without a YouTube search, and the most played matches.
+
+🔹 <b>/looplag [n/reset]</b> – Show event loop lag and the code locations that blocked it longest, the stack of offender <i>n</i>, or reset the counters.
+
 📝 <i>Only authorized sudoers should use these powerful administrative controls.</i>
 """
 
@@ -0,0 +1,234 @@
+import asyncio
+import importlib.util
+from pathlib import Path
+
+import pytest
+from pymongo.errors import DuplicateKeyError
+
+# Loaded from its file, importing the DeadlineTech package would boot the bot
+_path = Path(__file__).resolve().parent.parent / "DeadlineTech" / "core" / "localdb.py"
+_spec = importlib.util.spec_from_file_location("localdb", _path)
+localdb = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(localdb)
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+@pytest.fixture
+def db(tmp_path):
+    database = localdb.LocalDatabase(str(tmp_path / "test.db"))
+    yield database
+    database.close()
+
+
+def strip(docs: list) -> list:
+    return [{k: v for k, v in doc.items() if k != "_id"} for doc in docs]
+
+
+def test_insert_and_find_one(db):
+    run(db.chats.insert_one({"chat_id": -1, "title": "one"}))
+    doc = run(db.chats.find_one({"chat_id": -1}))
+    assert doc["title"] == "one"
+    assert "_id" in doc
+    assert run(db.chats.find_one({"chat_id": -2})) is None
+
+
+def test_find_with_comparisons(db):
+    run(db.users.insert_many([{"user_id": n} for n in (-3, -1, 1, 2, 5)]))
+
+    def ids(query):
+        return sorted(doc["user_id"] for doc in run(db.users.find(query).to_list(None)))
+
+    assert ids({"user_id": {"$gt": 0}}) == [1, 2, 5]
+    assert ids({"user_id": {"$lt": 0}}) == [-3, -1]
+    assert ids({"user_id": {"$gte": 2, "$lte": 5}}) == [2, 5]
+    assert ids({"user_id": {"$in": [1, 5, 7]}}) == [1, 5]
+    assert ids({"user_id": {"$in": []}}) == []
+    assert ids({"user_id": {"$nin": [1, 2]}}) == [-3, -1, 5]
+    assert ids({"user_id": {"$ne": 1}}) == [-3, -1, 2, 5]
+
+
+def test_exists_and_nested_keys(db):
+    run(db.items.insert_many([{"a": {"b": 1}}, {"a": {"c": 2}}, {"d": 3}]))
+    assert run(db.items.count_documents({"a.b": 1})) == 1
+    assert run(db.items.count_documents({"a": {"$exists": True}})) == 2
+    assert run(db.items.count_documents({"a": {"$exists": False}})) == 1
+
+
+def test_update_set_and_inc(db):
+    run(db.stats.insert_one({"key": "a", "hits": 1}))
+    result = run(db.stats.update_one({"key": "a"}, {"$inc": {"hits": 4}, "$set": {"name": "x"}}))
+    assert (result.matched_count, result.modified_count) == (1, 1)
+    assert strip([run(db.stats.find_one({"key": "a"}))]) == [{"key": "a", "hits": 5, "name": "x"}]
+
+    # Same values again leave the document untouched
+    result = run(db.stats.update_one({"key": "a"}, {"$set": {"name": "x"}}))
+    assert (result.matched_count, result.modified_count) == (1, 0)
+
+    # Missing fields count from zero and dotted keys create the nesting
+    run(db.stats.update_one({"key": "a"}, {"$inc": {"daily.total": 2}}))
+    assert run(db.stats.find_one({"key": "a"}))["daily"] == {"total": 2}
+
+
+def test_update_without_match(db):
+    result = run(db.stats.update_one({"key": "nope"}, {"$set": {"x": 1}}))
+    assert (result.matched_count, result.modified_count, result.upserted_id) == (0, 0, None)
+    assert run(db.stats.count_documents({})) == 0
+
+
+def test_upsert_seeds_from_query(db):
+    result = run(
+        db.matches.update_one(
+            {"key": "q:song"},
+            {"$set": {"vidid": "abc"}, "$setOnInsert": {"hits": 0}},
+            upsert=True,
+        )
+    )
+    assert result.upserted_id is not None
+    assert strip([run(db.matches.find_one({"key": "q:song"}))]) == [
+        {"key": "q:song", "vidid": "abc", "hits": 0}
+    ]
+
+    # $setOnInsert only applies when the document is created
+    run(db.matches.update_one({"key": "q:song"}, {"$inc": {"hits": 3}}))
+    run(
+        db.matches.update_one(
+            {"key": "q:song"},
+            {"$set": {"vidid": "def"}, "$setOnInsert": {"hits": 0}},
+            upsert=True,
+        )
+    )
+    doc = run(db.matches.find_one({"key": "q:song"}))
+    assert (doc["vidid"], doc["hits"]) == ("def", 3)
+    assert run(db.matches.count_documents({})) == 1
+
+
+def test_upsert_ignores_operator_conditions(db):
+    run(db.jobs.update_one({"job_id": "a", "at": {"$lt": 10}}, {"$set": {"at": 5}}, upsert=True))
+    assert strip([run(db.jobs.find_one({}))]) == [{"job_id": "a", "at": 5}]
+
+
+def test_push_pull_and_add_to_set(db):
+    run(db.sudo.insert_one({"sudo": "sudo", "sudoers": [1]}))
+    run(db.sudo.update_one({"sudo": "sudo"}, {"$push": {"sudoers": 2}}))
+    run(db.sudo.update_one({"sudo": "sudo"}, {"$push": {"sudoers": 2}}))
+    assert run(db.sudo.find_one({"sudo": "sudo"}))["sudoers"] == [1, 2, 2]
+
+    run(db.sudo.update_one({"sudo": "sudo"}, {"$pull": {"sudoers": 2}}))
+    assert run(db.sudo.find_one({"sudo": "sudo"}))["sudoers"] == [1]
+
+    run(db.sudo.update_one({"sudo": "sudo"}, {"$addToSet": {"sudoers": 1}}))
+    run(db.sudo.update_one({"sudo": "sudo"}, {"$addToSet": {"sudoers": 3}}))
+    assert run(db.sudo.find_one({"sudo": "sudo"}))["sudoers"] == [1, 3]
+
+    # Pushing to a missing field starts the list
+    run(db.sudo.update_one({"sudo": "sudo"}, {"$push": {"others": "x"}}))
+    assert run(db.sudo.find_one({"sudo": "sudo"}))["others"] == ["x"]
+
+
+def test_unset_and_max(db):
+    run(db.stats.insert_one({"key": "a", "peak": 5, "tmp": 1}))
+    run(db.stats.update_one({"key": "a"}, {"$max": {"peak": 3}, "$unset": {"tmp": ""}}))
+    assert strip([run(db.stats.find_one({"key": "a"}))]) == [{"key": "a", "peak": 5}]
+    run(db.stats.update_one({"key": "a"}, {"$max": {"peak": 9}}))
+    assert run(db.stats.find_one({"key": "a"}))["peak"] == 9
+
+
+def test_unsupported_operator(db):
+    run(db.stats.insert_one({"key": "a"}))
+    with pytest.raises(localdb.OperationFailure):
+        run(db.stats.update_one({"key": "a"}, {"$rename": {"key": "k"}}))
+
+
+def test_update_many_and_deletes(db):
+    run(db.chats.insert_many([{"chat_id": n, "on": False} for n in range(-5, 0)]))
+    result = run(db.chats.update_many({"chat_id": {"$lt": -2}}, {"$set": {"on": True}}))
+    assert (result.matched_count, result.modified_count) == (3, 3)
+    assert run(db.chats.count_documents({"on": True})) == 3
+
+    assert run(db.chats.delete_one({"on": True})).deleted_count == 1
+    assert run(db.chats.delete_many({"on": True})).deleted_count == 2
+    assert run(db.chats.count_documents({})) == 2
+
+
+def test_sort_skip_limit(db):
+    run(db.matches.insert_many([{"key": str(n), "hits": n % 7} for n in range(20)]))
+    top = run(db.matches.find({}, {"_id": 0}).sort("hits", -1).limit(3).to_list(3))
+    assert [doc["hits"] for doc in top] == [6, 6, 5]
+    assert all("_id" not in doc for doc in top)
+
+    ordered = run(db.matches.find({"hits": {"$gt": 0}}).sort("hits", 1).skip(2).limit(4).to_list(None))
+    assert [doc["hits"] for doc in ordered] == [1, 2, 2, 2]
+
+    # Paging by key, as iter_served_users does
+    page = run(db.matches.find({"key": {"$gt": "5"}}).sort("key", 1).limit(2).to_list(2))
+    assert [doc["key"] for doc in page] == ["6", "7"]
+
+
+def test_projection(db):
+    run(db.users.insert_one({"user_id": 1, "name": "a", "lang": "en"}))
+    assert run(db.users.find_one({}, {"name": 1})).keys() == {"_id", "name"}
+    assert run(db.users.find_one({}, {"_id": 0, "lang": 0})) == {"user_id": 1, "name": "a"}
+
+
+def test_cursor_spans_batches(db):
+    total = localdb._BATCH * 2 + 17
+    run(db.users.insert_many([{"user_id": n} for n in range(total)]))
+
+    async def collect(cursor):
+        return [doc["user_id"] async for doc in cursor]
+
+    assert run(collect(db.users.find({}))) == list(range(total))
+    assert run(collect(db.users.find({}).sort("user_id", -1))) == list(range(total))[::-1]
+    # A residual filter is evaluated in Python over every row
+    assert len(run(collect(db.users.find({"user_id": {"$nin": [0, 1]}})))) == total - 2
+    assert run(db.users.count_documents({"user_id": {"$gte": total - 10}})) == 10
+    assert run(db.users.count_documents({"user_id": {"$ne": 3}})) == total - 1
+
+
+def test_unique_index(db):
+    run(db.chats.insert_one({"chat_id": 1}))
+    run(db.chats.create_index("chat_id", unique=True))
+    with pytest.raises(DuplicateKeyError):
+        run(db.chats.insert_one({"chat_id": 1}))
+    with pytest.raises(DuplicateKeyError):
+        run(db.chats.update_one({"chat_id": 2}, {"$set": {"chat_id": 1}}, upsert=True))
+
+
+def test_unique_index_over_duplicates(db):
+    run(db.chats.insert_many([{"chat_id": 1}, {"chat_id": 1}]))
+    with pytest.raises(localdb.OperationFailure):
+        run(db.chats.create_index("chat_id", unique=True))
+    # ensure_indexes falls back to a plain index
+    run(db.chats.create_index("chat_id"))
+    assert run(db.chats.count_documents({"chat_id": 1})) == 2
+
+
+def test_persists_across_connections(tmp_path):
+    path = str(tmp_path / "test.db")
+    first = localdb.LocalDatabase(path)
+    run(first.users.update_one({"user_id": 1}, {"$set": {"lang": "hi"}}, upsert=True))
+    first.close()
+    second = localdb.LocalDatabase(path)
+    try:
+        assert run(second.users.find_one({"user_id": 1}))["lang"] == "hi"
+        assert run(second.list_collection_names()) == ["users"]
+    finally:
+        second.close()
+
+
+def test_copy_database(tmp_path):
+    source = localdb.LocalDatabase(str(tmp_path / "source.db"))
+    target = localdb.LocalDatabase(str(tmp_path / "target.db"))
+    try:
+        run(source.users.insert_many([{"user_id": n} for n in range(3)]))
+        run(source.chats.insert_one({"chat_id": -1}))
+        run(target.users.insert_one({"user_id": 99}))
+        assert run(localdb.copy_database(source, target)) == {"users": 3, "chats": 1}
+        assert run(target.users.count_documents({})) == 3
+        assert run(target.users.find_one({"user_id": 99})) is None
+    finally:
+        source.close()
+        target.close()